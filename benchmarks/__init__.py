@@ -0,0 +1,17 @@
+"""
+Offline performance benchmarks for CloudBridge.
+
+The benchmarks seed a mock cloud with thousands of resources and measure the
+latency, throughput and peak memory use of the hot paths of each service:
+listing a page, finding and getting a resource, iterating through all
+resources, serializing them and waiting on them. Run them with::
+
+    python -m benchmarks --provider aws --scale 1000
+
+AWS is simulated with moto, through ``MockAWSCloudProvider``, and OpenStack
+with in-memory stand-ins for the Nova, Cinder and Swift clients, so no cloud
+credentials are needed. Results can be saved as a baseline with
+``--save-baseline`` and later runs compared against it with ``--baseline``,
+in which case the command fails if any benchmark regressed by more than
+``--tolerance``.
+"""
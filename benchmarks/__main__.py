@@ -0,0 +1,59 @@
+"""
+Runs the benchmarks from the command line
+"""
+import argparse
+import sys
+
+from .cases import run_benchmarks
+from .fixtures import FIXTURES
+from .harness import compare
+from .harness import format_results
+from .harness import load_baseline
+from .harness import save_baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark CloudBridge against a mock cloud.')
+    parser.add_argument('--provider', choices=sorted(FIXTURES),
+                        default='aws')
+    parser.add_argument('--scale', type=int, default=1000,
+                        help='Number of each kind of resource to seed.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timed runs of each benchmark.')
+    parser.add_argument('--sample', type=int, default=100,
+                        help='Number of resources to wait on.')
+    parser.add_argument('--only', action='append',
+                        help='Only run benchmarks starting with this prefix,'
+                        ' e.g. "volumes." (may be repeated).')
+    parser.add_argument('--baseline',
+                        help='Compare against results saved in this file.')
+    parser.add_argument('--save-baseline',
+                        help='Save the results to this file.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional regression against the'
+                        ' baseline.')
+    args = parser.parse_args(argv)
+
+    fixture = FIXTURES[args.provider](args.scale)
+    try:
+        results = run_benchmarks(fixture, args.repeat, args.sample,
+                                 args.only)
+    finally:
+        fixture.close()
+    print(format_results(results))
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline),
+                              args.tolerance)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
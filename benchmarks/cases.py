@@ -0,0 +1,87 @@
+"""
+The benchmarked operations
+"""
+from cloudbridge.cloud.base.resources import serialize_many
+
+from .harness import measure
+
+
+def _targets(fixture):
+    """
+    Returns the (name, pageable, supports_find, waitable_service) of each
+    collection of resources to benchmark.
+    """
+    provider = fixture.provider
+    bucket = provider.object_store.get(fixture.bucket_name)
+    return [
+        ('instances', provider.compute.instances, True,
+         provider.compute.instances),
+        ('volumes', provider.block_store.volumes, True,
+         provider.block_store.volumes),
+        ('snapshots', provider.block_store.snapshots, True,
+         provider.block_store.snapshots),
+        ('buckets', provider.object_store, True, None),
+        ('objects', bucket, False, None)]
+
+
+def run_benchmarks(fixture, repeat=5, sample=100, selected=None):
+    """
+    Runs all benchmarks against a seeded fixture.
+
+    :type sample: ``int``
+    :param sample: The number of resources to wait on, since waits refresh
+                   each resource individually.
+
+    :type selected: ``list`` of ``str``
+    :param selected: If given, only benchmarks whose names start with one of
+                     these prefixes are run.
+
+    :rtype: ``list`` of :class:`.BenchmarkResult`
+    """
+    results = []
+
+    def bench(name, func, items=1):
+        if selected and not any(name.startswith(s) for s in selected):
+            return
+        results.append(measure(name, func, repeat, items))
+
+    for name, pageable, supports_find, waitable in _targets(fixture):
+        page = pageable.list()
+        resources = list(pageable)
+        middle = resources[len(resources) // 2]
+
+        bench(name + '.list', pageable.list, len(page))
+        bench(name + '.get', lambda: pageable.get(middle.id))
+        if supports_find:
+            bench(name + '.find', lambda: pageable.find(middle.name))
+        bench(name + '.iterate', lambda: sum(1 for _ in pageable),
+              len(resources))
+        bench(name + '.to_json', lambda: serialize_many(resources),
+              len(resources))
+        if waitable:
+            # Each resource is pending until it is refreshed, after which it
+            # is in the state it has in the mock cloud, so that each wait
+            # polls exactly once without sleeping
+            subset = resources[:sample]
+            states = list(set(r.state for r in subset))
+            bench(name + '.wait_for',
+                  _wait_for(fixture, subset, states), len(subset))
+            bench(name + '.wait_for_many',
+                  _wait_for_many(fixture, waitable, subset, states),
+                  len(subset))
+    return results
+
+
+def _wait_for(fixture, resources, states):
+    def wait():
+        fixture.make_pending(resources)
+        for resource in resources:
+            resource.wait_for(states, interval=0)
+    return wait
+
+
+def _wait_for_many(fixture, service, resources, states):
+    def wait():
+        fixture.make_pending(resources)
+        list(service.wait_for_many(resources, states, interval=0))
+    return wait
@@ -0,0 +1,286 @@
+"""
+Providers backed by mock clouds, seeded with resources to benchmark against
+"""
+import collections
+import copy
+import datetime
+
+# Names are given a common prefix so that find() has to filter
+NAME_PREFIX = 'cb-bench'
+
+AWS_IMAGE = 'ami-d85e75b0'
+AWS_ZONE = 'us-east-1a'
+OS_ZONE = 'nova'
+
+
+class Fixture(object):
+    """
+    A provider seeded with ``scale`` instances, volumes, snapshots and
+    bucket objects, and ``scale // 10`` buckets.
+
+    ``set_pending`` puts the local copy of an instance, volume or snapshot
+    in a transitional state, without changing it in the mock cloud.
+    """
+
+    def __init__(self, provider, scale, set_pending, teardown=None):
+        self.provider = provider
+        self.scale = scale
+        self._set_pending = set_pending
+        self._teardown = teardown
+
+    def make_pending(self, resources):
+        """
+        Puts the local copies of the resources in a transitional state, so
+        that a wait for their state in the mock cloud sees them pending
+        first, and then ready once it has refreshed them.
+        """
+        for resource in resources:
+            self._set_pending(resource)
+
+    def name(self, kind, index):
+        return '{0}-{1}-{2}'.format(NAME_PREFIX, kind, index)
+
+    @property
+    def bucket_name(self):
+        return self.name('bucket', 0)
+
+    def close(self):
+        if self._teardown:
+            self._teardown()
+
+
+def bucket_count(scale):
+    return max(1, scale // 10)
+
+
+def aws_fixture(scale):
+    """
+    Seeds moto through boto directly, since seeding is not measured.
+    """
+    from cloudbridge.cloud.providers.aws.provider import MockAWSCloudProvider
+
+    provider = MockAWSCloudProvider({'default_wait_interval': 0})
+    provider.setUpMock()
+    fixture = Fixture(provider, scale, _set_aws_pending,
+                      provider.tearDownMock)
+    ec2 = provider.ec2_conn
+
+    reservation = ec2.run_instances(
+        AWS_IMAGE, min_count=scale, max_count=scale,
+        instance_type='t1.micro', placement=AWS_ZONE)
+    for i, instance in enumerate(reservation.instances):
+        ec2.create_tags([instance.id], {'Name': fixture.name('instance', i)})
+    for i in range(scale):
+        volume = ec2.create_volume(1, AWS_ZONE)
+        ec2.create_tags([volume.id], {'Name': fixture.name('volume', i)})
+        snapshot = ec2.create_snapshot(volume.id)
+        ec2.create_tags([snapshot.id], {'Name': fixture.name('snapshot', i)})
+
+    s3 = provider.s3_conn
+    for i in range(bucket_count(scale)):
+        s3.create_bucket(fixture.name('bucket', i))
+    bucket = s3.get_bucket(fixture.bucket_name)
+    for i in range(scale):
+        bucket.new_key(fixture.name('object', i)).set_contents_from_string(
+            'x')
+    return fixture
+
+
+def openstack_fixture(scale):
+    """
+    Seeds in-memory stand-ins for the Nova, Cinder and Swift clients.
+    """
+    provider = _fake_openstack_provider_class()({'default_wait_interval': 0})
+    fixture = Fixture(provider, scale, _set_openstack_pending)
+    nova, cinder, swift = provider.nova, provider.cinder, provider.swift
+
+    for i in range(scale):
+        nova.servers.add(
+            name=fixture.name('instance', i), status='ACTIVE',
+            networks={'private': ['10.0.{0}.{1}'.format(i // 256, i % 256)]},
+            flavor={'id': '1'}, image={'id': 'image-1'},
+            key_name=None, security_groups=[],
+            **{'OS-EXT-AZ:availability_zone': OS_ZONE})
+        volume = cinder.volumes.add(
+            name=fixture.name('volume', i), description=None, size=1,
+            status='available', availability_zone=OS_ZONE,
+            snapshot_id=None, attachments=[], created_at=_now())
+        cinder.volume_snapshots.add(
+            name=fixture.name('snapshot', i), description=None, size=1,
+            status='available', volume_id=volume.id, created_at=_now())
+
+    for i in range(bucket_count(scale)):
+        swift.put_container(fixture.name('bucket', i))
+    for i in range(scale):
+        swift.put_object(fixture.bucket_name, fixture.name('object', i), 'x')
+    return fixture
+
+
+FIXTURES = {'aws': aws_fixture, 'openstack': openstack_fixture}
+
+
+def _set_aws_pending(resource):
+    # pylint:disable=protected-access
+    if hasattr(resource, '_ec2_instance'):
+        resource._ec2_instance._state.name = 'pending'
+    elif hasattr(resource, '_volume'):
+        resource._volume.status = 'creating'
+    else:
+        resource._snapshot.status = 'pending'
+
+
+def _set_openstack_pending(resource):
+    # pylint:disable=protected-access
+    if hasattr(resource, '_os_instance'):
+        resource._os_instance.status = 'BUILD'
+    elif hasattr(resource, '_volume'):
+        resource._volume.status = 'creating'
+    else:
+        resource._snapshot.status = 'creating'
+
+
+def _now():
+    return datetime.datetime.utcnow().isoformat()
+
+
+def _fake_openstack_provider_class():
+    # The OpenStack provider is imported here, so that the AWS benchmarks
+    # do not require the OpenStack clients to be installed
+    from cinderclient.exceptions import NotFound as CinderNotFound
+    from novaclient.exceptions import NotFound as NovaNotFound
+
+    from cloudbridge.cloud.providers.openstack.provider import \
+        OpenStackCloudProvider
+
+    class FakeOpenStackCloudProvider(OpenStackCloudProvider):
+        """
+        An OpenStack provider whose clients are replaced by stand-ins which
+        hold their resources in memory.
+        """
+
+        def __init__(self, config):
+            super(FakeOpenStackCloudProvider, self).__init__(config)
+            # Shared by the connections of all threads
+            self._fake_nova = _FakeClient(servers=_FakeManager(NovaNotFound))
+            self._fake_cinder = _FakeClient(
+                volumes=_FakeManager(CinderNotFound),
+                volume_snapshots=_FakeManager(CinderNotFound))
+            self._fake_swift = _FakeSwift()
+
+        def _connect_nova(self):
+            return self._fake_nova
+
+        def _connect_cinder(self):
+            return self._fake_cinder
+
+        def _connect_swift(self):
+            return self._fake_swift
+
+    return FakeOpenStackCloudProvider
+
+
+class _FakeClient(object):
+
+    def __init__(self, **managers):
+        for name, manager in managers.items():
+            setattr(self, name, manager)
+
+
+class _FakeResource(object):
+
+    def __init__(self, manager, **attrs):
+        self.manager = manager
+        for name, value in attrs.items():
+            setattr(self, name, value)
+
+    def update(self, **kwargs):
+        self.manager.update(self.id, **kwargs)
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    def delete(self):
+        self.manager.delete(self.id)
+
+
+class _FakeManager(object):
+    """
+    Holds resources in creation order and supports the limit and marker
+    paging of the OpenStack clients, where the marker is the id of the last
+    resource of the previous page. Like the services, it returns at most
+    ``max_limit`` resources per page, even if no limit is given. Like the
+    clients, it returns a new copy of a resource each time it is fetched.
+    """
+
+    def __init__(self, not_found, max_limit=1000):
+        self._not_found = not_found
+        self.max_limit = max_limit
+        self._resources = collections.OrderedDict()
+        self._count = 0
+
+    def add(self, **attrs):
+        self._count += 1
+        resource = _FakeResource(self, id='{0:08d}'.format(self._count),
+                                 **attrs)
+        self._resources[resource.id] = resource
+        return resource
+
+    def get(self, resource_id):
+        try:
+            return copy.copy(self._resources[resource_id])
+        except KeyError:
+            raise self._not_found(404)
+
+    def update(self, resource_id, **kwargs):
+        resource = self._resources[resource_id]
+        for name, value in kwargs.items():
+            setattr(resource, name, value)
+
+    def delete(self, resource_id):
+        self._resources.pop(resource_id, None)
+
+    def list(self, detailed=True, search_opts=None, limit=None, marker=None):
+        search_opts = dict(search_opts or {})
+        limit = search_opts.pop('limit', limit)
+        marker = search_opts.pop('marker', marker)
+        resources = list(self._resources.values())
+        if marker:
+            position = list(self._resources).index(marker) + 1
+            resources = resources[position:]
+        name = search_opts.get('name')
+        if name:
+            resources = [r for r in resources if r.name == name]
+        limit = min(limit or self.max_limit, self.max_limit)
+        return [copy.copy(r) for r in resources[:limit]]
+
+
+class _FakeSwift(object):
+
+    def __init__(self):
+        self._containers = collections.OrderedDict()
+
+    @staticmethod
+    def _page(items, prefix=None, limit=None, marker=None):
+        # Swift lists in name order
+        items = sorted(items, key=lambda i: i['name'])
+        if prefix:
+            items = [i for i in items if i['name'].startswith(prefix)]
+        if marker:
+            items = [i for i in items if i['name'] > marker]
+        return items[:limit] if limit else items
+
+    def put_container(self, name):
+        self._containers.setdefault(name, collections.OrderedDict())
+
+    def put_object(self, container, name, contents):
+        self._containers[container][name] = {
+            'name': name, 'bytes': len(contents or ''),
+            'last_modified': _now()}
+
+    def get_account(self, prefix=None, limit=None, marker=None):
+        containers = [{'name': name, 'count': len(objects)}
+                      for name, objects in self._containers.items()]
+        return {}, self._page(containers, prefix, limit, marker)
+
+    def get_container(self, container, prefix=None, limit=None, marker=None):
+        objects = list(self._containers[container].values())
+        return {}, self._page(objects, prefix, limit, marker)
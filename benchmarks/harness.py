@@ -0,0 +1,135 @@
+"""
+Measurement and baseline comparison of benchmarks
+"""
+import gc
+import json
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Only available from Python 3.4
+    tracemalloc = None
+
+
+class BenchmarkResult(object):
+    """
+    The measurements of a single benchmark.
+    """
+
+    def __init__(self, name, durations, items, peak_memory):
+        self.name = name
+        self.durations = sorted(durations)
+        self.items = items
+        self.peak_memory = peak_memory
+
+    @property
+    def median(self):
+        return self.durations[len(self.durations) // 2]
+
+    @property
+    def p95(self):
+        return self.durations[int(round(0.95 * (len(self.durations) - 1)))]
+
+    @property
+    def throughput(self):
+        """
+        The number of items processed per second, at the median latency.
+        """
+        return self.items / self.median if self.median else float('inf')
+
+    def to_dict(self):
+        return {'median': self.median,
+                'p95': self.p95,
+                'throughput': self.throughput,
+                'items': self.items,
+                'peak_memory': self.peak_memory}
+
+    def __repr__(self):
+        return "<CB-{0}: {1}>".format(self.__class__.__name__, self.name)
+
+
+def measure(name, func, repeat=5, items=1):
+    """
+    Runs ``func`` once to warm up any caches and connections, then ``repeat``
+    times to measure its latency and once more to measure its peak memory
+    use, which is kept separate since tracing allocations slows the code
+    down considerably.
+
+    :type items: ``int``
+    :param items: The number of items processed by each call, from which
+                  the throughput is worked out.
+
+    :rtype: :class:`.BenchmarkResult`
+    """
+    func()
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = timeit.default_timer()
+        func()
+        durations.append(timeit.default_timer() - start)
+
+    peak_memory = None
+    if tracemalloc:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult(name, durations, items, peak_memory)
+
+
+def save_baseline(results, path):
+    with open(path, 'w') as f:
+        json.dump({r.name: r.to_dict() for r in results}, f, indent=2,
+                  sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compares results against a baseline, returning a description of each
+    benchmark whose median latency or peak memory grew by more than the
+    tolerance. Benchmarks missing from the baseline are ignored.
+
+    :type tolerance: ``float``
+    :param tolerance: The allowed fractional increase, e.g. 0.2 for 20%.
+
+    :rtype: ``list`` of ``str``
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        if result.median > base['median'] * (1 + tolerance):
+            regressions.append(
+                "{0}: median latency {1:.4f}s exceeds baseline {2:.4f}s"
+                .format(result.name, result.median, base['median']))
+        if (result.peak_memory is not None and base.get('peak_memory') and
+                result.peak_memory > base['peak_memory'] * (1 + tolerance)):
+            regressions.append(
+                "{0}: peak memory {1} bytes exceeds baseline {2} bytes"
+                .format(result.name, result.peak_memory,
+                        base['peak_memory']))
+    return regressions
+
+
+def format_results(results):
+    """
+    Returns the results as a table.
+    """
+    lines = ['{0:<40} {1:>10} {2:>10} {3:>12} {4:>12}'.format(
+        'benchmark', 'median(s)', 'p95(s)', 'items/s', 'peak(KiB)')]
+    for r in results:
+        lines.append('{0:<40} {1:>10.4f} {2:>10.4f} {3:>12.1f} {4:>12}'.format(
+            r.name, r.median, r.p95, r.throughput,
+            '-' if r.peak_memory is None else r.peak_memory // 1024))
+    return '\n'.join(lines)
@@ -0,0 +1,203 @@
+"""
+An asyncio facade over a synchronous provider. Requires Python 3.5 or later.
+
+Since the underlying provider SDKs are blocking, each call is run on a
+bounded thread pool and exposed to the event loop as an awaitable future.
+This allows a single event loop to drive many concurrent cloud operations
+without the caller managing threads directly.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import functools
+
+from cloudbridge.cloud.interfaces.resources import PageableObjectMixin
+from cloudbridge.cloud.interfaces.services import CloudService
+
+DEFAULT_ASYNC_MAX_WORKERS = 20
+
+
+class AsyncCloudProvider(object):
+    """
+    Wraps a :class:`.CloudProvider` so that all service methods return
+    awaitables instead of blocking. For example:
+
+    .. code-block:: python
+
+        aprovider = AsyncCloudProvider(provider)
+        volumes = await asyncio.gather(
+            *[aprovider.block_store.volumes.create(name, 1, zone)
+              for name in names])
+        async for inst in aprovider.compute.instances:
+            print(inst.id)
+
+    The returned resources are the regular synchronous resources of the
+    wrapped provider, so methods invoked directly on them (e.g.
+    ``wait_till_ready()``) will block. Such calls can be offloaded through
+    :meth:`run`.
+    """
+
+    def __init__(self, provider, executor=None, max_workers=None, loop=None):
+        """
+        :type provider: :class:`.CloudProvider`
+        :param provider: The synchronous provider to wrap.
+
+        :type executor: :class:`concurrent.futures.Executor`
+        :param executor: The executor to run blocking calls on. If not
+                         specified, a thread pool with ``max_workers``
+                         threads is created and owned by this provider.
+
+        :type max_workers: ``int``
+        :param max_workers: The maximum number of concurrent blocking calls
+                            when no executor is supplied. Defaults to the
+                            ``async_max_workers`` config value, or
+                            DEFAULT_ASYNC_MAX_WORKERS.
+
+        :type loop: :class:`asyncio.AbstractEventLoop`
+        :param loop: The event loop to attach futures to. If not specified,
+                     the current event loop at the time of each call is used.
+        """
+        self._provider = provider
+        self._loop = loop
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers or provider.config.get(
+                    'async_max_workers', DEFAULT_ASYNC_MAX_WORKERS))
+        self._executor = executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def provider(self):
+        """
+        Returns the wrapped synchronous provider.
+
+        :rtype: :class:`.CloudProvider`
+        """
+        return self._provider
+
+    @property
+    def loop(self):
+        return self._loop or asyncio.get_event_loop()
+
+    @property
+    def compute(self):
+        return AsyncServiceProxy(self, self._provider.compute)
+
+    @property
+    def block_store(self):
+        return AsyncServiceProxy(self, self._provider.block_store)
+
+    @property
+    def object_store(self):
+        return AsyncServiceProxy(self, self._provider.object_store)
+
+    @property
+    def network(self):
+        return AsyncServiceProxy(self, self._provider.network)
+
+    @property
+    def security(self):
+        return AsyncServiceProxy(self, self._provider.security)
+
+    def run(self, func, *args, **kwargs):
+        """
+        Runs an arbitrary blocking callable on this provider's executor.
+
+        :rtype: :class:`asyncio.Future`
+        :return: A future which resolves to the return value of ``func``.
+        """
+        return self.loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self, wait=True):
+        """
+        Shuts down the executor if it was created by this provider.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+
+class AsyncServiceProxy(object):
+    """
+    Exposes the methods of a synchronous service as coroutine-like functions
+    returning futures. Nested services (e.g. ``compute.instances``) are
+    wrapped in turn, and pageable services additionally support
+    ``async for``.
+    """
+
+    def __init__(self, aprovider, service):
+        self._aprovider = aprovider
+        self._service = service
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if isinstance(attr, CloudService):
+            return AsyncServiceProxy(self._aprovider, attr)
+        elif callable(attr):
+            return functools.partial(self._aprovider.run, attr)
+        return attr
+
+    def __aiter__(self):
+        if not isinstance(self._service, PageableObjectMixin):
+            raise TypeError("Service {0} is not iterable".format(
+                self._service))
+        return AsyncPageIterator(self._aprovider, self._service)
+
+    def __repr__(self):
+        return "<CB-{0}: {1}>".format(self.__class__.__name__,
+                                      self._service.__class__.__name__)
+
+
+class AsyncPageIterator(object):
+    """
+    An asynchronous iterator over all the objects of a pageable service.
+    Pages are fetched on the executor as they are needed, while objects
+    already fetched are returned without leaving the event loop.
+    """
+
+    def __init__(self, aprovider, pageable, limit=None):
+        self._aprovider = aprovider
+        self._pageable = pageable
+        self._limit = limit
+        self._buffer = collections.deque()
+        self._marker = None
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        result = self._aprovider.loop.create_future()
+        self._fill(result)
+        return result
+
+    def _fill(self, result):
+        if self._buffer:
+            result.set_result(self._buffer.popleft())
+        elif self._exhausted:
+            result.set_exception(StopAsyncIteration())
+        else:
+            page = self._aprovider.run(self._pageable.list,
+                                       limit=self._limit, marker=self._marker)
+            page.add_done_callback(
+                functools.partial(self._on_page, result=result))
+
+    def _on_page(self, page, result):
+        if result.cancelled():
+            return
+        if page.cancelled():
+            result.cancel()
+        elif page.exception():
+            result.set_exception(page.exception())
+        else:
+            objects = page.result()
+            self._buffer.extend(objects)
+            self._marker = objects.marker
+            self._exhausted = not (objects.is_truncated and objects.marker)
+            self._fill(result)
@@ -0,0 +1,91 @@
+"""
+Helpers for operations applied to many objects at once
+"""
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from cloudbridge.cloud.interfaces.resources import CloudBridgeBaseException
+
+
+class BatchResult(dict):
+    """
+    The outcome of a bulk operation, mapping the id of each object it was
+    applied to, to ``None`` if the operation succeeded for that object, or to
+    the exception raised if it failed.
+    """
+
+    __slots__ = ()
+
+    @property
+    def succeeded(self):
+        """
+        :rtype: ``list`` of ``str``
+        :return: The ids of the objects for which the operation succeeded.
+        """
+        return [obj_id for obj_id, error in self.items() if error is None]
+
+    @property
+    def failed(self):
+        """
+        :rtype: ``dict``
+        :return: The exception raised for each object, by id, for which the
+                 operation failed.
+        """
+        return {obj_id: error for obj_id, error in self.items()
+                if error is not None}
+
+    def __repr__(self):
+        return "<CB-{0}: {1} succeeded, {2} failed>".format(
+            self.__class__.__name__, len(self.succeeded), len(self.failed))
+
+
+def object_id(obj):
+    """
+    Returns the id of a CloudBridge object, or the object itself if it is
+    already an id.
+    """
+    return obj if isinstance(obj, six.string_types) else obj.id
+
+
+def apply_concurrently(func, objects, max_workers, lookup=None):
+    """
+    Calls ``func`` on each of the objects, on up to ``max_workers`` threads.
+
+    :type objects: ``list`` of CloudBridge objects or ``str`` ids
+    :param objects: The objects to apply ``func`` to. Ids are first looked
+                    up with ``lookup``.
+
+    :type lookup: ``callable``
+    :param lookup: Returns the object with a given id, or ``None`` if it
+                   does not exist.
+
+    :rtype: :class:`.BatchResult`
+    :return: The outcome for each object.
+    """
+    def apply(obj):
+        try:
+            if isinstance(obj, six.string_types):
+                found = lookup(obj)
+                if found is None:
+                    raise CloudBridgeBaseException(
+                        "Object {0} does not exist".format(obj))
+                obj = found
+            func(obj)
+        except Exception as e:
+            return e
+        return None
+
+    objects = list(objects)
+    workers = min(max_workers, len(objects))
+    if workers <= 1:
+        errors = [apply(obj) for obj in objects]
+    else:
+        pool = ThreadPool(workers)
+        try:
+            errors = pool.map(apply, objects)
+        finally:
+            pool.close()
+            pool.join()
+    return BatchResult(
+        (object_id(obj), error) for obj, error in zip(objects, errors))
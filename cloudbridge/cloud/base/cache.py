@@ -0,0 +1,223 @@
+"""
+A time and size bounded cache for the results of service lookups
+"""
+import collections
+import copy
+import functools
+import sys
+import threading
+import time
+
+import six
+
+from cloudbridge.cloud.interfaces.resources import CloudResource
+
+# Returned by ResourceCache.get() on a miss, since None is a valid result
+MISSING = object()
+
+
+class ResourceCache(object):
+    """
+    A thread-safe cache with a per-entry time to live and a least recently
+    used eviction policy. ``None`` values represent not found lookups and
+    are kept for ``negative_ttl`` seconds instead.
+
+    If ``coalesce`` is set, concurrent identical lookups are also
+    deduplicated through :meth:`load`, even when nothing is cached.
+    """
+
+    def __init__(self, ttl, max_size, negative_ttl=None, coalesce=False):
+        assert ttl >= 0
+        assert max_size > 0
+        self.ttl = ttl
+        self.max_size = max_size
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.coalesce = coalesce
+        self._entries = collections.OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Incremented on each invalidation, so that a lookup which started
+        # before a modification does not store its stale result afterwards
+        self._generation = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.time():
+                return MISSING
+            # re-insert to mark as most recently used
+            self._entries[key] = entry
+            return value
+
+    def put(self, key, value, generation=None):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def load(self, key, loader):
+        """
+        Calls ``loader`` and caches its result under ``key``. If a load of
+        the same key is already in progress on another thread, waits for it
+        instead and returns its result or raises its exception, so that
+        concurrent identical lookups make a single remote call. Loads which
+        started before the cache was last cleared are never joined.
+        """
+        with self._lock:
+            generation = self._generation
+            flight_key = (generation, key)
+            flight = self._in_flight.get(flight_key)
+            leader = flight is None and self.coalesce
+            if leader:
+                flight = self._in_flight[flight_key] = _Flight()
+        if flight is not None and not leader:
+            return flight.wait()
+        try:
+            value = loader()
+        except Exception:
+            if leader:
+                flight.fail(sys.exc_info())
+            raise
+        else:
+            if leader:
+                flight.succeed(value)
+        finally:
+            if leader:
+                with self._lock:
+                    del self._in_flight[flight_key]
+        self.put(key, value, generation)
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<CB-{0}: {1}s, {2}/{3}>".format(
+            self.__class__.__name__, self.ttl, len(self), self.max_size)
+
+
+class _Flight(object):
+    """
+    A lookup in progress, whose outcome is shared with the threads waiting
+    on it.
+    """
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._exc_info = None
+
+    def succeed(self, value):
+        self._value = value
+        self._done.set()
+
+    def fail(self, exc_info):
+        self._exc_info = exc_info
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._exc_info:
+            six.reraise(*self._exc_info)
+        return self._value
+
+
+def cached(func):
+    """
+    Caches the results of a service lookup method in the service's cache,
+    and shares a single call between concurrent identical lookups. The
+    decorated method accepts an additional ``bypass_cache`` keyword
+    argument, which forces a fresh lookup whose result replaces the cached
+    one. Calls with unhashable arguments are never cached or shared.
+
+    Each caller receives its own copy of a cached or shared result, so that
+    sorting a result list or refreshing a resource does not change what
+    other callers see. The SDK objects wrapped by resources are shared.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        bypass_cache = kwargs.pop('bypass_cache', False)
+        cache = self._cache
+        if not (cache.enabled or cache.coalesce) or (
+                bypass_cache and not cache.enabled):
+            return func(self, *args, **kwargs)
+        key = (func.__name__, args, frozenset(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return func(self, *args, **kwargs)
+        if bypass_cache:
+            # A lookup already in progress may have started before the
+            # change the caller wants to see, so is not joined
+            generation = cache.generation
+            value = func(self, *args, **kwargs)
+            cache.put(key, value, generation)
+            return _copy_result(value)
+        value = cache.get(key)
+        if value is MISSING:
+            value = cache.load(key, lambda: func(self, *args, **kwargs))
+        return _copy_result(value)
+    return wrapper
+
+
+def _copy_result(value):
+    """
+    Returns a copy of a resource or list of resources, with copies of the
+    resources, which is cheap since resources only hold references.
+    """
+    if isinstance(value, CloudResource):
+        return copy.copy(value)
+    if isinstance(value, list):
+        # Keeps the type and attributes of result lists, such as the marker
+        result = copy.copy(value)
+        result[:] = [copy.copy(item) if isinstance(item, CloudResource)
+                     else item for item in value]
+        return result
+    return value
+
+
+def invalidates_cache(*services):
+    """
+    Clears the cache of the given services after the decorated method
+    returns or raises. Services are given by their path from the provider,
+    e.g. ``'compute.images'``. If no services are given, the cache of the
+    service the method is bound to is cleared instead.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                if services:
+                    # pylint:disable=protected-access
+                    provider = self._provider
+                    for path in services:
+                        functools.reduce(getattr, path.split('.'),
+                                         provider).invalidate_cache()
+                else:
+                    self.invalidate_cache()
+        return wrapper
+    return decorator
@@ -0,0 +1,89 @@
+"""
+Helpers for queries made in several regions at once
+"""
+from multiprocessing.pool import ThreadPool
+
+
+class RegionalResults(object):
+    """
+    The results of a query made concurrently in a number of regions.
+
+    Iterating over the results yields a ``(region_name, item)`` pair for
+    each item returned by each region, as soon as that region has answered,
+    so that the results of fast regions are not held up by slow ones. The
+    queries are made when iteration starts, and the results can only be
+    iterated over once.
+
+    Regions in which the query failed do not end the iteration, and are
+    recorded in ``failed`` instead.
+    """
+
+    def __init__(self, results):
+        self._results = results
+        self._succeeded = []
+        self._failed = {}
+
+    def __iter__(self):
+        for region_name, items, error in self._results:
+            if error is not None:
+                self._failed[region_name] = error
+                continue
+            self._succeeded.append(region_name)
+            for item in items:
+                yield region_name, item
+
+    @property
+    def succeeded(self):
+        """
+        :rtype: ``list`` of ``str``
+        :return: The names of the regions which have answered so far, in
+                 the order in which they answered.
+        """
+        return list(self._succeeded)
+
+    @property
+    def failed(self):
+        """
+        :rtype: ``dict``
+        :return: The exception raised in each region in which the query has
+                 failed so far, by region name.
+        """
+        return dict(self._failed)
+
+    def __repr__(self):
+        return "<CB-{0}: {1} succeeded, {2} failed>".format(
+            self.__class__.__name__, len(self._succeeded), len(self._failed))
+
+
+def query_regions(provider, func, region_names, max_workers=None):
+    """
+    Calls ``func`` with the provider of each region concurrently, on up to
+    ``max_workers`` threads, or one thread per region if not given.
+
+    :type func: ``callable``
+    :param func: Receives the provider of a region and returns an iterable,
+                 which is read in full on the region's thread.
+
+    :rtype: :class:`.RegionalResults`
+    """
+    region_names = list(region_names)
+
+    def query(region_name):
+        try:
+            return (region_name,
+                    list(func(provider.for_region(region_name))), None)
+        except Exception as e:
+            return region_name, None, e
+
+    def results():
+        if not region_names:
+            return
+        pool = ThreadPool(min(max_workers or len(region_names),
+                              len(region_names)))
+        try:
+            for result in pool.imap_unordered(query, region_names):
+                yield result
+        finally:
+            pool.terminate()
+
+    return RegionalResults(results())
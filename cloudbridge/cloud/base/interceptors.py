@@ -0,0 +1,150 @@
+"""
+Hooks for observing and controlling the remote calls made by a provider.
+
+Providers route each request made by their SDK connections through a chain
+of interceptors. An interceptor is any callable accepting a
+:class:`RemoteCall` and a ``proceed`` function, which it must call (at most
+once per attempt) to carry out the request, returning its result:
+
+.. code-block:: python
+
+    def log_calls(call, proceed):
+        print(call.component, call.operation)
+        return proceed()
+
+    provider.add_interceptor(log_calls)
+"""
+import re
+
+# HTTP status codes with which services reject requests because of rate
+# or quota limits
+THROTTLE_STATUS_CODES = (413, 429, 503)
+
+# Error codes with which AWS reports throttled requests
+THROTTLE_ERROR_CODES = ('Throttling', 'ThrottlingException',
+                        'RequestLimitExceeded', 'SlowDown')
+
+# Path segments which identify a particular object, such as uuids and
+# numeric ids, and are therefore collapsed in operation names
+_ID_SEGMENT = re.compile(r'^([0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}'
+                         r'[0-9a-fA-F]{12}|[0-9a-fA-F]{32}|\d+)$')
+
+
+class RemoteCall(object):
+    """
+    Describes a single request made to a cloud service.
+    """
+
+    def __init__(self, component, operation, region=None):
+        """
+        :type component: ``str``
+        :param component: The connection making the request, such as
+                          ``ec2`` or ``nova``.
+
+        :type operation: ``str``
+        :param operation: The name of the remote operation, such as
+                          ``DescribeInstances`` or ``GET /servers/detail``.
+
+        :type region: ``str``
+        :param region: The region of the endpoint the request is sent to,
+                       if known.
+        """
+        self.component = component
+        self.operation = operation
+        self.region = region
+
+    def __repr__(self):
+        return "<CB-{0}: {1} {2}>".format(self.__class__.__name__,
+                                          self.component, self.operation)
+
+
+def invoke(interceptors, call, func):
+    """
+    Carries out ``func`` through the given interceptors, the first of which
+    is outermost.
+    """
+    def proceed(index):
+        if index == len(interceptors):
+            return func()
+        return interceptors[index](call, lambda: proceed(index + 1))
+    return proceed(0)
+
+
+def intercept_method(provider, component, target, name, operation,
+                     region=None):
+    """
+    Replaces the method ``name`` of the ``target`` connection object with one
+    which routes each call through the provider's interceptors. When no
+    interceptors are registered, the original method is called directly.
+
+    :type operation: ``callable``
+    :param operation: Receives the arguments of each call and returns the
+                      name of the remote operation.
+
+    :type region: ``str``
+    :param region: The region of the endpoint the connection sends its
+                   requests to.
+
+    :return: The ``target`` object.
+    """
+    original = getattr(target, name)
+
+    def wrapper(*args, **kwargs):
+        # pylint:disable=protected-access
+        interceptors = provider._interceptors
+        if not interceptors:
+            return original(*args, **kwargs)
+        call = RemoteCall(component, operation(*args, **kwargs), region)
+        return invoke(tuple(interceptors), call,
+                      lambda: original(*args, **kwargs))
+    setattr(target, name, wrapper)
+    return target
+
+
+def request_operation(method, url):
+    """
+    Returns a name for an HTTP request which does not vary between objects,
+    such as ``GET /servers/{id}``, by removing the host and query string and
+    collapsing ids.
+    """
+    path = url.split('?', 1)[0]
+    if '://' in path:
+        path = path.split('://', 1)[1].partition('/')[2]
+    if path.endswith('.json'):
+        path = path[:-len('.json')]
+    segments = ['{id}' if _ID_SEGMENT.match(segment) else segment
+                for segment in path.strip('/').split('/')]
+    return '{0} /{1}'.format(method.upper(), '/'.join(segments))
+
+
+def get_status_code(result):
+    """
+    Returns the HTTP status code of an SDK response or exception, or
+    ``None`` if it has none.
+    """
+    if isinstance(result, tuple) and result:
+        # OpenStack clients return a (response, body) tuple
+        result = result[0]
+    for attr in ('status', 'status_code', 'http_status', 'code'):
+        value = getattr(result, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_throttle(result):
+    """
+    Returns True if an SDK response or exception indicates that the request
+    was rejected because of rate or quota limits.
+    """
+    return (get_status_code(result) in THROTTLE_STATUS_CODES or
+            getattr(result, 'error_code', None) in THROTTLE_ERROR_CODES)
+
+
+def is_error(result):
+    """
+    Returns True if an SDK response indicates a failed request. Most SDKs
+    raise an exception instead, but boto returns the raw response.
+    """
+    status = get_status_code(result)
+    return status is not None and status >= 400
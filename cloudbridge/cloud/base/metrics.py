@@ -0,0 +1,211 @@
+"""
+Call counts and latencies for the remote calls made by a provider
+"""
+import bisect
+import threading
+import time
+
+from .interceptors import is_error
+from .interceptors import is_throttle
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+                           2.5, 5, 10)
+
+
+class MetricsSink(object):
+    """
+    Receives a measurement for each remote call made by a provider.
+    Sinks are shared between threads, so must be thread-safe.
+    """
+
+    def record(self, service, method, duration, error=False,
+               throttled=False):
+        """
+        Records a completed remote call.
+
+        :type service: ``str``
+        :param service: The connection that made the call, such as ``ec2``
+                        or ``nova``.
+
+        :type method: ``str``
+        :param method: The remote operation, such as ``DescribeInstances``.
+
+        :type duration: ``float``
+        :param duration: The number of seconds the call took.
+
+        :type error: ``bool``
+        :param error: Whether the call failed.
+
+        :type throttled: ``bool``
+        :param throttled: Whether the call was rejected because of rate or
+                          quota limits.
+        """
+        raise NotImplementedError('MetricsSink.record not implemented')
+
+
+class CallMetrics(object):
+    """
+    The aggregated measurements of a single remote operation.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.count = 0
+        self.errors = 0
+        self.throttles = 0
+        self.total_time = 0.0
+        # The number of calls in each bucket, with calls slower than the
+        # last bucket counted at the end
+        self.bucket_counts = [0] * (len(buckets) + 1)
+
+    def add(self, duration, error, throttled):
+        self.count += 1
+        self.errors += int(error)
+        self.throttles += int(throttled)
+        self.total_time += duration
+        self.bucket_counts[bisect.bisect_left(self.buckets, duration)] += 1
+
+    def cumulative_counts(self):
+        """
+        Returns the number of calls taking at most each bucket's upper
+        bound, as used by Prometheus histograms.
+        """
+        counts = []
+        total = 0
+        for count in self.bucket_counts[:-1]:
+            total += count
+            counts.append(total)
+        return counts
+
+    def __repr__(self):
+        return "<CB-{0}: {1} calls, {2} errors, {3} throttles>".format(
+            self.__class__.__name__, self.count, self.errors, self.throttles)
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """
+    Aggregates measurements in memory, per service and method.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def record(self, service, method, duration, error=False,
+               throttled=False):
+        with self._lock:
+            metrics = self._metrics.get((service, method))
+            if metrics is None:
+                metrics = self._metrics[(service, method)] = CallMetrics(
+                    self.buckets)
+            metrics.add(duration, error, throttled)
+
+    def get(self, service, method):
+        """
+        Returns the measurements of a remote operation, or ``None`` if it
+        has not been called.
+
+        :rtype: :class:`.CallMetrics`
+        """
+        return self._metrics.get((service, method))
+
+    @property
+    def metrics(self):
+        """
+        Returns all measurements, keyed by (service, method).
+
+        :rtype: ``dict``
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+class PrometheusMetricsSink(InMemoryMetricsSink):
+    """
+    Aggregates measurements in memory and exports them in the Prometheus
+    text exposition format, e.g. to be served from a ``/metrics`` endpoint.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS,
+                 namespace='cloudbridge'):
+        super(PrometheusMetricsSink, self).__init__(buckets)
+        self.namespace = namespace
+
+    def export(self):
+        """
+        Returns the current measurements in the Prometheus text format.
+
+        :rtype: ``str``
+        """
+        metrics = sorted(self.metrics.items())
+        lines = []
+
+        def counter(name, help_text, attr):
+            name = '{0}_{1}'.format(self.namespace, name)
+            lines.append('# HELP {0} {1}'.format(name, help_text))
+            lines.append('# TYPE {0} counter'.format(name))
+            for (service, method), m in metrics:
+                lines.append('{0}{{{1}}} {2}'.format(
+                    name, _labels(service, method), getattr(m, attr)))
+
+        counter('remote_calls_total', 'Remote calls made.', 'count')
+        counter('remote_call_errors_total', 'Remote calls which failed.',
+                'errors')
+        counter('remote_call_throttles_total',
+                'Remote calls rejected because of rate or quota limits.',
+                'throttles')
+
+        name = '{0}_remote_call_duration_seconds'.format(self.namespace)
+        lines.append('# HELP {0} Remote call latency.'.format(name))
+        lines.append('# TYPE {0} histogram'.format(name))
+        for (service, method), m in metrics:
+            labels = _labels(service, method)
+            for bound, count in zip(self.buckets, m.cumulative_counts()):
+                lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.format(
+                    name, labels, bound, count))
+            lines.append('{0}_bucket{{{1},le="+Inf"}} {2}'.format(
+                name, labels, m.count))
+            lines.append('{0}_sum{{{1}}} {2}'.format(
+                name, labels, m.total_time))
+            lines.append('{0}_count{{{1}}} {2}'.format(name, labels, m.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(service, method):
+    def escape(value):
+        return (value.replace('\\', '\\\\').replace('"', '\\"')
+                .replace('\n', '\\n'))
+    return 'service="{0}",method="{1}"'.format(
+        escape(service), escape(method))
+
+
+class MetricsInterceptor(object):
+    """
+    An interceptor which records the outcome and latency of each remote
+    call in a sink.
+    """
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __call__(self, call, proceed):
+        start = time.time()
+        try:
+            result = proceed()
+        except Exception as e:
+            self.sink.record(call.component, call.operation,
+                             time.time() - start, error=True,
+                             throttled=is_throttle(e))
+            raise
+        duration = time.time() - start
+        failed = is_error(result)
+        self.sink.record(call.component, call.operation, duration,
+                         error=failed,
+                         throttled=failed and is_throttle(result))
+        return result
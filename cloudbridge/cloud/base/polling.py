@@ -0,0 +1,113 @@
+"""
+Poll strategies used when waiting for objects to change state
+"""
+import random
+
+
+class PollStrategy(object):
+    """
+    Decides how long to sleep between successive state checks while waiting
+    for an object to reach a desired state. Strategies are stateless and may
+    be shared between concurrent waits. Any remaining timeout is applied by
+    the caller, so strategies need not be aware of it.
+    """
+
+    def next_interval(self, attempt, state):
+        """
+        Returns the number of seconds to sleep before the next refresh.
+
+        :type attempt: ``int``
+        :param attempt: The number of refreshes already carried out during the
+                        current wait, starting from 0.
+
+        :type state: ``str``
+        :param state: The last observed state of the object being waited on.
+
+        :rtype: ``float``
+        :return: The number of seconds to sleep.
+        """
+        raise NotImplementedError(
+            'PollStrategy.next_interval not implemented')
+
+
+class FixedIntervalPollStrategy(PollStrategy):
+    """
+    Polls at a constant interval. This is the default behaviour.
+    """
+
+    def __init__(self, interval):
+        assert interval >= 0
+        self.interval = interval
+
+    def next_interval(self, attempt, state):
+        return self.interval
+
+    def __repr__(self):
+        return "<CB-{0}: {1}s>".format(self.__class__.__name__,
+                                       self.interval)
+
+
+class ExponentialBackoffPollStrategy(PollStrategy):
+    """
+    Polls quickly at first and then backs off exponentially up to a maximum
+    interval, so that short transitions are detected early while long ones
+    do not waste requests. A random jitter is subtracted from each interval
+    so that many concurrent waiters do not poll in lockstep.
+    """
+
+    def __init__(self, initial=1, maximum=30, multiplier=2, jitter=0.25):
+        assert initial >= 0
+        assert maximum >= initial
+        assert multiplier >= 1
+        assert 0 <= jitter <= 1
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def next_interval(self, attempt, state):
+        interval = min(self.maximum,
+                       self.initial * self.multiplier ** attempt)
+        return interval * (1 - self.jitter * random.random())
+
+    def __repr__(self):
+        return "<CB-{0}: {1}s-{2}s>".format(self.__class__.__name__,
+                                            self.initial, self.maximum)
+
+
+class StateAwarePollStrategy(PollStrategy):
+    """
+    Uses a different strategy depending on the last observed state of the
+    object. For example, the following polls every second while an
+    instance is pending, since it will usually start shortly, and backs off
+    exponentially in any other state:
+
+    .. code-block:: python
+
+        StateAwarePollStrategy(
+            {InstanceState.PENDING: FixedIntervalPollStrategy(1)},
+            default=ExponentialBackoffPollStrategy())
+    """
+
+    def __init__(self, hints, default):
+        self.hints = hints
+        self.default = default
+
+    def next_interval(self, attempt, state):
+        return self.hints.get(state, self.default).next_interval(
+            attempt, state)
+
+    def __repr__(self):
+        return "<CB-{0}: {1}>".format(self.__class__.__name__,
+                                      sorted(self.hints))
+
+
+def get_poll_strategy(config, interval=None, poll_strategy=None):
+    """
+    Works out which strategy to use for a wait. An explicit interval always
+    takes precedence so that existing callers keep polling at a fixed rate,
+    followed by an explicit strategy and finally the provider's default.
+    """
+    if interval is not None:
+        return FixedIntervalPollStrategy(interval)
+    return poll_strategy or config.default_poll_strategy
@@ -0,0 +1,123 @@
+"""
+Pools of SDK connections which can be used safely from many threads
+"""
+import contextlib
+import threading
+
+
+class ConnectionPool(object):
+    """
+    Lazily creates SDK connections with ``factory`` and hands them out so
+    that no two threads use the same connection at the same time, since
+    most SDK clients are not thread-safe.
+
+    By default, each thread is bound to its own connection for its
+    lifetime, which :meth:`get` returns. When a thread exits, its
+    connection is returned to the pool and reused by the next thread which
+    needs one, keeping at most ``max_idle`` idle connections. Connections
+    can also be borrowed for the duration of a block with :meth:`checkout`.
+
+    ``max_idle`` only bounds the connections kept for reuse. The total
+    number of connections is not limited, and grows with the number of
+    threads using the pool at the same time, since a thread never waits
+    for a connection.
+
+    If ``per_thread`` is False, a single connection is created on first use
+    and shared by all threads. This suits clients which are thread-safe, or
+    whose creation is expensive and which are only used to authenticate.
+    """
+
+    def __init__(self, factory, max_idle, per_thread=True):
+        assert max_idle >= 0
+        self._factory = factory
+        self.max_idle = max_idle
+        self.per_thread = per_thread
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle = []
+        self._shared = None
+        # Incremented on each clear(), so that connections created before
+        # then are discarded instead of being returned to the pool
+        self._generation = 0
+
+    def get(self):
+        """
+        Returns the connection bound to the calling thread, creating one if
+        needed.
+        """
+        if not self.per_thread:
+            connection = self._shared
+            if connection is None:
+                with self._lock:
+                    if self._shared is None:
+                        self._shared = self._factory()
+                    connection = self._shared
+            return connection
+        binding = getattr(self._local, 'binding', None)
+        if binding is None or binding.generation != self._generation:
+            generation = self._generation
+            binding = _Binding(self, self._acquire(), generation)
+            self._local.binding = binding
+        return binding.connection
+
+    @contextlib.contextmanager
+    def checkout(self):
+        """
+        Borrows a connection which no other thread will use until the block
+        exits.
+        """
+        generation = self._generation
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._release(connection, generation)
+
+    def clear(self):
+        """
+        Discards all pooled connections, so that new ones are created on
+        next use. Connections bound to threads are replaced on their next
+        use.
+        """
+        with self._lock:
+            self._generation += 1
+            del self._idle[:]
+            self._shared = None
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        # Created outside the lock, so that slow connects do not hold up
+        # other threads
+        return self._factory()
+
+    def _release(self, connection, generation):
+        with self._lock:
+            if (generation == self._generation and
+                    len(self._idle) < self.max_idle):
+                self._idle.append(connection)
+
+    def __repr__(self):
+        return "<CB-{0}: {1} idle>".format(self.__class__.__name__,
+                                           self.idle_count)
+
+
+class _Binding(object):
+    """
+    Binds a connection to a thread, and returns it to the pool once the
+    thread exits and its thread-local data is discarded.
+    """
+
+    def __init__(self, pool, connection, generation):
+        self.pool = pool
+        self.connection = connection
+        self.generation = generation
+
+    def __del__(self):
+        # pylint:disable=protected-access
+        self.pool._release(self.connection, self.generation)
@@ -2,13 +2,37 @@
 Base implementation of a provider interface
 """
 import os
+import threading
+
+import six
 
 from cloudbridge.cloud.interfaces import CloudProvider
 from cloudbridge.cloud.interfaces.resources import Configuration
 
+from .batch import apply_concurrently
+from .fanout import query_regions
+from .interceptors import intercept_method
+from .metrics import MetricsInterceptor
+from .pool import ConnectionPool
+from .polling import FixedIntervalPollStrategy
+from .throttling import RateLimiter
+from .throttling import RetryBudget
+from .throttling import RetryPolicy
+from .throttling import ThrottlingInterceptor
+from .tracing import TracingInterceptor
+
 DEFAULT_RESULT_LIMIT = 50
 DEFAULT_WAIT_TIMEOUT = 600
 DEFAULT_WAIT_INTERVAL = 5
+DEFAULT_PREFETCH_DEPTH = 0
+DEFAULT_CACHE_TTL = 0
+DEFAULT_CACHE_MAX_SIZE = 1000
+DEFAULT_CONNECTION_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 0
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_BACKOFF = 20
+DEFAULT_RETRY_BUDGET = 0.2
+DEFAULT_BATCH_MAX_WORKERS = 10
 
 
 class BaseConfiguration(Configuration):
@@ -27,6 +51,16 @@ class BaseConfiguration(Configuration):
         """
         return self.get('default_result_limit', DEFAULT_RESULT_LIMIT)
 
+    @property
+    def default_prefetch_depth(self):
+        """
+        Gets the default number of pages to prefetch during iteration.
+
+        :rtype: ``int``
+        :return: The maximum number of pages to fetch ahead of the consumer
+        """
+        return self.get('default_prefetch_depth', DEFAULT_PREFETCH_DEPTH)
+
     @property
     def default_wait_timeout(self):
         """
@@ -41,6 +75,186 @@ class BaseConfiguration(Configuration):
         """
         return self.get('default_wait_interval', DEFAULT_WAIT_INTERVAL)
 
+    @property
+    def default_poll_strategy(self):
+        """
+        Gets the default poll strategy for LifeCycleObjects. Unless a
+        ``default_poll_strategy`` is supplied through the config, the
+        object's state is polled at the fixed ``default_wait_interval``.
+
+        :rtype: :class:`.PollStrategy`
+        :return: The strategy deciding how long to sleep between refreshes.
+        """
+        return self.get('default_poll_strategy') or \
+            FixedIntervalPollStrategy(self.default_wait_interval)
+
+    @property
+    def cache_ttl(self):
+        """
+        Gets the number of seconds for which service lookups are cached.
+
+        :rtype: ``int``
+        :return: The cache time to live. 0 disables caching.
+        """
+        return self.get('cache_ttl', DEFAULT_CACHE_TTL)
+
+    @property
+    def cache_max_size(self):
+        """
+        Gets the maximum number of cached lookups per service.
+
+        :rtype: ``int``
+        :return: The maximum number of entries in each service cache
+        """
+        return self.get('cache_max_size', DEFAULT_CACHE_MAX_SIZE)
+
+    @property
+    def cache_negative_ttl(self):
+        """
+        Gets the number of seconds for which not found lookups are cached.
+
+        :rtype: ``int``
+        :return: The negative cache time to live, which defaults to the
+                 cache_ttl if not set.
+        """
+        return self.get('cache_negative_ttl', self.cache_ttl)
+
+    @property
+    def connection_pool_size(self):
+        """
+        Gets the maximum number of idle connections kept for reuse, per
+        type of connection.
+
+        :rtype: ``int``
+        :return: The maximum number of idle connections in each pool.
+        """
+        return self.get('connection_pool_size', DEFAULT_CONNECTION_POOL_SIZE)
+
+    @property
+    def rate_limit(self):
+        """
+        Gets the number of remote calls per second allowed to each endpoint,
+        such as ``ec2`` or ``nova``. Individual endpoints can be given a
+        different limit through ``rate_limits``.
+
+        :rtype: ``float``
+        :return: The rate limit. 0 does not limit calls.
+        """
+        return self.get('rate_limit', 0)
+
+    @property
+    def rate_limit_burst(self):
+        """
+        Gets the number of calls which can be made to an endpoint at once
+        after a quiet period, regardless of the rate limit.
+
+        :rtype: ``int``
+        :return: The burst size, which defaults to one second's calls.
+        """
+        return self.get('rate_limit_burst')
+
+    @property
+    def max_retries(self):
+        """
+        Gets the number of times a throttled or transiently failed remote
+        call is retried.
+
+        :rtype: ``int``
+        :return: The maximum number of retries. 0 leaves retries to the
+                 SDKs.
+        """
+        return self.get('max_retries', DEFAULT_MAX_RETRIES)
+
+    @property
+    def retry_backoff(self):
+        """
+        Gets the maximum number of seconds to wait before the first retry of
+        a remote call, which doubles with each further retry.
+
+        :rtype: ``float``
+        :return: The initial backoff.
+        """
+        return self.get('retry_backoff', DEFAULT_RETRY_BACKOFF)
+
+    @property
+    def retry_max_backoff(self):
+        """
+        Gets the maximum number of seconds to wait before any retry.
+
+        :rtype: ``float``
+        :return: The backoff limit.
+        """
+        return self.get('retry_max_backoff', DEFAULT_RETRY_MAX_BACKOFF)
+
+    @property
+    def retry_budget(self):
+        """
+        Gets the number of retries allowed per remote call made, across all
+        calls made by the provider.
+
+        :rtype: ``float``
+        :return: The retry budget ratio. 0 does not limit retries beyond
+                 ``max_retries``.
+        """
+        return self.get('retry_budget', DEFAULT_RETRY_BUDGET)
+
+    @property
+    def coalesce_requests(self):
+        """
+        Gets whether concurrent identical lookups, such as two threads
+        getting the same image, share a single remote call.
+
+        :rtype: ``bool``
+        :return: Whether lookups are coalesced. Defaults to True.
+        """
+        return self.get('coalesce_requests', True)
+
+    @property
+    def batch_max_workers(self):
+        """
+        Gets the maximum number of concurrent requests made by bulk
+        operations, such as ``delete_many``, for objects which cannot be
+        handled in a single request.
+
+        :rtype: ``int``
+        :return: The maximum number of threads used by a bulk operation.
+        """
+        return self.get('batch_max_workers', DEFAULT_BATCH_MAX_WORKERS)
+
+    @property
+    def cache_dir(self):
+        """
+        Gets the directory in which data which changes rarely, such as
+        the catalog of instance types, is cached across processes.
+
+        :rtype: ``str``
+        :return: The cache directory, or ``None`` if nothing is cached on
+                 disk.
+        """
+        return self.get('cache_dir') or None
+
+    @property
+    def metrics_sink(self):
+        """
+        Gets the sink which receives the count and latency of every remote
+        call made by the provider.
+
+        :rtype: :class:`.MetricsSink`
+        :return: The metrics sink, or ``None`` if calls are not measured.
+        """
+        return self.get('metrics_sink')
+
+    @property
+    def tracer(self):
+        """
+        Gets the tracer which records a span for each service and resource
+        method call, and for each remote call made by the provider.
+
+        :rtype: :class:`.Tracer`
+        :return: The tracer, or ``None`` if calls are not traced.
+        """
+        return self.get('tracer')
+
     @property
     def debug_mode(self):
         """
@@ -61,6 +275,22 @@ class BaseCloudProvider(CloudProvider):
 
     def __init__(self, config):
         self._config = BaseConfiguration(config)
+        self._interceptors = []
+        # The providers for other regions, shared by all of them
+        self._region_views = {}
+        self._region_views_lock = threading.Lock()
+        throttling = self._throttling_interceptor()
+        # The SDKs retry failed requests out of sight of the interceptors,
+        # so they are left to do so only if the provider does not
+        self._sdk_retries = not (throttling and throttling.policy)
+        # Added first, so that the other interceptors see each attempt
+        if throttling:
+            self.add_interceptor(throttling)
+        if self._config.metrics_sink:
+            self.add_interceptor(MetricsInterceptor(self._config.metrics_sink))
+        self._tracer = self._config.tracer
+        if self._tracer:
+            self.add_interceptor(TracingInterceptor(self._tracer))
 
     @property
     def config(self):
@@ -87,6 +317,124 @@ class BaseCloudProvider(CloudProvider):
             pass  # Undefined service type
         return False
 
+    def tag_many(self, resources, tags):
+        return apply_concurrently(lambda resource: self._tag(resource, tags),
+                                  resources, self.config.batch_max_workers)
+
+    def for_region(self, region_name):
+        views = self._region_views
+        with self._region_views_lock:
+            views.setdefault(getattr(self, 'region_name', None), self)
+            view = views.get(region_name)
+        if view is None:
+            # Created outside the lock, since this may make remote calls,
+            # so that the views of several regions can be created at once
+            view = self._region_view(region_name)
+            with self._region_views_lock:
+                view = views.setdefault(region_name, view)
+        return view
+
+    def across_regions(self, func, regions=None, max_workers=None):
+        if regions is None:
+            regions = self.compute.regions
+        region_names = [region if isinstance(region, six.string_types)
+                        else region.name for region in regions]
+        return query_regions(self, func, region_names, max_workers)
+
+    def _region_view(self, region_name):
+        """
+        Returns a new provider for another region, which should be a copy of
+        this one with its own regional connections and services. Providers
+        which support several regions should override this method.
+        """
+        raise NotImplementedError(
+            "{0} does not support other regions".format(self.name))
+
+    def _tag(self, resource, tags):
+        """
+        Sets tags on a single resource. Providers which support tags should
+        override this method, or ``tag_many`` to tag resources in batches.
+        """
+        raise NotImplementedError(
+            "{0} does not support tagging {1}".format(self.name, resource))
+
+    def add_interceptor(self, interceptor):
+        """
+        Adds an interceptor through which all subsequent remote calls made by
+        this provider are routed. Interceptors added later run inside those
+        added earlier. See :mod:`cloudbridge.cloud.base.interceptors`.
+
+        :type interceptor: ``callable``
+        :param interceptor: A callable accepting a :class:`.RemoteCall` and
+                            a function which carries out the call.
+        """
+        self._interceptors.append(interceptor)
+
+    def remove_interceptor(self, interceptor):
+        """
+        Removes a previously added interceptor.
+        """
+        self._interceptors.remove(interceptor)
+
+    def _intercept(self, component, connection, method_name, operation,
+                   region=None):
+        """
+        Routes the calls made through a method of an SDK connection object
+        through this provider's interceptors. Providers should call this
+        for the method through which each connection sends its requests.
+
+        :type component: ``str``
+        :param component: A name for the connection, such as ``ec2``.
+
+        :type operation: ``callable``
+        :param operation: Receives the arguments of each call and returns
+                          the name of the remote operation.
+
+        :type region: ``str``
+        :param region: The region the connection sends its requests to, if
+                       they are not sent to the provider's region. Calls
+                       to each region are rate limited separately.
+
+        :return: The ``connection`` object.
+        """
+        return intercept_method(self, component, connection, method_name,
+                                operation,
+                                region or getattr(self, 'region_name', None))
+
+    def _connection_pool(self, factory, per_thread=True):
+        """
+        Returns a pool of connections created by ``factory``, keeping as
+        many idle connections as the config allows. Providers should hand
+        out SDK connections through pools, so that the provider can be
+        shared between threads.
+
+        :rtype: :class:`.ConnectionPool`
+        """
+        return ConnectionPool(factory, self.config.connection_pool_size,
+                              per_thread)
+
+    def _throttling_interceptor(self):
+        """
+        Returns an interceptor which rate limits and retries remote calls as
+        configured, or ``None`` if neither is enabled.
+
+        :rtype: :class:`.ThrottlingInterceptor`
+        """
+        config = self.config
+        limiter = None
+        if config.rate_limit or config.get('rate_limits'):
+            limiter = RateLimiter(config.rate_limit, config.rate_limit_burst,
+                                  config.get('rate_limits'))
+        policy = None
+        if config.max_retries:
+            budget = RetryBudget(config.retry_budget) \
+                if config.retry_budget else None
+            policy = RetryPolicy(config.max_retries, config.retry_backoff,
+                                 config.retry_max_backoff, budget)
+        if limiter or policy:
+            return ThrottlingInterceptor(limiter, policy)
+        return None
+
     def _get_config_value(self, key, default_value):
         """
         A convenience method to extract a configuration value.
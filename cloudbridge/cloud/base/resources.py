@@ -1,14 +1,17 @@
 """
 Base implementation for data objects exposed through a provider or service
 """
+import collections
 import inspect
-import itertools
 import json
 import logging
 import shutil
+import sys
+import threading
 import time
 
 import six
+from six.moves import queue
 
 from cloudbridge.cloud.interfaces.resources \
     import InvalidConfigurationException
@@ -39,12 +42,26 @@ from cloudbridge.cloud.interfaces.resources import Volume
 from cloudbridge.cloud.interfaces.resources import VolumeState
 from cloudbridge.cloud.interfaces.resources import WaitStateException
 
+from .batch import apply_concurrently
+from .cache import invalidates_cache
+from .polling import get_poll_strategy
+from .tracing import traced_class
+
 
 log = logging.getLogger(__name__)
 
 
 class BaseCloudResource(CloudResource):
 
+    __slots__ = ('__provider',)
+
+    def __new__(cls, provider=None, *args, **kwargs):
+        # The resources of providers with a tracer trace their methods
+        # pylint:disable=protected-access
+        if getattr(provider, '_tracer', None):
+            cls = traced_class(cls)
+        return super(BaseCloudResource, cls).__new__(cls)
+
     def __init__(self, provider):
         self.__provider = provider
 
@@ -52,11 +69,60 @@ class BaseCloudResource(CloudResource):
     def _provider(self):
         return self.__provider
 
+    # The properties included in the serialized form of this resource. Only
+    # properties which can be read from locally held data may be listed, so
+    # that serialization never results in a call to the provider. If None,
+    # all public properties are included.
+    JSON_FIELDS = None
+
+    def to_dict(self):
+        """
+        Returns a dictionary of the fields declared in JSON_FIELDS, which
+        can be serialized to JSON.
+        """
+        if self.JSON_FIELDS is None:
+            # Get all attributes but filter methods and private/magic ones
+            attr = inspect.getmembers(
+                self, lambda a: not(inspect.isroutine(a)))
+            return {k: v for(k, v) in attr if not k.startswith('_')}
+        return {field: getattr(self, field) for field in self.JSON_FIELDS}
+
     def to_json(self):
-        # Get all attributes but filter methods and private/magic ones
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        return json.dumps(js, sort_keys=True)
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    def to_record(self):
+        """
+        Returns an immutable, detached copy of the serializable fields of
+        this resource. See :meth:`.CloudResource.to_record`.
+        """
+        values = self.to_dict()
+        fields = tuple(sorted(values))
+        return _record_type(self.__class__.__name__, fields)(**values)
+
+
+# Record types created by BaseCloudResource.to_record, keyed by resource
+# class name and fields
+_record_types = {}
+
+
+def _record_type(class_name, fields):
+    key = (class_name, fields)
+    record_type = _record_types.get(key)
+    if record_type is None:
+        base = collections.namedtuple(class_name + 'Record', fields)
+
+        class Record(base):
+            __slots__ = ()
+
+            def to_dict(self):
+                return dict(self._asdict())
+
+            def to_json(self):
+                return json.dumps(self.to_dict(), sort_keys=True)
+
+        Record.__name__ = base.__name__
+        record_type = _record_types[key] = Record
+    return record_type
 
 
 class BaseObjectLifeCycleMixin(ObjectLifeCycleMixin):
@@ -68,40 +134,49 @@ class BaseObjectLifeCycleMixin(ObjectLifeCycleMixin):
     method, since the desired ready states are object specific.
     """
 
+    __slots__ = ()
+
     def wait_for(self, target_states, terminal_states=None, timeout=None,
-                 interval=None):
+                 interval=None, poll_strategy=None):
         if timeout is None:
             timeout = self._provider.config.default_wait_timeout
-        if interval is None:
-            interval = self._provider.config.default_wait_interval
 
         assert timeout >= 0
-        assert interval >= 0
-        assert timeout >= interval
+        if interval is not None:
+            assert interval >= 0
+            assert timeout >= interval
 
+        strategy = get_poll_strategy(self._provider.config, interval,
+                                     poll_strategy)
         end_time = time.time() + timeout
+        attempt = 0
 
-        while self.state not in target_states:
-            if self.state in (terminal_states or []):
+        # Read the state only once per iteration, since some providers
+        # compute it on the fly
+        state = self.state
+        while state not in target_states:
+            if state in (terminal_states or []):
                 raise WaitStateException(
                     "Object: {0} is in state: {1} which is a terminal state"
-                    " and cannot be waited on.".format(self, self.state))
-            else:
-                log.debug(
-                    "Object %s is in state: %s. Waiting another %s"
-                    " seconds to reach target state(s): %s...",
-                    self,
-                    self.state,
-                    int(end_time - time.time()),
-                    target_states)
-                time.sleep(interval)
-                if time.time() > end_time:
-                    raise WaitStateException(
-                        "Waited too long for object: {0} to become ready. It's"
-                        " still in state: {1}".format(self, self.state))
+                    " and cannot be waited on.".format(self, state))
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                raise WaitStateException(
+                    "Waited too long for object: {0} to become ready. It's"
+                    " still in state: {1}".format(self, state))
+            # Never sleep past the deadline, so that the last refresh happens
+            # just before the timeout expires
+            delay = min(strategy.next_interval(attempt, state), remaining)
+            log.debug(
+                "Object %s is in state: %s. Waiting %.1f seconds (%s seconds"
+                " left) to reach target state(s): %s...",
+                self, state, delay, int(remaining), target_states)
+            time.sleep(delay)
             self.refresh()
+            state = self.state
+            attempt += 1
         log.debug("Object: %s successfully reached target state: %s",
-                  self, self.state)
+                  self, state)
         return True
 
 
@@ -162,23 +237,82 @@ class ClientPagedResultList(BaseResultList):
     of the full result set entirely on the client side.
     """
 
-    def __init__(self, provider, objects, limit=None, marker=None):
+    def __init__(self, provider, objects, limit=None, marker=None,
+                 index=None):
+        """
+        :type objects: ``list``
+        :param objects: The full list of objects. The list is shared and
+                        not copied, so it must not be modified afterwards.
+
+        :type index: ``dict``
+        :param index: An optional mapping from object id to its position in
+                      ``objects``, as returned by :meth:`build_index`.
+                      Supplying an index turns the marker lookup into a
+                      constant time operation, so services which keep the
+                      full list between calls should keep its index too. If
+                      not supplied, one will be built lazily the first time
+                      it is needed by next_page().
+        """
+        self._provider = provider
         self._objects = objects
-        limit = limit or provider.config.default_result_limit
-        total_size = len(objects)
-        if marker:
-            from_marker = itertools.dropwhile(
-                lambda obj: not obj.id == marker, objects)
-            # skip one past the marker
-            next(from_marker, None)
-            objects = list(from_marker)
-        is_truncated = len(objects) > limit
-        results = list(itertools.islice(objects, limit))
+        self._index = index
+        self._limit = limit or provider.config.default_result_limit
+        start = self._position_after(marker) if marker else 0
+        end = start + self._limit
+        is_truncated = len(objects) > end
         super(ClientPagedResultList, self).__init__(
             is_truncated,
-            results[-1].id if is_truncated else None,
-            True, total=total_size,
-            data=results)
+            objects[end - 1].id if is_truncated else None,
+            True, total=len(objects),
+            data=objects[start:end])
+
+    def _position_after(self, marker):
+        if self._index is not None:
+            position = self._index.get(marker)
+        else:
+            # A single scan is cheaper than building an index for a one-off
+            # page, and avoids copying the tail of the list
+            position = next((i for i, obj in enumerate(self._objects)
+                             if obj.id == marker), None)
+        # an unknown marker yields an empty page
+        return len(self._objects) if position is None else position + 1
+
+    @property
+    def index(self):
+        """
+        Returns a mapping from object id to position in the full result set,
+        which is built once and shared with all subsequent pages.
+        """
+        if self._index is None:
+            self._index = self.build_index(self._objects)
+        return self._index
+
+    @staticmethod
+    def build_index(objects):
+        """
+        Returns a mapping from the id of each object to its position in
+        ``objects``.
+        """
+        index = {}
+        for i, obj in enumerate(objects):
+            # keep the first occurrence, consistent with a linear scan
+            index.setdefault(obj.id, i)
+        return index
+
+    def next_page(self):
+        """
+        Returns the next page of this result set without going back to the
+        provider. Walking through all pages this way takes linear time in
+        the total number of objects.
+
+        :rtype: :class:`ClientPagedResultList`
+        :return: The next page, or ``None`` if this is the last page.
+        """
+        if not self.is_truncated:
+            return None
+        return ClientPagedResultList(self._provider, self._objects,
+                                     limit=self._limit, marker=self.marker,
+                                     index=self.index)
 
     @property
     def supports_server_paging(self):
@@ -195,25 +329,84 @@ class BasePageableObjectMixin(PageableObjectMixin):
     that support a list(limit, marker) method.
     """
 
-    def __iter__(self):
-        marker = None
+    __slots__ = ()
 
-        result_list = self.list(marker=marker)
-        if result_list.supports_server_paging:
-            for result in result_list:
-                yield result
-            while result_list.is_truncated:
-                result_list = self.list(marker=marker)
-                for result in result_list:
-                    yield result
-                marker = result_list.marker
+    def __iter__(self):
+        return self.iterate()
+
+    def iterate(self, limit=None, prefetch=None):
+        if prefetch is None:
+            # pylint:disable=protected-access
+            prefetch = self._provider.config.default_prefetch_depth
+        assert prefetch >= 0
+        return self._iterate(limit, prefetch)
+
+    def _iterate(self, limit, prefetch):
+        result_list = self.list(limit=limit)
+        if not result_list.supports_server_paging:
+            pages = [result_list.data]
+        elif prefetch and result_list.is_truncated:
+            pages = self._iterate_prefetched(result_list, limit, prefetch)
         else:
-            for result in result_list.data:
+            pages = self._iterate_pages(result_list, limit)
+        for page in pages:
+            for result in page:
                 yield result
 
+    def _iterate_pages(self, result_list, limit):
+        yield result_list
+        while result_list.is_truncated:
+            result_list = self.list(limit=limit, marker=result_list.marker)
+            yield result_list
+
+    def _iterate_prefetched(self, result_list, limit, prefetch):
+        pages = queue.Queue(maxsize=prefetch)
+        stopped = threading.Event()
+
+        def put(item):
+            # Give up if the consumer stops iterating, instead of blocking
+            # forever on a full queue
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch_pages(marker):
+            try:
+                while marker:
+                    page = self.list(limit=limit, marker=marker)
+                    if not put(page):
+                        return
+                    marker = page.marker if page.is_truncated else None
+                put(None)
+            except Exception:  # pylint:disable=broad-except
+                put(sys.exc_info())
+
+        fetcher = threading.Thread(target=fetch_pages,
+                                   args=(result_list.marker,))
+        fetcher.daemon = True
+        fetcher.start()
+        try:
+            while result_list is not None:
+                yield result_list
+                result_list = pages.get()
+                if isinstance(result_list, tuple):
+                    six.reraise(*result_list)
+        finally:
+            stopped.set()
+
 
 class BaseInstanceType(InstanceType, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'family', 'vcpus', 'ram', 'size_root_disk',
+                   'size_ephemeral_disks', 'num_ephemeral_disks',
+                   'size_total_disk', 'extra_data')
+
     def __init__(self, provider):
         super(BaseInstanceType, self).__init__(provider)
 
@@ -234,6 +427,12 @@ class BaseInstanceType(InstanceType, BaseCloudResource):
 
 class BaseInstance(BaseCloudResource, BaseObjectLifeCycleMixin, Instance):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'state', 'public_ips', 'private_ips',
+                   'instance_type_id', 'image_id', 'zone_id',
+                   'security_group_ids', 'key_pair_name')
+
     def __init__(self, provider):
         super(BaseInstance, self).__init__(provider)
 
@@ -330,6 +529,10 @@ class BaseLaunchConfig(LaunchConfig):
 class BaseMachineImage(
         BaseCloudResource, BaseObjectLifeCycleMixin, MachineImage):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'description', 'state')
+
     def __init__(self, provider):
         super(BaseMachineImage, self).__init__(provider)
 
@@ -357,6 +560,8 @@ class BaseMachineImage(
 
 class BaseAttachmentInfo(AttachmentInfo):
 
+    __slots__ = ('_volume', '_instance_id', '_device')
+
     def __init__(self, volume, instance_id, device):
         self._volume = volume
         self._instance_id = instance_id
@@ -377,9 +582,22 @@ class BaseAttachmentInfo(AttachmentInfo):
 
 class BaseVolume(BaseCloudResource, BaseObjectLifeCycleMixin, Volume):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'description', 'size', 'create_time',
+                   'zone_id', 'state')
+
     def __init__(self, provider):
         super(BaseVolume, self).__init__(provider)
 
+    def to_dict(self):
+        js = super(BaseVolume, self).to_dict()
+        attachments = self.attachments
+        js['attachments'] = {
+            'instance_id': attachments.instance_id,
+            'device': attachments.device} if attachments else None
+        return js
+
     def __eq__(self, other):
         return (isinstance(other, Volume) and
                 # pylint:disable=protected-access
@@ -403,6 +621,11 @@ class BaseVolume(BaseCloudResource, BaseObjectLifeCycleMixin, Volume):
 
 class BaseSnapshot(BaseCloudResource, BaseObjectLifeCycleMixin, Snapshot):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'description', 'size', 'volume_id',
+                   'create_time', 'state')
+
     def __init__(self, provider):
         super(BaseSnapshot, self).__init__(provider)
 
@@ -429,6 +652,10 @@ class BaseSnapshot(BaseCloudResource, BaseObjectLifeCycleMixin, Snapshot):
 
 class BaseKeyPair(KeyPair, BaseCloudResource):
 
+    __slots__ = ('_key_pair',)
+
+    JSON_FIELDS = ('id', 'name', 'material')
+
     def __init__(self, provider, key_pair):
         super(BaseKeyPair, self).__init__(provider)
         self._key_pair = key_pair
@@ -453,6 +680,7 @@ class BaseKeyPair(KeyPair, BaseCloudResource):
         """
         return self._key_pair.name
 
+    @invalidates_cache('security.key_pairs')
     def delete(self):
         """
         Delete this KeyPair.
@@ -470,6 +698,10 @@ class BaseKeyPair(KeyPair, BaseCloudResource):
 
 class BaseSecurityGroup(SecurityGroup, BaseCloudResource):
 
+    __slots__ = ('_security_group',)
+
+    JSON_FIELDS = ('id', 'name', 'description')
+
     def __init__(self, provider, security_group):
         super(BaseSecurityGroup, self).__init__(provider)
         self._security_group = security_group
@@ -511,12 +743,27 @@ class BaseSecurityGroup(SecurityGroup, BaseCloudResource):
         """
         return self._security_group.description
 
+    @invalidates_cache('security.security_groups')
     def delete(self):
         """
         Delete this security group.
         """
         return self._security_group.delete()
 
+    @property
+    def _local_rules(self):
+        """
+        Returns the rules of this group as currently held locally, without
+        fetching the latest rules from the provider. Providers whose rules
+        property makes a remote call should override this.
+        """
+        return self.rules
+
+    def to_dict(self):
+        js = super(BaseSecurityGroup, self).to_dict()
+        js['rules'] = [rule.to_dict() for rule in self._local_rules]
+        return js
+
     def __repr__(self):
         return "<CB-{0}: {1}>".format(self.__class__.__name__,
                                       self.id)
@@ -524,11 +771,31 @@ class BaseSecurityGroup(SecurityGroup, BaseCloudResource):
 
 class BaseSecurityGroupRule(SecurityGroupRule, BaseCloudResource):
 
+    __slots__ = ('_rule', 'parent')
+
+    JSON_FIELDS = ('id', 'ip_protocol', 'from_port', 'to_port', 'cidr_ip')
+
     def __init__(self, provider, rule, parent):
         super(BaseSecurityGroupRule, self).__init__(provider)
         self._rule = rule
         self.parent = parent
 
+    @property
+    def _group_id(self):
+        """
+        Returns the id of the source group of this rule, a blank string if
+        there is none, or ``None`` if the rule has a source group whose id
+        cannot be determined. Providers should override this to avoid
+        looking up the group itself.
+        """
+        return self.group.id if self.group else ''
+
+    def to_dict(self):
+        js = super(BaseSecurityGroupRule, self).to_dict()
+        js['group'] = self._group_id
+        js['parent'] = self.parent.id if self.parent else ''
+        return js
+
     def __repr__(self):
         return ("<CBSecurityGroupRule: IP: {0}; from: {1}; to: {2}; grp: {3}>"
                 .format(self.ip_protocol, self.from_port, self.to_port,
@@ -557,6 +824,10 @@ class BaseSecurityGroupRule(SecurityGroupRule, BaseCloudResource):
 
 class BasePlacementZone(PlacementZone, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'region_name')
+
     def __init__(self, provider):
         super(BasePlacementZone, self).__init__(provider)
 
@@ -573,6 +844,10 @@ class BasePlacementZone(PlacementZone, BaseCloudResource):
 
 class BaseRegion(Region, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name')
+
     def __init__(self, provider):
         super(BaseRegion, self).__init__(provider)
 
@@ -586,15 +861,13 @@ class BaseRegion(Region, BaseCloudResource):
                 self._provider == other._provider and
                 self.id == other.id)
 
-    def to_json(self):
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        js['zones'] = [z.name for z in self.zones]
-        return json.dumps(js, sort_keys=True)
-
 
 class BaseBucketObject(BucketObject, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'size', 'last_modified')
+
     def __init__(self, provider):
         super(BaseBucketObject, self).__init__(provider)
 
@@ -620,9 +893,18 @@ class BaseBucketObject(BucketObject, BaseCloudResource):
 
 class BaseBucket(BasePageableObjectMixin, Bucket, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name')
+
     def __init__(self, provider):
         super(BaseBucket, self).__init__(provider)
 
+    def delete_many(self, objects):
+        return apply_concurrently(lambda obj: obj.delete(), objects,
+                                  self._provider.config.batch_max_workers,
+                                  self.get)
+
     def __eq__(self, other):
         return (isinstance(other, Bucket) and
                 # pylint:disable=protected-access
@@ -638,6 +920,10 @@ class BaseBucket(BasePageableObjectMixin, Bucket, BaseCloudResource):
 
 class BaseNetwork(BaseCloudResource, Network, BaseObjectLifeCycleMixin):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'state', 'cidr_block')
+
     def __init__(self, provider):
         super(BaseNetwork, self).__init__(provider)
 
@@ -661,6 +947,10 @@ class BaseNetwork(BaseCloudResource, Network, BaseObjectLifeCycleMixin):
 
 class BaseSubnet(Subnet, BaseCloudResource):
 
+    __slots__ = ()
+
+    JSON_FIELDS = ('id', 'name', 'cidr_block', 'network_id')
+
     def __init__(self, provider):
         super(BaseSubnet, self).__init__(provider)
 
@@ -673,3 +963,30 @@ class BaseSubnet(Subnet, BaseCloudResource):
                 # pylint:disable=protected-access
                 self._provider == other._provider and
                 self.id == other.id)
+
+
+def serialize_many(resources, stream=None):
+    """
+    Serializes a collection of resources to a JSON array. Each resource is
+    serialized from its declared JSON_FIELDS, so that no calls are made to
+    the provider.
+
+    :type resources: iterable of :class:`.CloudResource`
+    :param resources: The resources to serialize.
+
+    :type stream: file-like object
+    :param stream: If specified, the array is written to this stream one
+                   resource at a time instead of being built in memory.
+
+    :rtype: ``str``
+    :return: The JSON array, or ``None`` if a stream was specified.
+    """
+    if stream is None:
+        return json.dumps([resource.to_dict() for resource in resources],
+                          sort_keys=True)
+    stream.write('[')
+    for i, resource in enumerate(resources):
+        if i:
+            stream.write(', ')
+        stream.write(json.dumps(resource.to_dict(), sort_keys=True))
+    stream.write(']')
@@ -1,6 +1,10 @@
 """
 Base implementation for services available through a provider
 """
+import logging
+import time
+
+from cloudbridge.cloud.interfaces.resources import WaitStateException
 from cloudbridge.cloud.interfaces.services import BlockStoreService
 from cloudbridge.cloud.interfaces.services import CloudService
 from cloudbridge.cloud.interfaces.services import ComputeService
@@ -9,6 +13,8 @@ from cloudbridge.cloud.interfaces.services import InstanceService
 from cloudbridge.cloud.interfaces.services import InstanceTypesService
 from cloudbridge.cloud.interfaces.services import KeyPairService
 from cloudbridge.cloud.interfaces.services import NetworkService
+from cloudbridge.cloud.interfaces.services import \
+    ObjectLifeCycleServiceMixin
 from cloudbridge.cloud.interfaces.services import ObjectStoreService
 from cloudbridge.cloud.interfaces.services import RegionService
 from cloudbridge.cloud.interfaces.services import SecurityGroupService
@@ -16,18 +22,129 @@ from cloudbridge.cloud.interfaces.services import SecurityService
 from cloudbridge.cloud.interfaces.services import SnapshotService
 from cloudbridge.cloud.interfaces.services import SubnetService
 from cloudbridge.cloud.interfaces.services import VolumeService
+from .batch import apply_concurrently
+from .cache import ResourceCache
+from .cache import invalidates_cache
+from .polling import get_poll_strategy
 from .resources import BasePageableObjectMixin
+from .tracing import traced_class
+
+
+log = logging.getLogger(__name__)
 
 
 class BaseCloudService(CloudService):
 
+    # The path to this service from the provider (e.g. 'compute.images'),
+    # which identifies its cache in the config. Results are only cached for
+    # services which set a name and decorate their lookups with @cached.
+    _cache_name = None
+
+    def __new__(cls, provider=None, *args, **kwargs):
+        # The services of providers with a tracer trace their methods
+        # pylint:disable=protected-access
+        if getattr(provider, '_tracer', None):
+            cls = traced_class(cls)
+        return super(BaseCloudService, cls).__new__(cls)
+
     def __init__(self, provider):
         self._provider = provider
+        config = provider.config
+        ttl = 0
+        if self._cache_name:
+            ttl = config.get('cache_ttls', {}).get(self._cache_name,
+                                                   config.cache_ttl)
+        self._cache = ResourceCache(ttl, config.cache_max_size,
+                                    config.cache_negative_ttl,
+                                    config.coalesce_requests)
 
     @property
     def provider(self):
         return self._provider
 
+    def invalidate_cache(self):
+        self._cache.clear()
+
+    def _apply_many(self, func, objects):
+        """
+        Calls ``func`` concurrently on each of the given objects managed by
+        this service, looking up any ids given instead of objects.
+
+        :rtype: :class:`.BatchResult`
+        """
+        return apply_concurrently(func, objects,
+                                  self.provider.config.batch_max_workers,
+                                  self.get)
+
+
+class BaseObjectLifeCycleServiceMixin(ObjectLifeCycleServiceMixin):
+    """
+    A base implementation of an ObjectLifeCycleServiceMixin.
+    This base implementation polls all pending objects till each one
+    reaches a target or terminal state. By default, pending objects are
+    refreshed one at a time, so subclasses should override _refresh_many
+    to refresh all of them with a single batched request.
+    """
+
+    def wait_for_many(self, objects, target_states, terminal_states=None,
+                      timeout=None, interval=None, poll_strategy=None):
+        if timeout is None:
+            timeout = self.provider.config.default_wait_timeout
+
+        assert timeout >= 0
+        if interval is not None:
+            assert interval >= 0
+            assert timeout >= interval
+
+        strategy = get_poll_strategy(self.provider.config, interval,
+                                     poll_strategy)
+        # Validate eagerly and only defer the actual polling till the caller
+        # starts iterating.
+        return self._wait_for_many(list(objects), target_states,
+                                   terminal_states or [], timeout, strategy)
+
+    def _wait_for_many(self, pending, target_states, terminal_states,
+                       timeout, strategy):
+        end_time = time.time() + timeout
+        attempt = 0
+
+        while True:
+            still_pending = []
+            pending_states = set()
+            for obj in pending:
+                state = obj.state
+                if state in target_states or state in terminal_states:
+                    yield obj
+                else:
+                    still_pending.append(obj)
+                    pending_states.add(state)
+            pending = still_pending
+            if not pending:
+                break
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                raise WaitStateException(
+                    "Waited too long for objects: {0} to become ready. They"
+                    " are still in states: {1}".format(
+                        pending, [obj.state for obj in pending]))
+            delay = min(min(strategy.next_interval(attempt, state)
+                            for state in pending_states), remaining)
+            log.debug(
+                "%s objects are yet to reach target state(s): %s. Waiting"
+                " %.1f seconds (%s seconds left)...", len(pending),
+                target_states, delay, int(remaining))
+            time.sleep(delay)
+            self._refresh_many(pending)
+            attempt += 1
+
+    def _refresh_many(self, objects):
+        """
+        Refreshes the state of all the given objects. Providers should
+        override this method to use a single batched request.
+        """
+        for obj in objects:
+            obj.refresh()
+
 
 class BaseComputeService(ComputeService, BaseCloudService):
 
@@ -36,18 +153,26 @@ class BaseComputeService(ComputeService, BaseCloudService):
 
 
 class BaseVolumeService(
-        BasePageableObjectMixin, VolumeService, BaseCloudService):
+        BasePageableObjectMixin, BaseObjectLifeCycleServiceMixin,
+        VolumeService, BaseCloudService):
 
     def __init__(self, provider):
         super(BaseVolumeService, self).__init__(provider)
 
+    def delete_many(self, volumes):
+        return self._apply_many(lambda vol: vol.delete(), volumes)
+
 
 class BaseSnapshotService(
-        BasePageableObjectMixin, SnapshotService, BaseCloudService):
+        BasePageableObjectMixin, BaseObjectLifeCycleServiceMixin,
+        SnapshotService, BaseCloudService):
 
     def __init__(self, provider):
         super(BaseSnapshotService, self).__init__(provider)
 
+    def delete_many(self, snapshots):
+        return self._apply_many(lambda snap: snap.delete(), snapshots)
+
 
 class BaseBlockStoreService(BlockStoreService, BaseCloudService):
 
@@ -56,7 +181,10 @@ class BaseBlockStoreService(BlockStoreService, BaseCloudService):
 
 
 class BaseImageService(
-        BasePageableObjectMixin, ImageService, BaseCloudService):
+        BasePageableObjectMixin, BaseObjectLifeCycleServiceMixin,
+        ImageService, BaseCloudService):
+
+    _cache_name = 'compute.images'
 
     def __init__(self, provider):
         super(BaseImageService, self).__init__(provider)
@@ -78,9 +206,12 @@ class BaseSecurityService(SecurityService, BaseCloudService):
 class BaseKeyPairService(
         BasePageableObjectMixin, KeyPairService, BaseCloudService):
 
+    _cache_name = 'security.key_pairs'
+
     def __init__(self, provider):
         super(BaseKeyPairService, self).__init__(provider)
 
+    @invalidates_cache()
     def delete(self, key_pair_id):
         """
         Delete an existing key pair.
@@ -102,13 +233,20 @@ class BaseKeyPairService(
 class BaseSecurityGroupService(
         BasePageableObjectMixin, SecurityGroupService, BaseCloudService):
 
+    _cache_name = 'security.security_groups'
+
     def __init__(self, provider):
         super(BaseSecurityGroupService, self).__init__(provider)
 
+    def for_instances(self, instances):
+        return {inst.id: inst.security_groups for inst in instances}
+
 
 class BaseInstanceTypesService(
         BasePageableObjectMixin, InstanceTypesService, BaseCloudService):
 
+    _cache_name = 'compute.instance_types'
+
     def __init__(self, provider):
         super(BaseInstanceTypesService, self).__init__(provider)
 
@@ -126,15 +264,46 @@ class BaseInstanceTypesService(
 
 
 class BaseInstanceService(
-        BasePageableObjectMixin, InstanceService, BaseCloudService):
+        BasePageableObjectMixin, BaseObjectLifeCycleServiceMixin,
+        InstanceService, BaseCloudService):
 
     def __init__(self, provider):
         super(BaseInstanceService, self).__init__(provider)
 
+    def create_many(self, count, name_template, image, instance_type,
+                    zone=None, key_pair=None, security_groups=None,
+                    user_data=None, launch_config=None, tags=None,
+                    **kwargs):
+        names = [name_template.format(index) for index in range(count)]
+        return self._create_many(names, image, instance_type, zone,
+                                 key_pair, security_groups, user_data,
+                                 launch_config, tags, **kwargs)
+
+    def _create_many(self, names, image, instance_type, zone=None,
+                     key_pair=None, security_groups=None, user_data=None,
+                     launch_config=None, tags=None, **kwargs):
+        """
+        Creates an instance for each of the given names. Providers should
+        override this method to launch all the instances with a single
+        request.
+        """
+        return [self.create(name, image, instance_type, zone, key_pair,
+                            security_groups, user_data, launch_config,
+                            tags, **kwargs)
+                for name in names]
+
+    def terminate_many(self, instances):
+        return self._apply_many(lambda inst: inst.terminate(), instances)
+
+    def reboot_many(self, instances):
+        return self._apply_many(lambda inst: inst.reboot(), instances)
+
 
 class BaseRegionService(
         BasePageableObjectMixin, RegionService, BaseCloudService):
 
+    _cache_name = 'compute.regions'
+
     def __init__(self, provider):
         super(BaseRegionService, self).__init__(provider)
 
@@ -142,9 +311,12 @@ class BaseRegionService(
 class BaseNetworkService(
         BasePageableObjectMixin, NetworkService, BaseCloudService):
 
+    _cache_name = 'network'
+
     def __init__(self, provider):
         super(BaseNetworkService, self).__init__(provider)
 
+    @invalidates_cache()
     def delete(self, network_id):
         network = self.get(network_id)
         if network:
@@ -155,5 +327,7 @@ class BaseNetworkService(
 class BaseSubnetService(
         BasePageableObjectMixin, SubnetService, BaseCloudService):
 
+    _cache_name = 'network.subnets'
+
     def __init__(self, provider):
         super(BaseSubnetService, self).__init__(provider)
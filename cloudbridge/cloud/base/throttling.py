@@ -0,0 +1,303 @@
+"""
+Client-side rate limiting and retrying of throttled and failed remote calls.
+
+A :class:`ThrottlingInterceptor` limits the rate at which requests are sent
+to each endpoint with a :class:`RateLimiter`, and retries the requests which
+a :class:`RetryPolicy` deems safe to retry, backing off exponentially
+between attempts.
+"""
+import errno
+import random
+import threading
+import time
+
+from .interceptors import get_status_code
+from .interceptors import is_error
+from .interceptors import is_throttle
+
+# HTTP status codes of failures which are likely to be temporary
+TRANSIENT_STATUS_CODES = (500, 502, 504)
+
+# Names of the exception classes with which the SDKs and the libraries they
+# use report dropped connections and timeouts
+TRANSIENT_ERROR_NAMES = ('ConnectionError', 'ConnectFailure',
+                         'ConnectTimeout', 'ReadTimeout', 'Timeout',
+                         'timeout', 'BadStatusLine', 'IncompleteRead')
+
+TRANSIENT_ERRNOS = (errno.ECONNRESET, errno.ECONNREFUSED, errno.ECONNABORTED,
+                    errno.ETIMEDOUT, errno.EPIPE)
+
+# HTTP status codes and AWS error codes with which services reject requests
+# before carrying them out. A 503 may also be returned by a request which has
+# taken effect, so it does not count.
+REJECTED_STATUS_CODES = (413, 429)
+REJECTED_ERROR_CODES = ('RequestLimitExceeded', 'Throttling')
+
+# HTTP methods which can be repeated without changing their effect
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Prefixes of AWS actions which only read state
+IDEMPOTENT_ACTION_PREFIXES = ('Describe', 'Get', 'List')
+
+
+def is_transient(result):
+    """
+    Returns True if an SDK response or exception indicates a failure which
+    may not recur if the request is repeated, such as a dropped connection.
+    """
+    if get_status_code(result) in TRANSIENT_STATUS_CODES:
+        return True
+    if not isinstance(result, Exception):
+        return False
+    if getattr(result, 'errno', None) in TRANSIENT_ERRNOS:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES
+               for cls in type(result).__mro__)
+
+
+def is_rejected(result):
+    """
+    Returns True if an SDK response or exception indicates that a request
+    was rejected without being carried out, so that it can be repeated even
+    if it changes state.
+    """
+    return (get_status_code(result) in REJECTED_STATUS_CODES or
+            getattr(result, 'error_code', None) in REJECTED_ERROR_CODES)
+
+
+def is_idempotent(operation):
+    """
+    Returns True if a remote operation can be repeated without changing its
+    effect, judging by its HTTP method, such as in ``GET /servers/{id}``, or
+    its name, such as ``DescribeInstances`` or ``get_container``.
+    """
+    verb = operation.replace('_', ' ').split(' ', 1)[0]
+    return (verb.upper() in IDEMPOTENT_METHODS or
+            verb.startswith(IDEMPOTENT_ACTION_PREFIXES))
+
+
+class TokenBucket(object):
+    """
+    Allows calls at a sustained ``rate`` per second, with bursts of up to
+    ``burst`` calls.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        assert rate > 0
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst or rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def acquire(self):
+        """
+        Takes a token, sleeping until one is available.
+
+        :rtype: ``float``
+        :return: The number of seconds slept.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            # Tokens are taken in advance, so that threads waiting for one
+            # sleep outside the lock and are served in turn
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter(object):
+    """
+    Keeps a separate token bucket for each endpoint, that is for each
+    component, such as ``ec2`` or ``nova``, in each region, since clouds
+    limit the rate of requests to each region separately.
+    """
+
+    def __init__(self, rate, burst=None, rates=None, clock=time.time,
+                 sleep=time.sleep):
+        """
+        :type rate: ``float``
+        :param rate: The number of calls allowed per second to each
+                     endpoint. 0 or ``None`` does not limit calls.
+
+        :type rates: ``dict``
+        :param rates: Overrides the rate of individual components, in every
+                      region.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.rates = rates or {}
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def acquire(self, component, region=None):
+        """
+        Waits until a call to the given component in the given region is
+        allowed.
+
+        :rtype: ``float``
+        :return: The number of seconds waited.
+        """
+        endpoint = (component, region)
+        try:
+            bucket = self._buckets[endpoint]
+        except KeyError:
+            with self._lock:
+                if endpoint not in self._buckets:
+                    rate = self.rates.get(component, self.rate)
+                    self._buckets[endpoint] = TokenBucket(
+                        rate, self.burst, self._clock,
+                        self._sleep) if rate else None
+                bucket = self._buckets[endpoint]
+        return bucket.acquire() if bucket else 0
+
+
+class RetryBudget(object):
+    """
+    Limits the number of retries to a fraction of the calls made, so that
+    when a service is struggling, retries add little to its load.
+    """
+
+    def __init__(self, ratio, reserve=10):
+        """
+        :type ratio: ``float``
+        :param ratio: The number of retries allowed per call made.
+
+        :type reserve: ``int``
+        :param reserve: The number of retries which can be saved up, and are
+                        available before any calls are made.
+        """
+        self.ratio = ratio
+        self.reserve = float(reserve)
+        self._balance = self.reserve
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_spend(self):
+        """
+        Takes a retry from the budget.
+
+        :rtype: ``bool``
+        :return: False if the budget is exhausted.
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed calls are retried, and how long to wait before each
+    retry.
+
+    Calls which were rejected without being carried out, such as with a 429
+    response, are always retried. Calls which were otherwise throttled, such
+    as with a 503 response, or failed for a transient reason, such as a
+    dropped connection, are only retried if repeating them is harmless.
+
+    The SDKs should not retry calls themselves while a policy is in use, so
+    that each attempt is counted against the budget.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=20,
+                 budget=None):
+        """
+        :type backoff: ``float``
+        :param backoff: The maximum number of seconds to wait before the
+                        first retry, which doubles with each retry.
+
+        :type max_backoff: ``float``
+        :param max_backoff: The limit on the wait before any retry.
+
+        :type budget: :class:`.RetryBudget`
+        :param budget: A budget shared by all calls, or ``None`` to retry
+                       each call up to ``max_retries`` times.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+
+    def should_retry(self, call, attempt, result):
+        """
+        Returns True if a call should be retried.
+
+        :type call: :class:`.RemoteCall`
+        :param call: The failed call.
+
+        :type attempt: ``int``
+        :param attempt: The number of attempts made so far, starting at 1.
+
+        :param result: The exception raised or the failed response.
+        """
+        if attempt > self.max_retries:
+            return False
+        if not is_rejected(result) and not (
+                (is_throttle(result) or is_transient(result)) and
+                is_idempotent(call.operation)):
+            return False
+        return self.budget is None or self.budget.try_spend()
+
+    def delay(self, attempt):
+        """
+        Returns the number of seconds to wait after the given attempt. The
+        delay is randomised, so that calls throttled together are not all
+        retried at the same time.
+        """
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def __repr__(self):
+        return "<CB-{0}: {1} retries>".format(self.__class__.__name__,
+                                              self.max_retries)
+
+
+class ThrottlingInterceptor(object):
+    """
+    An interceptor which waits for the rate limiter before each attempt at
+    a remote call, and retries failed attempts according to a retry policy.
+    """
+
+    def __init__(self, limiter=None, policy=None, sleep=time.sleep):
+        self.limiter = limiter
+        self.policy = policy
+        self._sleep = sleep
+
+    def __call__(self, call, proceed):
+        if self.policy and self.policy.budget:
+            self.policy.budget.record_call()
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.limiter:
+                self.limiter.acquire(call.component, call.region)
+            try:
+                result = proceed()
+            except Exception as e:
+                if not (self.policy and
+                        self.policy.should_retry(call, attempt, e)):
+                    raise
+            else:
+                # boto returns failed responses rather than raising
+                if not (self.policy and is_error(result) and
+                        self.policy.should_retry(call, attempt, result)):
+                    return result
+                # The body of a discarded response must still be read
+                # before its connection can be reused
+                if hasattr(result, 'read'):
+                    result.read()
+            self._sleep(self.policy.delay(attempt))
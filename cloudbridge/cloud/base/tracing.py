@@ -0,0 +1,321 @@
+"""
+Tracing of service and resource methods and the remote calls they make.
+
+When a provider is configured with a :class:`Tracer`, a span is opened for
+each public method of its services and resources, and a child span for each
+remote request made by its SDK connections. Spans opened while another is
+active on the same thread become its children, so that a high level call
+such as ``instances.create()`` can be broken down into the requests it
+makes.
+
+The services and resources of such a provider are created as instances of
+subclasses which trace their public methods, see :func:`traced_class`, so
+that the objects of providers without a tracer are unaffected.
+"""
+import contextlib
+import functools
+import json
+import threading
+import time
+import types
+import uuid
+
+from .interceptors import get_status_code
+from .interceptors import is_error
+
+# Public methods which only read local data, and so are not worth tracing
+_UNTRACED_METHODS = frozenset(['to_dict', 'to_json', 'to_record'])
+
+
+class Span(object):
+    """
+    A timed operation, which may have a parent span.
+    """
+
+    def __init__(self, name, kind, trace_id, parent_id=None,
+                 attributes=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.end_time = None
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def to_dict(self):
+        return {'name': self.name,
+                'kind': self.kind,
+                'trace_id': self.trace_id,
+                'span_id': self.span_id,
+                'parent_id': self.parent_id,
+                'start_time': self.start_time,
+                'end_time': self.end_time,
+                'duration': self.duration,
+                'attributes': self.attributes,
+                'error': self.error}
+
+    def __repr__(self):
+        return "<CB-{0}: {1} ({2})>".format(self.__class__.__name__,
+                                            self.name, self.kind)
+
+
+class SpanExporter(object):
+    """
+    Receives each span once it has ended. Exporters are shared between
+    threads, so must be thread-safe.
+    """
+
+    def export(self, span):
+        """
+        Exports a completed span.
+
+        :type span: :class:`.Span`
+        :param span: The span to export.
+        """
+        raise NotImplementedError('SpanExporter.export not implemented')
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Keeps all exported spans in memory, which is mostly useful in tests.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+        with self._lock:
+            del self.spans[:]
+
+
+class JSONFileSpanExporter(SpanExporter):
+    """
+    Appends each span to a file as a line of JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), sort_keys=True, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer(object):
+    """
+    Creates spans and passes them to an exporter once they end. The span
+    which is currently active is tracked per thread.
+    """
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @property
+    def current_span(self):
+        """
+        Returns the span active on the current thread, or ``None``.
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, name, kind='internal', **attributes):
+        """
+        Returns a context manager which opens a span, as a child of the
+        current span if there is one, and ends and exports it on exit.
+
+        :rtype: :class:`.Span`
+        """
+        return _ActiveSpan(self, name, kind, attributes)
+
+    def start_span(self, name, kind='internal', **attributes):
+        """
+        Starts a span, as a child of the current span if there is one,
+        without making it current. The span must be passed to
+        :meth:`end_span` once the operation it times is over.
+
+        :rtype: :class:`.Span`
+        """
+        parent = self.current_span
+        if parent is None:
+            return Span(name, kind, uuid.uuid4().hex, attributes=attributes)
+        return Span(name, kind, parent.trace_id, parent.span_id, attributes)
+
+    @contextlib.contextmanager
+    def activate(self, span):
+        """
+        Returns a context manager which makes a started span the current
+        span on this thread, without ending it on exit.
+        """
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+
+    def end_span(self, span, error=None):
+        """
+        Ends a started span and exports it.
+
+        :type error: ``Exception``
+        :param error: The exception which ended the operation, if any.
+        """
+        span.end_time = time.time()
+        if error is not None:
+            span.error = repr(error)
+        self.exporter.export(span)
+
+
+class _ActiveSpan(object):
+
+    def __init__(self, tracer, name, kind, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.tracer.start_span(self.name, self.kind,
+                                           **self.attributes)
+        self.tracer._stack().append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer._stack().pop()
+        self.tracer.end_span(self.span, exc_value)
+
+
+class TracingInterceptor(object):
+    """
+    An interceptor which opens a span for each remote call.
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    def __call__(self, call, proceed):
+        with self.tracer.span(call.operation, 'remote',
+                              component=call.component) as span:
+            result = proceed()
+            if is_error(result):
+                span.error = 'HTTP {0}'.format(get_status_code(result))
+            return result
+
+
+def _trace_method(class_name, name, func):
+    span_name = '{0}.{1}'.format(class_name, name)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # pylint:disable=protected-access
+        tracer = self._provider._tracer
+        span = tracer.start_span(span_name, 'method')
+        try:
+            with tracer.activate(span):
+                result = func(self, *args, **kwargs)
+        except Exception as e:
+            tracer.end_span(span, e)
+            raise
+        if isinstance(result, types.GeneratorType):
+            # The work of a generator is done as the caller iterates, so
+            # its span is only ended once the iteration is
+            return _trace_iteration(tracer, span, result)
+        tracer.end_span(span)
+        return result
+    return wrapper
+
+
+def _trace_iteration(tracer, span, generator):
+    """
+    Yields the items of a generator, making the span current while each
+    item is produced, but not while the caller handles it.
+    """
+    error = None
+    try:
+        while True:
+            with tracer.activate(span):
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        generator.close()
+        tracer.end_span(span, error)
+
+
+def _traced_bases():
+    # Imported here, since these modules import this one
+    from .resources import BaseCloudResource
+    from .resources import BaseObjectLifeCycleMixin
+    from .services import BaseCloudService
+    from .services import BaseObjectLifeCycleServiceMixin
+    return (BaseCloudService, BaseObjectLifeCycleServiceMixin,
+            BaseCloudResource, BaseObjectLifeCycleMixin)
+
+
+# Traced subclasses, keyed by the class they extend
+_traced_classes = {}
+_traced_classes_lock = threading.Lock()
+
+
+def traced_class(cls):
+    """
+    Returns a subclass of a service or resource class which traces each
+    call to a public method. The objects of providers with a tracer are
+    created as instances of it, while those of other providers call the
+    methods of the class itself, which is left unchanged.
+    """
+    if cls.__dict__.get('_cb_traced'):
+        return cls
+    with _traced_classes_lock:
+        traced = _traced_classes.get(cls)
+        if traced is None:
+            bases = _traced_bases()
+            namespace = {'__slots__': (), '__module__': cls.__module__,
+                         '_cb_traced': True}
+            for name in dir(cls):
+                if name.startswith('_') or name in _UNTRACED_METHODS:
+                    continue
+                # The class which the method is inherited from
+                owner = next(c for c in cls.__mro__ if name in vars(c))
+                func = vars(owner)[name]
+                if (isinstance(func, types.FunctionType) and
+                        issubclass(owner, bases)):
+                    namespace[name] = _trace_method(owner.__name__, name,
+                                                    func)
+            traced = _traced_classes[cls] = type(cls)(cls.__name__, (cls,),
+                                                      namespace)
+        return traced
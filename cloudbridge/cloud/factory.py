@@ -17,6 +17,23 @@ class ProviderList(object):
     OPENSTACK = 'openstack'
 
 
+# The provider implementations shipped with CloudBridge, mapping each
+# provider id to the import paths of its classes. Provider modules are only
+# imported when the provider is first requested, so that creating a
+# provider does not load the SDKs of all other providers.
+PROVIDER_CLASSES = {
+    ProviderList.AWS: {
+        'class': 'cloudbridge.cloud.providers.aws.provider.AWSCloudProvider',
+        'mock_class':
+            'cloudbridge.cloud.providers.aws.provider.MockAWSCloudProvider'
+    },
+    ProviderList.OPENSTACK: {
+        'class': 'cloudbridge.cloud.providers.openstack.provider.'
+                 'OpenStackCloudProvider'
+    }
+}
+
+
 class CloudProviderFactory(object):
 
     """
@@ -25,6 +42,8 @@ class CloudProviderFactory(object):
 
     def __init__(self):
         self.provider_list = defaultdict(dict)
+        self._loaded_providers = set()
+        self._discovered = False
 
     def register_provider_class(self, cls):
         """
@@ -68,11 +87,49 @@ class CloudProviderFactory(object):
     def discover_providers(self):
         """
         Discover all available providers within the
-        ``cloudbridge.cloud.providers`` package.
+        ``cloudbridge.cloud.providers`` package. Providers listed in
+        PROVIDER_CLASSES are loaded from their known classes, and any other
+        modules in the package are searched for provider classes.
         Note that this methods does not guard against a failed import.
         """
+        for provider_id in PROVIDER_CLASSES:
+            self._load_provider(provider_id)
         for _, modname, _ in pkgutil.iter_modules(providers.__path__):
-            self._import_provider(modname)
+            if not self._is_known_module(modname):
+                self._import_provider(modname)
+        self._discovered = True
+
+    def _is_known_module(self, module_name):
+        """
+        Returns True if the given provider module contains any of the
+        classes listed in PROVIDER_CLASSES.
+        """
+        prefix = "{0}.{1}.".format(providers.__name__, module_name)
+        return any(path.startswith(prefix)
+                   for classes in PROVIDER_CLASSES.values()
+                   for path in classes.values())
+
+    def _load_provider(self, provider_id):
+        """
+        Imports and registers the classes listed in PROVIDER_CLASSES for the
+        given provider id, unless they have already been loaded or a class
+        of the same kind has been registered explicitly. Returns False if
+        the provider id is not listed.
+        """
+        classes = PROVIDER_CLASSES.get(provider_id)
+        if classes is None:
+            return False
+        if provider_id in self._loaded_providers:
+            return True
+        registered = self.provider_list.get(provider_id, {})
+        for kind, path in classes.items():
+            if kind in registered:
+                continue
+            module_name, class_name = path.rsplit('.', 1)
+            module = importlib.import_module(module_name)
+            self.register_provider_class(getattr(module, class_name))
+        self._loaded_providers.add(provider_id)
+        return True
 
     def _import_provider(self, module_name):
         """
@@ -91,7 +148,9 @@ class CloudProviderFactory(object):
         Get a list of available providers.
 
         It uses a simple automatic discovery system by iterating through all
-        submodules in cloudbridge.cloud.providers.
+        submodules in cloudbridge.cloud.providers, so this imports every
+        provider. To load a single provider, use :meth:`get_provider_class`
+        or :meth:`create_provider` instead.
 
         :rtype: dict
         :return: A dict of available providers and their implementations in the
@@ -102,7 +161,7 @@ class CloudProviderFactory(object):
                                          der}
                  }
         """
-        if not self.provider_list:
+        if not self._discovered:
             self.discover_providers()
         return self.provider_list
 
@@ -133,7 +192,10 @@ class CloudProviderFactory(object):
 
     def get_provider_class(self, name, get_mock=False):
         """
-        Return a class for the requested provider.
+        Return a class for the requested provider. Only the modules of the
+        requested provider are imported, unless it is not one of the
+        providers listed in PROVIDER_CLASSES, in which case all providers are
+        discovered.
 
         :type get_mock: ``bool``
         :param get_mock: If True, returns a mock version of the provider
@@ -143,7 +205,10 @@ class CloudProviderFactory(object):
         :return: A class corresponding to the requested provider or ``None``
                  if the provider was not found.
         """
-        impl = self.list_providers().get(name)
+        if (not self._load_provider(name) and name not in self.provider_list
+                and not self._discovered):
+            self.discover_providers()
+        impl = self.provider_list.get(name)
         if impl:
             if get_mock and impl.get("mock_class"):
                 return impl["mock_class"]
@@ -180,6 +180,101 @@ class CloudProvider(object):
         """
         pass
 
+    @abstractmethod
+    def tag_many(self, resources, tags):
+        """
+        Sets the given tags on a number of resources, which may be of
+        different types, using as few requests as the provider allows. Tags
+        which the resources already have are overwritten, and other existing
+        tags are kept.
+
+        Example:
+
+        .. code-block:: python
+
+            workers = provider.compute.instances.find(name='worker')
+            provider.tag_many(workers, {'role': 'worker', 'stage': 'prod'})
+
+        On OpenStack, tags are set as the metadata of instances, volumes and
+        snapshots, which are the only resources that can be tagged.
+
+        :type resources: ``list`` of :class:`.CloudResource`
+        :param resources: The resources to tag.
+
+        :type tags: ``dict``
+        :param tags: The tag values, by key.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each resource to ``None`` if
+                 it was tagged, or to the exception raised if not.
+        """
+        pass
+
+    @abstractmethod
+    def for_region(self, region_name):
+        """
+        Returns a view of this provider whose services operate in another
+        region. The view shares the provider's credentials, configuration
+        and interceptors, and is created once per region, together with
+        its connections, so that switching between regions is cheap.
+
+        Example:
+
+        .. code-block:: python
+
+            for region in provider.compute.regions.list():
+                regional = provider.for_region(region.name)
+                print(region.name, len(regional.compute.instances.list()))
+
+        :type region_name: ``str``
+        :param region_name: The name of the region.
+
+        :rtype: :class:`.CloudProvider`
+        :return: A provider for the region, which is this provider if it
+                 already operates in that region.
+        """
+        pass
+
+    @abstractmethod
+    def across_regions(self, func, regions=None, max_workers=None):
+        """
+        Calls a function with the provider of each of a number of regions,
+        querying all the regions concurrently, so that a query of every
+        region takes about as long as the slowest region.
+
+        Example:
+
+        .. code-block:: python
+
+            results = provider.across_regions(
+                lambda regional: regional.compute.instances)
+            for region_name, inst in results:
+                print(region_name, inst.name)
+            for region_name, error in results.failed.items():
+                print("Could not list {0}: {1}".format(region_name, error))
+
+        :type func: ``callable``
+        :param func: Receives the provider of a region, as returned by
+                     ``for_region``, and returns an iterable of results. The
+                     iterable is read in full in the region's thread, so
+                     passing a service, such as ``compute.instances``,
+                     fetches all of its pages concurrently.
+
+        :type regions: ``list`` of :class:`.Region` or ``str`` names
+        :param regions: The regions to query. Defaults to all regions.
+
+        :type max_workers: ``int``
+        :param max_workers: The maximum number of regions queried at once.
+                            Defaults to all of them.
+
+        :rtype: :class:`.RegionalResults`
+        :return: An iterable of ``(region_name, item)`` pairs, yielded as
+                 each region answers. Once iterated over, its ``failed``
+                 property holds the exception raised in each region in
+                 which the query failed.
+        """
+        pass
+
 
 class TestMockHelperMixin(object):
     """
@@ -32,6 +32,7 @@ class CloudResource(object):
     associated with the resource, which is only intended for use by subclasses.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def _provider(self):
@@ -44,10 +45,40 @@ class CloudResource(object):
         """
         pass
 
+    @abstractmethod
+    def to_dict(self):
+        """
+        Returns a dictionary representation of the CloudResource object,
+        which can be serialized to JSON. Only locally held data is included,
+        so this never results in a call to the provider. Properties which
+        require a remote lookup, such as a volume's source or an instance's
+        security group objects, are represented by ids or omitted.
+
+        :rtype: ``dict``
+        :return: The serializable fields of this object.
+        """
+        pass
+
     @abstractmethod
     def to_json(self):
         """
-        Returns a JSON representation of the CloudResource object.
+        Returns a JSON representation of the CloudResource object. To
+        serialize many resources at once, use
+        :func:`cloudbridge.cloud.base.resources.serialize_many`.
+        """
+        pass
+
+    @abstractmethod
+    def to_record(self):
+        """
+        Returns an immutable named tuple holding the same fields as
+        :meth:`to_dict`. The record holds no reference to the provider or
+        to the underlying SDK object, so it is considerably smaller than the
+        resource itself and is suited to holding large numbers of resources
+        in memory. Records also support ``to_dict()`` and ``to_json()``.
+
+        :rtype: ``namedtuple``
+        :return: A detached record of this object.
         """
         pass
 
@@ -97,6 +128,21 @@ class Configuration(dict):
         """
         pass
 
+    @property
+    def default_prefetch_depth(self):
+        """
+        Gets the default number of pages to fetch in the background while
+        iterating through a pageable object. The default depth is applied
+        when iterating directly through a service or bucket, and in the
+        iterate() method if no explicit prefetch depth is specified. It can be
+        changed by passing a ``default_prefetch_depth`` through the config
+        dictionary. The default of 0 disables prefetching.
+
+        :rtype: ``int``
+        :return: The maximum number of pages to fetch ahead of the consumer.
+        """
+        pass
+
     @property
     def default_wait_timeout(self):
         """
@@ -122,6 +168,243 @@ class Configuration(dict):
         """
         pass
 
+    @property
+    def default_poll_strategy(self):
+        """
+        Gets the default poll strategy for LifeCycleObjects. The default
+        poll strategy is applied in wait_for() and wait_till_ready() methods
+        if neither an explicit interval nor an explicit poll strategy is
+        specified. It can be changed by passing a ``default_poll_strategy``
+        through the config dictionary. For example, the following polls
+        quickly at first and then backs off exponentially:
+
+        .. code-block:: python
+
+            from cloudbridge.cloud.base.polling import \\
+                ExponentialBackoffPollStrategy
+
+            config = {'default_poll_strategy':
+                      ExponentialBackoffPollStrategy(initial=1, maximum=30)}
+
+        :rtype: :class:`.PollStrategy`
+        :return: The strategy deciding how long to sleep between refreshes.
+        """
+        pass
+
+    @property
+    def cache_ttl(self):
+        """
+        Gets the number of seconds for which the results of get(), list() and
+        find() are cached by services whose objects rarely change, such as
+        regions, instance types, images, key pairs, security groups, networks
+        and subnets. It can be changed by passing a ``cache_ttl`` through the
+        config dictionary. The default of 0 disables caching. The time to live
+        of individual services can be overridden through a ``cache_ttls``
+        dictionary keyed by the service path. For example:
+
+        .. code-block:: python
+
+            config = {'cache_ttl': 60,
+                      'cache_ttls': {'compute.images': 300,
+                                     'compute.instance_types': 3600}}
+
+        :rtype: ``int``
+        :return: The cache time to live (in seconds).
+        """
+        pass
+
+    @property
+    def cache_max_size(self):
+        """
+        Gets the maximum number of results cached by each service. The least
+        recently used results are evicted first. It can be changed by passing
+        a ``cache_max_size`` through the config dictionary.
+
+        :rtype: ``int``
+        :return: The maximum number of entries in each service cache.
+        """
+        pass
+
+    @property
+    def cache_negative_ttl(self):
+        """
+        Gets the number of seconds for which lookups that found nothing are
+        cached. It can be changed by passing a ``cache_negative_ttl`` through
+        the config dictionary, and defaults to the cache_ttl.
+
+        :rtype: ``int``
+        :return: The negative cache time to live (in seconds).
+        """
+        pass
+
+    @abstractproperty
+    def connection_pool_size(self):
+        """
+        Gets the maximum number of idle SDK connections kept for reuse per
+        connection type. Each thread using the provider is given its own
+        connection, which is returned to the pool when the thread exits, so
+        this does not limit the total number of connections, which grows
+        with the number of concurrent threads. It can be changed by passing
+        a ``connection_pool_size`` through the config dictionary, and
+        defaults to 10.
+
+        :rtype: ``int``
+        :return: The maximum number of idle pooled connections.
+        """
+        pass
+
+    @abstractproperty
+    def rate_limit(self):
+        """
+        Gets the number of remote calls per second which the provider makes
+        to each endpoint, such as ``ec2`` or ``nova``, in each region, at
+        most. Calls beyond the limit wait their turn, rather than being
+        throttled by the cloud.
+        It can be set by passing a ``rate_limit`` through the config
+        dictionary, and individual endpoints can be given different limits
+        through a ``rate_limits`` dictionary. It defaults to 0, which does
+        not limit calls.
+
+        :rtype: ``float``
+        :return: The number of calls allowed per second.
+        """
+        pass
+
+    @abstractproperty
+    def rate_limit_burst(self):
+        """
+        Gets the number of calls which can be made to an endpoint at once,
+        after a period without calls. It can be set by passing a
+        ``rate_limit_burst`` through the config dictionary, and defaults to
+        the rate limit.
+
+        :rtype: ``int``
+        :return: The maximum burst of calls.
+        """
+        pass
+
+    @abstractproperty
+    def max_retries(self):
+        """
+        Gets the number of times a remote call is retried after being
+        throttled, or after failing for a transient reason such as a
+        dropped connection. Calls which change state are only retried if
+        they were rejected without being carried out. Unless this is 0,
+        the SDKs do not retry calls themselves. It can be changed by passing
+        a ``max_retries`` through the config dictionary, and defaults to 0.
+
+        :rtype: ``int``
+        :return: The maximum number of retries of a call.
+        """
+        pass
+
+    @abstractproperty
+    def retry_backoff(self):
+        """
+        Gets the maximum number of seconds to wait before retrying a call for
+        the first time. The wait doubles with each further retry, and is
+        randomised so that calls which failed together are not retried
+        together. It can be changed by passing a ``retry_backoff`` through
+        the config dictionary, and defaults to 0.5.
+
+        :rtype: ``float``
+        :return: The initial backoff (in seconds).
+        """
+        pass
+
+    @abstractproperty
+    def retry_max_backoff(self):
+        """
+        Gets the limit on the number of seconds to wait before any retry. It
+        can be changed by passing a ``retry_max_backoff`` through the config
+        dictionary, and defaults to 20.
+
+        :rtype: ``float``
+        :return: The maximum backoff (in seconds).
+        """
+        pass
+
+    @abstractproperty
+    def retry_budget(self):
+        """
+        Gets the number of retries allowed for each call made by the
+        provider, so that retries add little load to a struggling cloud. A
+        small reserve of retries is always available. It can be changed by
+        passing a ``retry_budget`` through the config dictionary, and
+        defaults to 0.2. 0 does not limit retries beyond ``max_retries``.
+
+        :rtype: ``float``
+        :return: The ratio of retries to calls.
+        """
+        pass
+
+    @abstractproperty
+    def coalesce_requests(self):
+        """
+        Gets whether concurrent identical lookups share a single remote
+        call. When many threads look up the same image, instance type or
+        region at the same moment, only one request is made and its result,
+        or exception, is returned to all of them. It can be changed by
+        passing a ``coalesce_requests`` through the config dictionary, and
+        defaults to True.
+
+        :rtype: ``bool``
+        :return: Whether concurrent lookups are coalesced.
+        """
+        pass
+
+    @abstractproperty
+    def batch_max_workers(self):
+        """
+        Gets the maximum number of requests which bulk operations, such as
+        ``terminate_many`` and ``delete_many``, make concurrently when the
+        provider cannot handle all the objects in a single request. It can be
+        changed by passing a ``batch_max_workers`` through the config
+        dictionary, and defaults to 10.
+
+        :rtype: ``int``
+        :return: The maximum number of concurrent requests.
+        """
+        pass
+
+    @abstractproperty
+    def cache_dir(self):
+        """
+        Gets the directory in which providers cache data which changes
+        rarely, such as the catalog of instance types, so that it can be
+        shared by several processes. It can be changed by passing a
+        ``cache_dir`` through the config dictionary, such as
+        ``~/.cloudbridge/cache``. Nothing is cached on disk unless it is set.
+
+        :rtype: ``str``
+        :return: The cache directory, or ``None``.
+        """
+        pass
+
+    @abstractproperty
+    def metrics_sink(self):
+        """
+        Gets the sink which receives the count and latency of every remote
+        call made by the provider. It can be set by passing a
+        ``metrics_sink`` through the config dictionary.
+
+        :rtype: :class:`.MetricsSink`
+        :return: The metrics sink, or ``None`` if calls are not measured.
+        """
+        pass
+
+    @abstractproperty
+    def tracer(self):
+        """
+        Gets the tracer which records a span for each service and resource
+        method call, and for each remote call made by the provider. It can
+        be set by passing a ``tracer`` through the config dictionary.
+
+        :rtype: :class:`.Tracer`
+        :return: The tracer, or ``None`` if calls are not traced.
+        """
+        pass
+
     @abstractproperty
     def debug_mode(self):
         """
@@ -153,6 +436,7 @@ class ObjectLifeCycleMixin(object):
     service provider.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def _provider(self):
@@ -185,7 +469,7 @@ class ObjectLifeCycleMixin(object):
 
     @abstractmethod
     def wait_for(self, target_states, terminal_states=None, timeout=None,
-                 interval=None):
+                 interval=None, poll_strategy=None):
         """
         Wait for a specified timeout for an object to reach a set of desired
         target states. If the object does not reach the desired state within
@@ -219,9 +503,18 @@ class ObjectLifeCycleMixin(object):
 
         :type interval: int
         :param interval: How frequently to poll the object's state (in
-                         seconds). If no interval is specified, the global
-                         default_wait_interval defined in the provider config
-                         will apply.
+                         seconds). If an interval is specified, the state is
+                         polled at that fixed rate and any poll strategy is
+                         ignored.
+
+        :type poll_strategy: :class:`.PollStrategy`
+        :param poll_strategy: Decides how long to sleep between successive
+                              refreshes, for example by backing off
+                              exponentially. The sleep is always capped by the
+                              remaining timeout. If neither an interval nor a
+                              poll strategy is specified, the global
+                              default_poll_strategy defined in the provider
+                              config will apply.
 
         :rtype: ``True``
         :return: Returns ``True`` if successful. A ``WaitStateException``
@@ -263,6 +556,8 @@ class PageableObjectMixin(object):
     a list of objects with a list(limit, marker) method.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def __iter__(self):
         """
@@ -322,6 +617,40 @@ class PageableObjectMixin(object):
         """
         pass
 
+    @abstractmethod
+    def iterate(self, limit=None, prefetch=None):
+        """
+        Returns an iterator through all available objects, like __iter__, but
+        with explicit control over paging. When prefetching is enabled, the
+        next pages are fetched in the background while the current page is
+        being consumed, so that iteration through a large number of objects is
+        not held up by the round trip for each page.
+
+        Example:
+
+        .. code-block:: python
+
+            # keep up to 2 pages of 500 objects ready in the background
+            for obj in provider.object_store.get('mybucket').iterate(
+                    limit=500, prefetch=2):
+                print(obj.name)
+
+        :type limit: ``int``
+        :param limit: The number of objects to fetch per page. If not
+                      specified, the provider's default_result_limit applies.
+
+        :type prefetch: ``int``
+        :param prefetch: The maximum number of pages to fetch ahead of the
+                         consumer. 0 disables prefetching. If not specified,
+                         the default_prefetch_depth defined in the provider
+                         config will apply. Prefetching only applies to
+                         server paged results.
+
+        :rtype: iterator
+        :return: An iterator through all available objects.
+        """
+        pass
+
 
 class ResultList(list):
     """
@@ -428,6 +757,7 @@ class InstanceState(object):
 class Instance(ObjectLifeCycleMixin, CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -768,6 +1098,7 @@ class LaunchConfig(object):
 class MachineImage(ObjectLifeCycleMixin, CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -834,6 +1165,7 @@ class Network(CloudResource):
     Represents a software-defined network, like the Virtual Private Cloud.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -923,6 +1255,7 @@ class Subnet(CloudResource):
     Represents a subnet, as part of a Network.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -981,6 +1314,8 @@ class AttachmentInfo(object):
     Contains attachment information for a volume.
     """
 
+    __slots__ = ()
+
     @abstractproperty
     def volume(self):
         """
@@ -1038,6 +1373,7 @@ class VolumeState(object):
 class Volume(ObjectLifeCycleMixin, CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1234,6 +1570,7 @@ class SnapshotState(object):
 class Snapshot(ObjectLifeCycleMixin, CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1384,6 +1721,7 @@ class Snapshot(ObjectLifeCycleMixin, CloudResource):
 class KeyPair(CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1434,6 +1772,7 @@ class Region(CloudResource):
     contain at least one placement zone.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1472,6 +1811,7 @@ class PlacementZone(CloudResource):
     Represents a placement zone. A placement zone is contained within a Region.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1510,6 +1850,7 @@ class InstanceType(CloudResource):
     An instance type object.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1608,6 +1949,7 @@ class InstanceType(CloudResource):
 class SecurityGroup(CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1728,6 +2070,7 @@ class SecurityGroupRule(CloudResource):
     Represents a security group rule.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1806,6 +2149,7 @@ class BucketObject(CloudResource):
     Represents an object stored within a bucket.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1891,6 +2235,7 @@ class BucketObject(CloudResource):
 class Bucket(PageableObjectMixin, CloudResource):
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractproperty
     def id(self):
@@ -1949,6 +2294,21 @@ class Bucket(PageableObjectMixin, CloudResource):
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, objects):
+        """
+        Deletes a number of objects from this bucket, using as few requests
+        as the provider allows and making the rest concurrently.
+
+        :type objects: ``list`` of :class:`.BucketObject` or ``str`` names
+        :param objects: The objects to delete.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each object to ``None`` if it
+                 was deleted, or to the exception raised if not.
+        """
+        pass
+
     @abstractmethod
     def create_object(self, name):
         """
@@ -24,6 +24,91 @@ class CloudService(object):
         """
         pass
 
+    def invalidate_cache(self):
+        """
+        Discards all cached results of this service's get(), list() and
+        find() methods. Results are only cached if a ``cache_ttl`` is set in
+        the provider config. Creating or deleting objects through the same
+        provider invalidates the relevant caches automatically, so this is
+        only needed if objects are modified by other means. Alternatively,
+        a single fresh lookup can be forced by passing ``bypass_cache=True``
+        to any cached method.
+        """
+        pass
+
+
+class ObjectLifeCycleServiceMixin(object):
+    """
+    A mixin for services which manage objects with a defined life-cycle, such
+    as Instances, Volumes, Snapshots and Images. It allows a whole group of
+    objects to be waited on at once, refreshing all pending objects with a
+    single batched request per polling interval instead of one request per
+    object.
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def wait_for_many(self, objects, target_states, terminal_states=None,
+                      timeout=None, interval=None, poll_strategy=None):
+        """
+        Wait for a group of objects to reach a set of desired target states,
+        yielding each object as soon as it reaches either a target state or
+        a terminal state. Objects are yielded in the order in which they
+        settle, so callers should check the ``state`` of each yielded object
+        to distinguish between success and failure.
+
+        If some objects have still not settled when the timeout expires, a
+        ``WaitStateException`` will be raised.
+
+        Example:
+
+        .. code-block:: python
+
+            insts = [provider.compute.instances.create(...) for _ in range(10)]
+            for inst in provider.compute.instances.wait_for_many(
+                    insts, [InstanceState.RUNNING],
+                    terminal_states=[InstanceState.ERROR]):
+                print("Instance {0} is now {1}".format(inst.id, inst.state))
+
+        :type objects: ``list`` of :class:`.ObjectLifeCycleMixin`
+        :param objects: The objects to wait on. These must be objects
+                        managed by this service.
+
+        :type target_states: ``list`` of states
+        :param target_states: The list of target states to wait for.
+
+        :type terminal_states: ``list`` of states
+        :param terminal_states: A list of terminal states after which an
+                                object will not transition into a target
+                                state. Objects reaching a terminal state are
+                                yielded and no longer waited on.
+
+        :type timeout: int
+        :param timeout: The maximum length of time (in seconds) to wait for
+                        all objects to settle. If no timeout is specified, the
+                        global default_wait_timeout defined in the provider
+                        config will apply.
+
+        :type interval: int
+        :param interval: How frequently to poll the objects' states (in
+                         seconds). If an interval is specified, the states
+                         are polled at that fixed rate and any poll strategy
+                         is ignored.
+
+        :type poll_strategy: :class:`.PollStrategy`
+        :param poll_strategy: Decides how long to sleep between successive
+                              refreshes. When pending objects are in different
+                              states, the shortest interval suggested for any
+                              of those states is used. If neither an interval
+                              nor a poll strategy is specified, the global
+                              default_poll_strategy defined in the provider
+                              config will apply.
+
+        :rtype: iterator of :class:`.ObjectLifeCycleMixin`
+        :return: An iterator which yields each object as it settles.
+        """
+        pass
+
 
 class ComputeService(CloudService):
     """
@@ -124,7 +209,8 @@ class ComputeService(CloudService):
         pass
 
 
-class InstanceService(PageableObjectMixin, CloudService):
+class InstanceService(PageableObjectMixin, ObjectLifeCycleServiceMixin,
+                      CloudService):
     """
     Provides access to instances in a provider, including creating,
     listing and deleting instances.
@@ -201,7 +287,7 @@ class InstanceService(PageableObjectMixin, CloudService):
     @abstractmethod
     def create(self, name, image, instance_type, zone=None,
                key_pair=None, security_groups=None, user_data=None,
-               launch_config=None,
+               launch_config=None, tags=None,
                **kwargs):
         """
         Creates a new virtual machine instance.
@@ -241,11 +327,86 @@ class InstanceService(PageableObjectMixin, CloudService):
                construct a launch configuration object, call
                provider.compute.instances.create_launch_config()
 
+        :type  tags: ``dict``
+        :param tags: Tags to set on the instance, by key. On OpenStack, these
+                     are set as the server's metadata.
+
         :rtype: ``object`` of :class:`.Instance`
         :return:  an instance of Instance class
         """
         pass
 
+    @abstractmethod
+    def create_many(self, count, name_template, image, instance_type,
+                    zone=None, key_pair=None, security_groups=None,
+                    user_data=None, launch_config=None, tags=None,
+                    **kwargs):
+        """
+        Creates a number of identical virtual machine instances, using a
+        single launch request where the provider supports it.
+
+        Example:
+
+        .. code-block:: python
+
+            workers = provider.compute.instances.create_many(
+                100, 'worker-{0}', image, instance_type)
+            list(provider.compute.instances.wait_for_many(
+                workers, [InstanceState.RUNNING]))
+
+        :type  count: ``int``
+        :param count: The number of instances to create.
+
+        :type  name_template: ``str``
+        :param name_template: The name of the instances, in which ``{0}`` is
+                              replaced by the index of each instance,
+                              starting at 0.
+
+        The remaining arguments are the same as for :meth:`create`.
+
+        :rtype: ``list`` of :class:`.Instance`
+        :return:  The new instances, in the order of their indices.
+        """
+        pass
+
+    @abstractmethod
+    def terminate_many(self, instances):
+        """
+        Terminates a number of instances, using as few requests as the provider
+        allows and making the rest concurrently.
+
+        Example:
+
+        .. code-block:: python
+
+            result = provider.compute.instances.terminate_many(workers)
+            for inst_id, error in result.failed.items():
+                print("Could not terminate {0}: {1}".format(inst_id, error))
+
+        :type  instances: ``list`` of :class:`.Instance` or ``str`` ids
+        :param instances: The instances to terminate.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each instance to ``None`` if
+                 it was terminated, or to the exception raised if not.
+        """
+        pass
+
+    @abstractmethod
+    def reboot_many(self, instances):
+        """
+        Reboots a number of instances, using as few requests as the provider
+        allows and making the rest concurrently.
+
+        :type  instances: ``list`` of :class:`.Instance` or ``str`` ids
+        :param instances: The instances to reboot.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each instance to ``None`` if
+                 it was rebooted, or to the exception raised if not.
+        """
+        pass
+
     def create_launch_config(self):
         """
         Creates a ``LaunchConfig`` object which can be used
@@ -258,7 +419,8 @@ class InstanceService(PageableObjectMixin, CloudService):
         pass
 
 
-class VolumeService(PageableObjectMixin, CloudService):
+class VolumeService(PageableObjectMixin, ObjectLifeCycleServiceMixin,
+                    CloudService):
     """
     Base interface for a Volume Service.
     """
@@ -295,7 +457,8 @@ class VolumeService(PageableObjectMixin, CloudService):
         pass
 
     @abstractmethod
-    def create(self, name, size, zone, snapshot=None, description=None):
+    def create(self, name, size, zone, snapshot=None, description=None,
+               tags=None):
         """
         Creates a new volume.
 
@@ -317,13 +480,33 @@ class VolumeService(PageableObjectMixin, CloudService):
                             some providers. Providers that do not support this
                             property will return ``None``.
 
+        :type  tags: ``dict``
+        :param tags: Tags to set on the volume, by key. On OpenStack, these
+                     are set as the volume's metadata.
+
         :rtype: ``object`` of :class:`.Volume`
         :return: a newly created Volume object.
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, volumes):
+        """
+        Deletes a number of volumes, using as few requests as the provider
+        allows and making the rest concurrently.
+
+        :type  volumes: ``list`` of :class:`.Volume` or ``str`` ids
+        :param volumes: The volumes to delete.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each volume to ``None`` if
+                 it was deleted, or to the exception raised if not.
+        """
+        pass
+
 
-class SnapshotService(PageableObjectMixin, CloudService):
+class SnapshotService(PageableObjectMixin, ObjectLifeCycleServiceMixin,
+                      CloudService):
     """
     Base interface for a Snapshot Service.
     """
@@ -360,7 +543,7 @@ class SnapshotService(PageableObjectMixin, CloudService):
         pass
 
     @abstractmethod
-    def create(self, name, volume, description=None):
+    def create(self, name, volume, description=None, tags=None):
         """
         Creates a new snapshot off a volume.
 
@@ -375,11 +558,30 @@ class SnapshotService(PageableObjectMixin, CloudService):
                             some providers. Providers that do not support this
                             property will return None.
 
+        :type  tags: ``dict``
+        :param tags: Tags to set on the snapshot, by key. On OpenStack, these
+                     are set as the snapshot's metadata.
+
         :rtype: ``object`` of :class:`.Snapshot`
         :return: a newly created Snapshot object.
         """
         pass
 
+    @abstractmethod
+    def delete_many(self, snapshots):
+        """
+        Deletes a number of snapshots, using as few requests as the provider
+        allows and making the rest concurrently.
+
+        :type  snapshots: ``list`` of :class:`.Snapshot` or ``str`` ids
+        :param snapshots: The snapshots to delete.
+
+        :rtype: :class:`.BatchResult`
+        :return: A dictionary mapping the id of each snapshot to ``None`` if
+                 it was deleted, or to the exception raised if not.
+        """
+        pass
+
 
 class BlockStoreService(CloudService):
 
@@ -434,7 +636,8 @@ class BlockStoreService(CloudService):
         pass
 
 
-class ImageService(PageableObjectMixin, CloudService):
+class ImageService(PageableObjectMixin, ObjectLifeCycleServiceMixin,
+                   CloudService):
 
     """
     Base interface for an Image Service
@@ -925,6 +1128,31 @@ class SecurityGroupService(PageableObjectMixin, CloudService):
         """
         pass
 
+    @abstractmethod
+    def for_instances(self, instances):
+        """
+        Gets the security groups of a number of instances, looking up all
+        of the groups in as few requests as the provider allows.
+
+        Example:
+
+        .. code-block:: python
+
+            instances = provider.compute.instances.list()
+            groups = provider.security.security_groups.for_instances(
+                instances)
+            for inst in instances:
+                print(inst.name, [sg.name for sg in groups[inst.id]])
+
+        :type  instances: ``list`` of :class:`.Instance`
+        :param instances: The instances whose security groups to get.
+
+        :rtype: ``dict``
+        :return: A list of :class:`.SecurityGroup` objects for each
+                 instance, by instance id.
+        """
+        pass
+
 
 class InstanceTypesService(PageableObjectMixin, CloudService):
     __metaclass__ = ABCMeta
@@ -0,0 +1,156 @@
+"""
+A cached catalog of the instance types offered by AWS
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+
+log = logging.getLogger(__name__)
+
+# The number of seconds for which a downloaded catalog is used before it is
+# revalidated against the remote copy
+DEFAULT_CATALOG_TTL = 24 * 60 * 60
+
+
+class InstanceTypeCatalog(object):
+    """
+    The instance type descriptions published at ``url`` as a JSON list,
+    indexed by instance type name.
+
+    The catalog is downloaded on first use and kept in memory. It is also
+    saved in ``cache_dir``, if given, so that other processes can share it.
+    Once older than ``ttl`` seconds, it is revalidated with a conditional
+    request, so that an unchanged catalog is not downloaded again. If the
+    remote copy cannot be reached, the stale catalog continues to be used.
+    """
+
+    def __init__(self, url, ttl=DEFAULT_CATALOG_TTL, cache_dir=None):
+        self.url = url
+        self.ttl = ttl
+        self._path = None
+        if cache_dir:
+            digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+            self._path = os.path.join(
+                cache_dir, 'aws-instance-types-{0}.json'.format(digest))
+        self._lock = threading.Lock()
+        self._entries = None
+        self._index = {}
+        self._etag = None
+        self._last_modified = None
+        self._fetched_at = 0
+
+    @property
+    def entries(self):
+        """
+        :rtype: ``list`` of ``dict``
+        :return: The description of each instance type.
+        """
+        self._refresh()
+        return self._entries
+
+    def get(self, name):
+        """
+        :rtype: ``dict``
+        :return: The description of the named instance type, or ``None`` if
+                 there is no such type.
+        """
+        self._refresh()
+        return self._index.get(name)
+
+    def _refresh(self):
+        if self._entries is not None and not self._expired():
+            return
+        with self._lock:
+            if self._entries is None:
+                self._read_cache()
+            if self._entries is None or self._expired():
+                self._fetch()
+
+    def _expired(self):
+        return time.time() - self._fetched_at >= self.ttl
+
+    def _set(self, entries, etag, last_modified, fetched_at):
+        self._index = {entry['instance_type']: entry for entry in entries}
+        self._etag = etag
+        self._last_modified = last_modified
+        self._fetched_at = fetched_at
+        # Set last, since readers check it without holding the lock
+        self._entries = entries
+
+    def _fetch(self):
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        try:
+            response = requests.get(self.url, headers=headers)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if self._entries is None:
+                raise
+            log.warning("Could not revalidate the instance type catalog at"
+                        " %s, so the cached copy will be used: %s",
+                        self.url, e)
+            self._fetched_at = time.time()
+            return
+        if response.status_code == 304:
+            log.debug("Instance type catalog at %s is unchanged", self.url)
+            self._fetched_at = time.time()
+            self._touch_cache()
+            return
+        self._set(response.json(), response.headers.get('ETag'),
+                  response.headers.get('Last-Modified'), time.time())
+        self._write_cache()
+
+    def _read_cache(self):
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path) as f:
+                cached = json.load(f)
+            # The modification time records when the catalog was last
+            # fetched or revalidated
+            fetched_at = os.path.getmtime(self._path)
+            if (not isinstance(cached, dict) or
+                    not isinstance(cached.get('entries'), list)):
+                raise ValueError("not a cached catalog")
+            self._set(cached['entries'], cached.get('etag'),
+                      cached.get('last_modified'), fetched_at)
+        except (IOError, OSError, ValueError, KeyError, TypeError) as e:
+            log.debug("Ignoring unreadable instance type cache %s: %s",
+                      self._path, e)
+
+    def _write_cache(self):
+        if not self._path:
+            return
+        # Written to a temporary file first, so that other processes never
+        # read a partially written catalog
+        tmp_path = '{0}.{1}.tmp'.format(self._path, os.getpid())
+        try:
+            directory = os.path.dirname(self._path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(tmp_path, 'w') as f:
+                json.dump({'url': self.url, 'etag': self._etag,
+                           'last_modified': self._last_modified,
+                           'entries': self._entries}, f)
+            getattr(os, 'replace', os.rename)(tmp_path, self._path)
+        except (IOError, OSError) as e:
+            log.debug("Could not cache the instance type catalog in %s: %s",
+                      self._path, e)
+
+    def _touch_cache(self):
+        if self._path and os.path.exists(self._path):
+            try:
+                os.utime(self._path, None)
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return "<CB-{0}: {1}>".format(self.__class__.__name__, self.url)
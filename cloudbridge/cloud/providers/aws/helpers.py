@@ -0,0 +1,47 @@
+"""
+Helper functions
+"""
+
+# The number of resources tagged per request, which keeps the length of the
+# request well within the limits of the EC2 API
+CREATE_TAGS_BATCH_SIZE = 500
+
+# The error codes with which EC2 rejects a whole request because one of the
+# instances or security groups it names does not exist
+INSTANCE_NOT_FOUND_CODES = ('InvalidInstanceID.NotFound',
+                            'InvalidInstanceID.Malformed')
+GROUP_NOT_FOUND_CODES = ('InvalidGroup.NotFound',)
+
+
+def is_not_found(ec2_error):
+    """
+    Returns whether an EC2 error rejects a request because one of the
+    resources it names, of any type, is malformed or does not exist, such as
+    ``InvalidVolume.NotFound``.
+
+    :type ec2_error: :class:`boto.exception.EC2ResponseError`
+    """
+    code = ec2_error.error_code or ''
+    return code == 'InvalidID' or code.endswith(('.NotFound', '.Malformed'))
+
+
+def create_tags(ec2_conn, ec2_objects, tags):
+    """
+    Sets the given tags on all of the boto objects, using a single request
+    for every CREATE_TAGS_BATCH_SIZE objects, and updates the tags held by
+    each object to match.
+
+    :type ec2_objects: ``list`` of :class:`boto.ec2.ec2object.TaggedEC2Object`
+    :param ec2_objects: The objects to tag, which may be of different types.
+
+    :type tags: ``dict``
+    :param tags: The tag values, by key.
+    """
+    ec2_objects = list(ec2_objects)
+    if not tags:
+        return
+    for start in range(0, len(ec2_objects), CREATE_TAGS_BATCH_SIZE):
+        batch = ec2_objects[start:start + CREATE_TAGS_BATCH_SIZE]
+        ec2_conn.create_tags([obj.id for obj in batch], tags)
+        for obj in batch:
+            obj.tags.update(tags)
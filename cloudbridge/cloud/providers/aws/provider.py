@@ -2,22 +2,20 @@
 Provider implementation based on boto library for AWS-compatible clouds.
 """
 
+import copy
 import os
 
 import boto
 from boto.ec2.regioninfo import RegionInfo
-try:
-    # These are installed only for the case of a dev instance
-    from httpretty import HTTPretty
-    from moto.ec2 import mock_ec2
-    from moto.s3 import mock_s3
-except ImportError:
-    # TODO: Once library logging is configured, change this
-    print("[aws provider] moto library not available!")
+from boto.exception import EC2ResponseError
 
 from cloudbridge.cloud.base import BaseCloudProvider
+from cloudbridge.cloud.base.batch import BatchResult
 from cloudbridge.cloud.interfaces import TestMockHelperMixin
+from cloudbridge.cloud.interfaces.resources import CloudBridgeBaseException
 
+from .helpers import create_tags
+from .helpers import is_not_found
 from .services import AWSBlockStoreService
 from .services import AWSComputeService
 from .services import AWSNetworkService
@@ -56,12 +54,17 @@ class AWSCloudProvider(BaseCloudProvider):
         self.s3_validate_certs = self._get_config_value(
             's3_validate_certs', False)
 
-        # service connections, lazily initialized
-        self._ec2_conn = None
-        self._vpc_conn = None
-        self._s3_conn = None
+        # service connections, lazily initialized per thread
+        self._ec2_pool = self._connection_pool(self._connect_ec2)
+        self._vpc_pool = self._connection_pool(self._connect_vpc)
+        self._s3_pool = self._connection_pool(self._connect_s3)
 
-        # Initialize provider services
+        self._init_services()
+
+    def _init_services(self):
+        """
+        Initialize provider services
+        """
         self._compute = AWSComputeService(self)
         self._network = AWSNetworkService(self)
         self._security = AWSSecurityService(self)
@@ -70,21 +73,15 @@ class AWSCloudProvider(BaseCloudProvider):
 
     @property
     def ec2_conn(self):
-        if not self._ec2_conn:
-            self._ec2_conn = self._connect_ec2()
-        return self._ec2_conn
+        return self._ec2_pool.get()
 
     @property
     def vpc_conn(self):
-        if not self._vpc_conn:
-            self._vpc_conn = self._connect_vpc()
-        return self._vpc_conn
+        return self._vpc_pool.get()
 
     @property
     def s3_conn(self):
-        if not self._s3_conn:
-            self._s3_conn = self._connect_s3()
-        return self._s3_conn
+        return self._s3_pool.get()
 
     @property
     def compute(self):
@@ -106,6 +103,51 @@ class AWSCloudProvider(BaseCloudProvider):
     def object_store(self):
         return self._object_store
 
+    def tag_many(self, resources, tags):
+        """
+        Tags all the resources with as few requests as possible.
+        """
+        resources = list(resources)
+        # pylint:disable=protected-access
+        taggable = [r for r in resources if hasattr(r, '_ec2_object')]
+        try:
+            create_tags(self.ec2_conn,
+                        [r._ec2_object for r in taggable], tags)
+        except EC2ResponseError as ec2e:
+            if not is_not_found(ec2e):
+                raise
+            # At least one of the resources does not exist, so fall back to
+            # tagging them individually
+            return super(AWSCloudProvider, self).tag_many(resources, tags)
+        return BatchResult(
+            (r.id, None if hasattr(r, '_ec2_object') else
+             NotImplementedError("{0} cannot be tagged".format(r)))
+            for r in resources)
+
+    def _tag(self, resource, tags):
+        if not hasattr(resource, '_ec2_object'):
+            return super(AWSCloudProvider, self)._tag(resource, tags)
+        # pylint:disable=protected-access
+        create_tags(self.ec2_conn, [resource._ec2_object], tags)
+
+    def _region_view(self, region_name):
+        """
+        Returns a copy of this provider for another region, with its own EC2
+        and VPC connections. S3 is not regional, so its connections are
+        shared.
+        """
+        regions = self.ec2_conn.get_all_regions(region_names=[region_name])
+        if not regions:
+            raise CloudBridgeBaseException(
+                "Region {0} does not exist".format(region_name))
+        view = copy.copy(self)
+        view.region_name = regions[0].name
+        view.region_endpoint = regions[0].endpoint
+        view._ec2_pool = view._connection_pool(view._connect_ec2)
+        view._vpc_pool = view._connection_pool(view._connect_vpc)
+        view._init_services()
+        return view
+
     def _connect_ec2(self):
         """
         Get a boto ec2 connection object.
@@ -126,7 +168,10 @@ class AWSCloudProvider(BaseCloudProvider):
             path=self.ec2_conn_path,
             validate_certs=self.ec2_validate_certs,
             debug=2 if self.config.debug_mode else 0)
-        return ec2_conn
+        if not self._sdk_retries:
+            _send_once(ec2_conn)
+        return self._intercept('ec2', ec2_conn, 'make_request',
+                               _query_operation)
 
     def _connect_vpc(self):
         """
@@ -145,7 +190,10 @@ class AWSCloudProvider(BaseCloudProvider):
             path=self.ec2_conn_path,
             validate_certs=self.ec2_validate_certs,
             debug=2 if self.config.debug_mode else 0)
-        return vpc_conn
+        if not self._sdk_retries:
+            _send_once(vpc_conn)
+        return self._intercept('vpc', vpc_conn, 'make_request',
+                               _query_operation)
 
     def _connect_s3(self):
         """
@@ -159,18 +207,55 @@ class AWSCloudProvider(BaseCloudProvider):
                                   path=self.s3_conn_path,
                                   validate_certs=self.s3_validate_certs,
                                   debug=2 if self.config.debug_mode else 0)
-        return s3_conn
+        if not self._sdk_retries:
+            _send_once(s3_conn)
+        return self._intercept('s3', s3_conn, 'make_request', _s3_operation)
 
 
-class MockAWSCloudProvider(AWSCloudProvider, TestMockHelperMixin):
+def _send_once(conn):
+    """
+    Makes a boto connection send each request once, rather than retrying
+    failed requests as many times as the boto config allows, so that the
+    provider's retry policy sees and counts every attempt.
+    """
+    # pylint:disable=protected-access
+    mexe = conn._mexe
+
+    def send(request, sender=None, override_num_retries=None,
+             retry_handler=None):
+        return mexe(request, sender, 0, retry_handler)
+    conn._mexe = send
+
+
+def _query_operation(action, *args, **kwargs):
+    """
+    Returns the name of the API action requested through a boto query
+    connection's make_request method, e.g. ``DescribeInstances``.
+    """
+    return action
 
-    def __init__(self, config):
-        super(MockAWSCloudProvider, self).__init__(config)
+
+def _s3_operation(method, bucket='', key='', *args, **kwargs):
+    """
+    Returns a name for a request made through a boto S3 connection's
+    make_request method, e.g. ``GET object``.
+    """
+    resource = 'object' if key else 'bucket' if bucket else 'service'
+    return '{0} {1}'.format(method, resource)
+
+
+class MockAWSCloudProvider(AWSCloudProvider, TestMockHelperMixin):
 
     def setUpMock(self):
         """
         Let Moto take over all socket communications
         """
+        # These are installed only for the case of a dev instance, so are
+        # imported here rather than whenever the provider is loaded
+        from httpretty import HTTPretty
+        from moto.ec2 import mock_ec2
+        from moto.s3 import mock_s3
+
         self.ec2mock = mock_ec2()
         self.ec2mock.start()
         self.s3mock = mock_s3()
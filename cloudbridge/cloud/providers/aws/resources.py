@@ -1,6 +1,9 @@
 """
 DataTypes used by this provider
 """
+from cloudbridge.cloud.base.batch import BatchResult
+from cloudbridge.cloud.base.batch import object_id
+from cloudbridge.cloud.base.cache import invalidates_cache
 from cloudbridge.cloud.base.resources import BaseAttachmentInfo
 from cloudbridge.cloud.base.resources import BaseBucket
 from cloudbridge.cloud.base.resources import BaseBucketObject
@@ -17,6 +20,7 @@ from cloudbridge.cloud.base.resources import BaseSnapshot
 from cloudbridge.cloud.base.resources import BaseSubnet
 from cloudbridge.cloud.base.resources import BaseVolume
 from cloudbridge.cloud.base.resources import ClientPagedResultList
+from cloudbridge.cloud.interfaces.resources import CloudBridgeBaseException
 from cloudbridge.cloud.interfaces.resources import InstanceState
 from cloudbridge.cloud.interfaces.resources import MachineImageState
 from cloudbridge.cloud.interfaces.resources import NetworkState
@@ -24,8 +28,6 @@ from cloudbridge.cloud.interfaces.resources import SnapshotState
 from cloudbridge.cloud.interfaces.resources import VolumeState
 from datetime import datetime
 import hashlib
-import inspect
-import json
 
 from boto.exception import EC2ResponseError
 from boto.s3.key import Key
@@ -34,6 +36,8 @@ from retrying import retry
 
 class AWSMachineImage(BaseMachineImage):
 
+    __slots__ = ('_ec2_image',)
+
     IMAGE_STATE_MAP = {
         'pending': MachineImageState.PENDING,
         'available': MachineImageState.AVAILABLE,
@@ -48,6 +52,13 @@ class AWSMachineImage(BaseMachineImage):
         else:
             self._ec2_image = image
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._ec2_image
+
     @property
     def id(self):
         """
@@ -78,6 +89,7 @@ class AWSMachineImage(BaseMachineImage):
         """
         return self._ec2_image.description
 
+    @invalidates_cache('compute.images')
     def delete(self):
         """
         Delete this image
@@ -94,7 +106,8 @@ class AWSMachineImage(BaseMachineImage):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
-        image = self._provider.compute.images.get(self.id)
+        image = self._provider.compute.images.get(self.id,
+                                                  bypass_cache=True)
         if image:
             # pylint:disable=protected-access
             self._ec2_image = image._ec2_image
@@ -105,6 +118,8 @@ class AWSMachineImage(BaseMachineImage):
 
 class AWSPlacementZone(BasePlacementZone):
 
+    __slots__ = ('_aws_zone', '_aws_region')
+
     def __init__(self, provider, zone, region):
         super(AWSPlacementZone, self).__init__(provider)
         if isinstance(zone, AWSPlacementZone):
@@ -148,6 +163,8 @@ class AWSPlacementZone(BasePlacementZone):
 
 class AWSInstanceType(BaseInstanceType):
 
+    __slots__ = ('_inst_dict',)
+
     def __init__(self, provider, instance_dict):
         super(AWSInstanceType, self).__init__(provider)
         self._inst_dict = instance_dict
@@ -200,6 +217,8 @@ class AWSInstanceType(BaseInstanceType):
 
 class AWSInstance(BaseInstance):
 
+    __slots__ = ('_ec2_instance',)
+
     # ref:
     # http://docs.aws.amazon.com/AWSEC2/latest/UserGuide/ec2-instance-lifecycle.html
     INSTANCE_STATE_MAP = {
@@ -215,6 +234,13 @@ class AWSInstance(BaseInstance):
         super(AWSInstance, self).__init__(provider)
         self._ec2_instance = ec2_instance
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._ec2_instance
+
     @property
     def id(self):
         """
@@ -265,8 +291,8 @@ class AWSInstance(BaseInstance):
         """
         Get the instance type.
         """
-        return self._provider.compute.instance_types.find(
-            name=self._ec2_instance.instance_type)[0]
+        return self._provider.compute.instance_types.get(
+            self._ec2_instance.instance_type)
 
     def reboot(self):
         """
@@ -302,8 +328,8 @@ class AWSInstance(BaseInstance):
         # boto instance.groups field returns a ``Group`` object so need to
         # convert that into a ``SecurityGroup`` object before creating a
         # cloudbridge SecurityGroup object
-        return [self._provider.security.security_groups.get(group.id)
-                for group in self._ec2_instance.groups]
+        return self._provider.security.security_groups.for_instances(
+            [self])[self.id]
 
     @property
     def security_group_ids(self):
@@ -319,6 +345,7 @@ class AWSInstance(BaseInstance):
         """
         return self._ec2_instance.key_name
 
+    @invalidates_cache('compute.images')
     def create_image(self, name):
         """
         Create a new image based on this instance.
@@ -328,7 +355,8 @@ class AWSInstance(BaseInstance):
         # if the image cannot be found
         retry_decorator = retry(retry_on_result=lambda result: result is None,
                                 stop_max_attempt_number=3, wait_fixed=1000)
-        image = retry_decorator(self._provider.compute.images.get)(image_id)
+        image = retry_decorator(self._provider.compute.images.get)(
+            image_id, bypass_cache=True)
         return image
 
     def add_floating_ip(self, ip_address):
@@ -357,13 +385,16 @@ class AWSInstance(BaseInstance):
         try:
             self._ec2_instance.update(validate=True)
         except (EC2ResponseError, ValueError):
-            # The volume no longer exists and cannot be refreshed.
-            # set the status to unknown
-            self._ec2_instance.status = 'unknown'
+            # The instance no longer exists and cannot be refreshed.
+            # set the state to unknown
+            # pylint:disable=protected-access
+            self._ec2_instance._state.name = 'unknown'
 
 
 class AWSVolume(BaseVolume):
 
+    __slots__ = ('_volume',)
+
     # Ref:
     # http://docs.aws.amazon.com/AWSEC2/latest/CommandLineReference/
     # ApiReference-cmd-DescribeVolumes.html
@@ -380,6 +411,13 @@ class AWSVolume(BaseVolume):
         super(AWSVolume, self).__init__(provider)
         self._volume = volume
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._volume
+
     @property
     def id(self):
         return self._volume.id
@@ -489,6 +527,8 @@ class AWSVolume(BaseVolume):
 
 class AWSSnapshot(BaseSnapshot):
 
+    __slots__ = ('_snapshot',)
+
     # Ref: http://docs.aws.amazon.com/AWSEC2/latest/CommandLineReference/
     # ApiReference-cmd-DescribeSnapshots.html
     SNAPSHOT_STATE_MAP = {
@@ -501,6 +541,13 @@ class AWSSnapshot(BaseSnapshot):
         super(AWSSnapshot, self).__init__(provider)
         self._snapshot = snapshot
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._snapshot
+
     @property
     def id(self):
         return self._snapshot.id
@@ -578,6 +625,8 @@ class AWSSnapshot(BaseSnapshot):
 
 class AWSKeyPair(BaseKeyPair):
 
+    __slots__ = ()
+
     def __init__(self, provider, key_pair):
         super(AWSKeyPair, self).__init__(provider, key_pair)
 
@@ -595,14 +644,24 @@ class AWSKeyPair(BaseKeyPair):
 
 class AWSSecurityGroup(BaseSecurityGroup):
 
+    __slots__ = ()
+
     def __init__(self, provider, security_group):
         super(AWSSecurityGroup, self).__init__(provider, security_group)
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._security_group
+
     @property
     def rules(self):
         return [AWSSecurityGroupRule(self._provider, r, self)
                 for r in self._security_group.rules]
 
+    @invalidates_cache('security.security_groups')
     def add_rule(self, ip_protocol=None, from_port=None, to_port=None,
                  cidr_ip=None, src_group=None):
         """
@@ -654,16 +713,11 @@ class AWSSecurityGroup(BaseSecurityGroup):
                 return AWSSecurityGroupRule(self._provider, rule, self)
         return None
 
-    def to_json(self):
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        json_rules = [r.to_json() for r in self.rules]
-        js['rules'] = [json.loads(r) for r in json_rules]
-        return json.dumps(js, sort_keys=True)
-
 
 class AWSSecurityGroupRule(BaseSecurityGroupRule):
 
+    __slots__ = ()
+
     def __init__(self, provider, rule, parent):
         super(AWSSecurityGroupRule, self).__init__(provider, rule, parent)
 
@@ -709,13 +763,13 @@ class AWSSecurityGroupRule(BaseSecurityGroupRule):
                 return AWSSecurityGroup(self._provider, cg)
         return None
 
-    def to_json(self):
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        js['group'] = self.group.id if self.group else ''
-        js['parent'] = self.parent.id if self.parent else ''
-        return json.dumps(js, sort_keys=True)
+    @property
+    def _group_id(self):
+        if len(self._rule.grants) > 0 and self._rule.grants[0].name:
+            return self._rule.grants[0].group_id
+        return ''
 
+    @invalidates_cache('security.security_groups')
     def delete(self):
         if self.group:
             # pylint:disable=protected-access
@@ -731,6 +785,8 @@ class AWSSecurityGroupRule(BaseSecurityGroupRule):
 
 class AWSBucketObject(BaseBucketObject):
 
+    __slots__ = ('_key',)
+
     def __init__(self, provider, key):
         super(AWSBucketObject, self).__init__(provider)
         self._key = key
@@ -787,6 +843,8 @@ class AWSBucketObject(BaseBucketObject):
 
 class AWSBucket(BaseBucket):
 
+    __slots__ = ('_bucket',)
+
     def __init__(self, provider, bucket):
         super(AWSBucket, self).__init__(provider)
         self._bucket = bucket
@@ -829,6 +887,20 @@ class AWSBucket(BaseBucket):
         """
         self._bucket.delete()
 
+    def delete_many(self, objects):
+        """
+        Deletes the objects with multi-object delete requests, each of which
+        deletes up to 1000 objects.
+        """
+        names = [object_id(obj) for obj in objects]
+        result = BatchResult.fromkeys(names)
+        if names:
+            deleted = self._bucket.delete_keys(names)
+            for error in deleted.errors:
+                result[error.key] = CloudBridgeBaseException(
+                    "{0}: {1}".format(error.code, error.message))
+        return result
+
     def create_object(self, name):
         key = Key(self._bucket, name)
         return AWSBucketObject(self._provider, key)
@@ -836,6 +908,8 @@ class AWSBucket(BaseBucket):
 
 class AWSRegion(BaseRegion):
 
+    __slots__ = ('_aws_region',)
+
     def __init__(self, provider, aws_region):
         super(AWSRegion, self).__init__(provider)
         self._aws_region = aws_region
@@ -853,23 +927,15 @@ class AWSRegion(BaseRegion):
         """
         Accesss information about placement zones within this region.
         """
-        if self.name == self._provider.region_name:  # optimisation
-            zones = self._provider.ec2_conn.get_all_zones()
-            return [AWSPlacementZone(self._provider, zone.name,
-                                     self._provider.region_name)
-                    for zone in zones]
-        else:
-            region = [region for region in
-                      self._provider.ec2_conn.get_all_regions()
-                      if self.name == region.name][0]
-            conn = self._provider._conect_ec2_region(region)
-            zones = conn.get_all_zones()
-            return [AWSPlacementZone(self._provider, zone.name, region.name)
-                    for zone in zones]
+        zones = self._provider.for_region(self.name).ec2_conn.get_all_zones()
+        return [AWSPlacementZone(self._provider, zone.name, self.name)
+                for zone in zones]
 
 
 class AWSNetwork(BaseNetwork):
 
+    __slots__ = ('_vpc',)
+
     # Ref:
     # docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeVpcs.html
     _NETWORK_STATE_MAP = {
@@ -881,6 +947,13 @@ class AWSNetwork(BaseNetwork):
         super(AWSNetwork, self).__init__(provider)
         self._vpc = network
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._vpc
+
     @property
     def id(self):
         return self._vpc.id
@@ -895,6 +968,7 @@ class AWSNetwork(BaseNetwork):
         return self._vpc.tags.get('Name')
 
     @name.setter
+    @invalidates_cache('network')
     # pylint:disable=arguments-differ
     def name(self, value):
         """
@@ -905,12 +979,13 @@ class AWSNetwork(BaseNetwork):
     @property
     def state(self):
         return AWSNetwork._NETWORK_STATE_MAP.get(
-            self._vpc.update(), NetworkState.UNKNOWN)
+            self._vpc.state, NetworkState.UNKNOWN)
 
     @property
     def cidr_block(self):
         return self._vpc.cidr_block
 
+    @invalidates_cache('network')
     def delete(self):
         return self._vpc.delete()
 
@@ -919,6 +994,7 @@ class AWSNetwork(BaseNetwork):
         subnets = self._provider.vpc_conn.get_all_subnets(filters=flter)
         return [AWSSubnet(self._provider, subnet) for subnet in subnets]
 
+    @invalidates_cache('network.subnets')
     def create_subnet(self, cidr_block, name=None):
         subnet = self._provider.vpc_conn.create_subnet(self.id, cidr_block)
         cb_subnet = AWSSubnet(self._provider, subnet)
@@ -931,15 +1007,29 @@ class AWSNetwork(BaseNetwork):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
-        return self.state
+        try:
+            self._vpc.update(validate=True)
+        except (EC2ResponseError, ValueError):
+            # The network no longer exists and cannot be refreshed.
+            # set the state to unknown
+            self._vpc.state = 'unknown'
 
 
 class AWSSubnet(BaseSubnet):
 
+    __slots__ = ('_subnet',)
+
     def __init__(self, provider, subnet):
         super(AWSSubnet, self).__init__(provider)
         self._subnet = subnet
 
+    @property
+    def _ec2_object(self):
+        """
+        The boto object of this resource, which holds its tags.
+        """
+        return self._subnet
+
     @property
     def id(self):
         return self._subnet.id
@@ -954,6 +1044,7 @@ class AWSSubnet(BaseSubnet):
         return self._subnet.tags.get('Name')
 
     @name.setter
+    @invalidates_cache('network.subnets')
     # pylint:disable=arguments-differ
     def name(self, value):
         """
@@ -969,5 +1060,6 @@ class AWSSubnet(BaseSubnet):
     def network_id(self):
         return self._subnet.vpc_id
 
+    @invalidates_cache('network.subnets')
     def delete(self):
         return self._provider.vpc_conn.delete_subnet(subnet_id=self.id)
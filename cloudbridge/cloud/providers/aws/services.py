@@ -1,13 +1,17 @@
 """
 Services implemented by the AWS provider.
 """
+import collections
 import string
 
 from boto.ec2.blockdevicemapping import BlockDeviceMapping
 from boto.ec2.blockdevicemapping import BlockDeviceType
 from boto.exception import EC2ResponseError
-import requests
 
+from cloudbridge.cloud.base.batch import BatchResult
+from cloudbridge.cloud.base.batch import object_id
+from cloudbridge.cloud.base.cache import cached
+from cloudbridge.cloud.base.cache import invalidates_cache
 from cloudbridge.cloud.base.resources import BaseLaunchConfig
 from cloudbridge.cloud.base.resources import ClientPagedResultList
 from cloudbridge.cloud.base.resources import ServerPagedResultList
@@ -36,6 +40,11 @@ from cloudbridge.cloud.interfaces.resources import SecurityGroup
 from cloudbridge.cloud.interfaces.resources import Snapshot
 from cloudbridge.cloud.interfaces.resources import Volume
 
+from .catalog import DEFAULT_CATALOG_TTL
+from .catalog import InstanceTypeCatalog
+from .helpers import GROUP_NOT_FOUND_CODES
+from .helpers import INSTANCE_NOT_FOUND_CODES
+from .helpers import create_tags
 from .resources import AWSBucket
 from .resources import AWSInstance
 from .resources import AWSInstanceType
@@ -84,6 +93,7 @@ class AWSKeyPairService(BaseKeyPairService):
     def __init__(self, provider):
         super(AWSKeyPairService, self).__init__(provider)
 
+    @cached
     def get(self, key_pair_id):
         """
         Returns a KeyPair given its ID.
@@ -95,6 +105,7 @@ class AWSKeyPairService(BaseKeyPairService):
         except EC2ResponseError:
             return None
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all key pairs associated with this account.
@@ -107,6 +118,7 @@ class AWSKeyPairService(BaseKeyPairService):
         return ClientPagedResultList(self.provider, key_pairs,
                                      limit=limit, marker=marker)
 
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Searches for a key pair by a given list of attributes.
@@ -120,6 +132,7 @@ class AWSKeyPairService(BaseKeyPairService):
         return ClientPagedResultList(self.provider, key_pairs,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name):
         """
         Create a new key pair or return an existing one by the same name.
@@ -142,6 +155,7 @@ class AWSSecurityGroupService(BaseSecurityGroupService):
     def __init__(self, provider):
         super(AWSSecurityGroupService, self).__init__(provider)
 
+    @cached
     def get(self, sg_id):
         """
         Returns a SecurityGroup given its id.
@@ -153,6 +167,7 @@ class AWSSecurityGroupService(BaseSecurityGroupService):
         except EC2ResponseError:
             return None
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all security groups associated with this account.
@@ -166,6 +181,7 @@ class AWSSecurityGroupService(BaseSecurityGroupService):
         return ClientPagedResultList(self.provider, sgs,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name, description):
         """
         Create a new SecurityGroup.
@@ -184,6 +200,7 @@ class AWSSecurityGroupService(BaseSecurityGroupService):
             return AWSSecurityGroup(self.provider, sg)
         return None
 
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Get all security groups associated with your account.
@@ -195,6 +212,31 @@ class AWSSecurityGroupService(BaseSecurityGroupService):
             security_groups = []
         return [AWSSecurityGroup(self.provider, sg) for sg in security_groups]
 
+    def for_instances(self, instances):
+        instances = list(instances)
+        # pylint:disable=protected-access
+        groups_of = {inst.id: inst._ec2_instance.groups for inst in instances}
+        sg_ids = set(group.id for groups in groups_of.values()
+                     for group in groups)
+        if not sg_ids:
+            return {inst_id: [] for inst_id in groups_of}
+        try:
+            sgs = self.provider.ec2_conn.get_all_security_groups(
+                group_ids=list(sg_ids))
+        except EC2ResponseError as ec2e:
+            if ec2e.error_code not in GROUP_NOT_FOUND_CODES:
+                raise
+            # The request fails if any of the groups has since been deleted,
+            # so look up the rest individually
+            sgs = [sg for sg in (self.get(sg_id) for sg_id in sg_ids) if sg]
+        else:
+            sgs = [AWSSecurityGroup(self.provider, sg) for sg in sgs]
+        by_id = {sg.id: sg for sg in sgs}
+        return {inst_id: [by_id[group.id] for group in groups
+                          if group.id in by_id]
+                for inst_id, groups in groups_of.items()}
+
+    @invalidates_cache()
     def delete(self, group_id):
         """
         Delete an existing SecurityGroup.
@@ -250,6 +292,25 @@ class AWSVolumeService(BaseVolumeService):
         vols = self.provider.ec2_conn.get_all_volumes(volume_ids=[volume_id])
         return AWSVolume(self.provider, vols[0]) if vols else None
 
+    def _refresh_many(self, volumes):
+        """
+        Refreshes the state of all the given volumes with a single request.
+        """
+        try:
+            latest = {vol.id: vol for vol in
+                      self.provider.ec2_conn.get_all_volumes(
+                          volume_ids=[vol.id for vol in volumes])}
+        except EC2ResponseError:
+            # At least one of the volumes no longer exists, so fall back to
+            # refreshing them individually
+            return super(AWSVolumeService, self)._refresh_many(volumes)
+        for vol in volumes:
+            # pylint:disable=protected-access
+            if vol.id in latest:
+                vol._volume = latest[vol.id]
+            else:
+                vol._volume.status = 'unknown'
+
     def find(self, name, limit=None, marker=None):
         """
         Searches for a volume by a given list of attributes.
@@ -269,7 +330,8 @@ class AWSVolumeService(BaseVolumeService):
         return ClientPagedResultList(self.provider, cb_vols,
                                      limit=limit, marker=marker)
 
-    def create(self, name, size, zone, snapshot=None, description=None):
+    def create(self, name, size, zone, snapshot=None, description=None,
+               tags=None):
         """
         Creates a new volume.
         """
@@ -281,11 +343,12 @@ class AWSVolumeService(BaseVolumeService):
             size,
             zone_id,
             snapshot=snapshot_id)
-        cb_vol = AWSVolume(self.provider, ec2_vol)
-        cb_vol.name = name
+        # The name, description and any other tags are set in one request
+        tags = dict(tags or {}, Name=name)
         if description:
-            cb_vol.description = description
-        return cb_vol
+            tags['Description'] = description
+        create_tags(self.provider.ec2_conn, [ec2_vol], tags)
+        return AWSVolume(self.provider, ec2_vol)
 
 
 class AWSSnapshotService(BaseSnapshotService):
@@ -306,6 +369,25 @@ class AWSSnapshotService(BaseSnapshotService):
             raise ec2e
         return AWSSnapshot(self.provider, snaps[0]) if snaps else None
 
+    def _refresh_many(self, snapshots):
+        """
+        Refreshes the state of all the given snapshots with a single request.
+        """
+        try:
+            latest = {snap.id: snap for snap in
+                      self.provider.ec2_conn.get_all_snapshots(
+                          snapshot_ids=[snap.id for snap in snapshots])}
+        except EC2ResponseError:
+            # At least one of the snapshots no longer exists, so fall back to
+            # refreshing them individually
+            return super(AWSSnapshotService, self)._refresh_many(snapshots)
+        for snap in snapshots:
+            # pylint:disable=protected-access
+            if snap.id in latest:
+                snap._snapshot = latest[snap.id]
+            else:
+                snap._snapshot.status = 'unknown'
+
     def find(self, name, limit=None, marker=None):
         """
         Searches for a snapshot by a given list of attributes.
@@ -326,7 +408,7 @@ class AWSSnapshotService(BaseSnapshotService):
         return ClientPagedResultList(self.provider, snaps,
                                      limit=limit, marker=marker)
 
-    def create(self, name, volume, description=None):
+    def create(self, name, volume, description=None, tags=None):
         """
         Creates a new snapshot of a given volume.
         """
@@ -335,11 +417,11 @@ class AWSSnapshotService(BaseSnapshotService):
         ec2_snap = self.provider.ec2_conn.create_snapshot(
             volume_id,
             description=description)
-        cb_snap = AWSSnapshot(self.provider, ec2_snap)
-        cb_snap.name = name
+        tags = dict(tags or {}, Name=name)
         if description:
-            cb_snap.description = description
-        return cb_snap
+            tags['Description'] = description
+        create_tags(self.provider.ec2_conn, [ec2_snap], tags)
+        return AWSSnapshot(self.provider, ec2_snap)
 
 
 class AWSObjectStoreService(BaseObjectStoreService):
@@ -392,6 +474,7 @@ class AWSImageService(BaseImageService):
     def __init__(self, provider):
         super(AWSImageService, self).__init__(provider)
 
+    @cached
     def get(self, image_id):
         """
         Returns an Image given its id
@@ -405,6 +488,26 @@ class AWSImageService(BaseImageService):
 
         return None
 
+    def _refresh_many(self, images):
+        """
+        Refreshes the state of all the given images with a single request.
+        """
+        try:
+            latest = {img.id: img for img in
+                      self.provider.ec2_conn.get_all_images(
+                          image_ids=[img.id for img in images])}
+        except EC2ResponseError:
+            # At least one of the images no longer exists, so fall back to
+            # refreshing them individually
+            return super(AWSImageService, self)._refresh_many(images)
+        for img in images:
+            # pylint:disable=protected-access
+            if img.id in latest:
+                img._ec2_image = latest[img.id]
+            else:
+                img._ec2_image.state = 'unknown'
+
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Searches for an image by a given list of attributes
@@ -415,6 +518,7 @@ class AWSImageService(BaseImageService):
         return ClientPagedResultList(self.provider, images,
                                      limit=limit, marker=marker)
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all images.
@@ -458,11 +562,21 @@ class AWSInstanceService(BaseInstanceService):
 
     def create(self, name, image, instance_type, zone=None,
                key_pair=None, security_groups=None, user_data=None,
-               launch_config=None,
+               launch_config=None, tags=None,
                **kwargs):
         """
         Creates a new virtual machine instance.
         """
+        return self._create_many([name], image, instance_type, zone,
+                                 key_pair, security_groups, user_data,
+                                 launch_config, tags, **kwargs)[0]
+
+    def _create_many(self, names, image, instance_type, zone=None,
+                     key_pair=None, security_groups=None, user_data=None,
+                     launch_config=None, tags=None, **kwargs):
+        """
+        Launches all the instances with a single request.
+        """
         image_id = image.id if isinstance(image, MachineImage) else image
         instance_size = instance_type.id if \
             isinstance(instance_type, InstanceType) else instance_type
@@ -486,13 +600,60 @@ class AWSInstanceService(BaseInstanceService):
 
         reservation = self.provider.ec2_conn.run_instances(
             image_id=image_id, instance_type=instance_size,
-            min_count=1, max_count=1, placement=zone_id,
+            min_count=len(names), max_count=len(names), placement=zone_id,
             key_name=key_pair_name, security_groups=security_groups_list,
             user_data=user_data, block_device_map=bdm, subnet_id=net_id)
-        if reservation:
-            instance = AWSInstance(self.provider, reservation.instances[0])
-            instance.name = name
-        return instance
+        ec2_instances = sorted(
+            reservation.instances,
+            key=lambda inst: int(inst.ami_launch_index or 0))
+        # A request can only apply the same tags to all the given
+        # resources, so one is needed for each distinct name
+        named = collections.OrderedDict()
+        for inst, name in zip(ec2_instances, names):
+            named.setdefault(name, []).append(inst)
+        for name, group in named.items():
+            create_tags(self.provider.ec2_conn, group,
+                        dict(tags or {}, Name=name))
+        return [AWSInstance(self.provider, inst) for inst in ec2_instances]
+
+    def terminate_many(self, instances):
+        """
+        Terminates all the instances with a single request.
+        """
+        instances = list(instances)
+        if not instances:
+            return BatchResult()
+        try:
+            terminated = self.provider.ec2_conn.terminate_instances(
+                instance_ids=[object_id(inst) for inst in instances])
+        except EC2ResponseError as ec2e:
+            if ec2e.error_code not in INSTANCE_NOT_FOUND_CODES:
+                raise
+            # At least one of the instances does not exist, so fall back to
+            # terminating them individually
+            return super(AWSInstanceService, self).terminate_many(instances)
+        latest = {inst.id: inst for inst in terminated}
+        for inst in instances:
+            if isinstance(inst, AWSInstance) and inst.id in latest:
+                # pylint:disable=protected-access
+                inst._ec2_instance._update(latest[inst.id])
+        return BatchResult.fromkeys(object_id(inst) for inst in instances)
+
+    def reboot_many(self, instances):
+        """
+        Reboots all the instances with a single request.
+        """
+        instances = list(instances)
+        if not instances:
+            return BatchResult()
+        try:
+            self.provider.ec2_conn.reboot_instances(
+                instance_ids=[object_id(inst) for inst in instances])
+        except EC2ResponseError as ec2e:
+            if ec2e.error_code not in INSTANCE_NOT_FOUND_CODES:
+                raise
+            return super(AWSInstanceService, self).reboot_many(instances)
+        return BatchResult.fromkeys(object_id(inst) for inst in instances)
 
     def _process_block_device_mappings(self, launch_config, zone=None):
         """
@@ -565,6 +726,26 @@ class AWSInstanceService(BaseInstanceService):
         else:
             return None
 
+    def _refresh_many(self, instances):
+        """
+        Refreshes the state of all the given instances with a single request.
+        """
+        try:
+            reservations = self.provider.ec2_conn.get_all_reservations(
+                instance_ids=[inst.id for inst in instances])
+        except EC2ResponseError:
+            # At least one of the instances no longer exists, so fall back to
+            # refreshing them individually
+            return super(AWSInstanceService, self)._refresh_many(instances)
+        latest = {inst.id: inst
+                  for res in reservations for inst in res.instances}
+        for inst in instances:
+            # pylint:disable=protected-access
+            if inst.id in latest:
+                inst._ec2_instance = latest[inst.id]
+            else:
+                inst._ec2_instance._state.name = 'unknown'
+
     def find(self, name, limit=None, marker=None):
         """
         Searches for an instance by a given list of attributes.
@@ -606,21 +787,52 @@ class AWSInstanceTypesService(BaseInstanceTypesService):
 
     def __init__(self, provider):
         super(AWSInstanceTypesService, self).__init__(provider)
+        self._catalog = InstanceTypeCatalog(
+            self.provider.config.get("aws_instance_info_url",
+                                     AWS_INSTANCE_DATA_DEFAULT_URL),
+            ttl=self.provider.config.get("aws_instance_info_ttl",
+                                         DEFAULT_CATALOG_TTL),
+            cache_dir=self.provider.config.cache_dir)
+        # The instance types of the current catalog, with their index
+        self._listed = None
 
     @property
     def instance_data(self):
         """
-        TODO: Needs a caching function with timeout
+        The description of each instance type, from a catalog which is
+        downloaded once and then revalidated after
+        ``aws_instance_info_ttl`` seconds.
         """
-        r = requests.get(self.provider.config.get(
-            "aws_instance_info_url", AWS_INSTANCE_DATA_DEFAULT_URL))
-        return r.json()
+        return self._catalog.entries
 
+    def get(self, instance_type_id):
+        inst_type = self._catalog.get(instance_type_id)
+        return AWSInstanceType(self.provider, inst_type) if inst_type else None
+
+    def find(self, **kwargs):
+        name = kwargs.get('name')
+        if name:
+            # Instance types are named by their id
+            inst_type = self.get(name)
+            return [inst_type] if inst_type else []
+        else:
+            raise TypeError(
+                "Invalid parameters for search. Supported attributes: {name}")
+
+    @cached
     def list(self, limit=None, marker=None):
-        inst_types = [AWSInstanceType(self.provider, inst_type)
-                      for inst_type in self.instance_data]
-        return ClientPagedResultList(self.provider, inst_types,
-                                     limit=limit, marker=marker)
+        entries = self.instance_data
+        listed = self._listed
+        if listed is None or listed[0] is not entries:
+            # Built once per catalog, so that each page after the first
+            # finds its marker without scanning all instance types
+            inst_types = [AWSInstanceType(self.provider, inst_type)
+                          for inst_type in entries]
+            listed = (entries, inst_types,
+                      ClientPagedResultList.build_index(inst_types))
+            self._listed = listed
+        return ClientPagedResultList(self.provider, listed[1], limit=limit,
+                                     marker=marker, index=listed[2])
 
 
 class AWSRegionService(BaseRegionService):
@@ -628,6 +840,7 @@ class AWSRegionService(BaseRegionService):
     def __init__(self, provider):
         super(AWSRegionService, self).__init__(provider)
 
+    @cached
     def get(self, region_id):
         region = self.provider.ec2_conn.get_all_regions(
             region_names=[region_id])
@@ -636,6 +849,7 @@ class AWSRegionService(BaseRegionService):
         else:
             return None
 
+    @cached
     def list(self, limit=None, marker=None):
         regions = [AWSRegion(self.provider, region)
                    for region in self.provider.ec2_conn.get_all_regions()]
@@ -653,18 +867,21 @@ class AWSNetworkService(BaseNetworkService):
         super(AWSNetworkService, self).__init__(provider)
         self._subnet_svc = AWSSubnetService(self.provider)
 
+    @cached
     def get(self, network_id):
         network = self.provider.vpc_conn.get_all_vpcs(vpc_ids=[network_id])
         if network:
             return AWSNetwork(self.provider, network[0])
         return None
 
+    @cached
     def list(self, limit=None, marker=None):
         networks = [AWSNetwork(self.provider, network)
                     for network in self.provider.vpc_conn.get_all_vpcs()]
         return ClientPagedResultList(self.provider, networks,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name=None):
         # AWS requried CIDR block to be specified when creating a network
         # so set a default one and use the largest possible netmask.
@@ -685,12 +902,14 @@ class AWSSubnetService(BaseSubnetService):
     def __init__(self, provider):
         super(AWSSubnetService, self).__init__(provider)
 
+    @cached
     def get(self, subnet_id):
         subnets = self.provider.vpc_conn.get_all_subnets([subnet_id])
         if subnets:
             return AWSSubnet(self.provider, subnets[0])
         return None
 
+    @cached
     def list(self, network=None):
         fltr = None
         if network:
@@ -700,6 +919,7 @@ class AWSSubnetService(BaseSubnetService):
         subnets = self.provider.vpc_conn.get_all_subnets(filters=fltr)
         return [AWSSubnet(self.provider, subnet) for subnet in subnets]
 
+    @invalidates_cache()
     def create(self, network, cidr_block, name=None):
         network_id = network.id if isinstance(network, AWSNetwork) else network
         subnet = self.provider.vpc_conn.create_subnet(network_id, cidr_block)
@@ -708,6 +928,7 @@ class AWSSubnetService(BaseSubnetService):
             cb_subnet.name = name
         return cb_subnet
 
+    @invalidates_cache()
     def delete(self, subnet):
         subnet_id = subnet.id if isinstance(subnet, AWSSubnet) else subnet
         return self.provider.vpc_conn.delete_subnet(subnet_id=subnet_id)
@@ -0,0 +1,71 @@
+"""
+An index of the Keystone service catalog
+"""
+
+# The endpoint fields which hold URLs, in Keystone v2 and v3 catalogs
+ENDPOINT_URL_KEYS = ('publicURL', 'internalURL', 'adminURL', 'url')
+
+
+def _normalise_url(url):
+    return url.rstrip('/')
+
+
+class ServiceCatalogIndex(object):
+    """
+    The endpoints of a Keystone service catalog, indexed by region and
+    service type, and the region of each endpoint, indexed by URL.
+
+    The catalog is parsed once, so that looking up a region or an endpoint
+    does not walk the catalog.
+    """
+
+    def __init__(self, catalog):
+        """
+        :type catalog: :class:`keystoneclient.service_catalog.ServiceCatalog`
+        :param catalog: The service catalog to index.
+        """
+        self.source = catalog
+        self._endpoints = {}
+        self._regions_by_url = {}
+        for svc in catalog.get_data():
+            for endpoint in svc.get('endpoints', []):
+                region = endpoint.get('region') or endpoint.get('region_id')
+                if not region:
+                    continue
+                services = self._endpoints.setdefault(region, {})
+                services.setdefault(svc.get('type'), []).append(endpoint)
+                for key in ENDPOINT_URL_KEYS:
+                    if endpoint.get(key):
+                        self._regions_by_url.setdefault(
+                            _normalise_url(endpoint[key]), region)
+
+    @property
+    def regions(self):
+        """
+        :rtype: ``list`` of ``str``
+        :return: The names of the regions which have endpoints.
+        """
+        return sorted(self._endpoints)
+
+    def has_region(self, region):
+        return region in self._endpoints
+
+    def endpoints(self, region, service_type):
+        """
+        :rtype: ``list`` of ``dict``
+        :return: The endpoints of a type of service, such as ``compute``, in
+                 a region.
+        """
+        return list(self._endpoints.get(region, {}).get(service_type, []))
+
+    def region_of(self, url):
+        """
+        :rtype: ``str``
+        :return: The region of the endpoint with the given URL, or ``None``
+                 if the URL is not in the catalog.
+        """
+        return self._regions_by_url.get(_normalise_url(url)) if url else None
+
+    def __repr__(self):
+        return "<CB-{0}: {1} regions>".format(self.__class__.__name__,
+                                              len(self._endpoints))
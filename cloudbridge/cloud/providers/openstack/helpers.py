@@ -27,10 +27,40 @@ def to_server_paged_list(provider, objects, limit):
     """
     limit = limit or provider.config.default_result_limit
     is_truncated = len(objects) > limit
-    next_token = objects[limit].id if is_truncated else None
+    # OpenStack markers are the id of the last object already returned
+    next_token = objects[limit - 1].id if is_truncated else None
     results = ServerPagedResultList(is_truncated,
                                     next_token,
                                     False)
     for obj in itertools.islice(objects, limit):
         results.append(obj)
     return results
+
+
+def find_by_ids(list_page, ids):
+    """
+    Looks up the objects with the given ids in a listing, following its
+    markers from page to page until all of them are found or the listing
+    ends. The services cap each page, so the first page alone may miss some
+    of the objects.
+
+    :type list_page: ``callable``
+    :param list_page: Receives a marker, or ``None`` for the first page,
+                      and returns a page of OpenStack native objects.
+
+    :rtype: ``dict``
+    :return: The objects found, by id.
+    """
+    wanted = set(ids)
+    found = {}
+    marker = None
+    while True:
+        page = list_page(marker)
+        if not page:
+            return found
+        for obj in page:
+            if obj.id in wanted:
+                found[obj.id] = obj
+        if len(found) == len(wanted):
+            return found
+        marker = page[-1].id
@@ -3,7 +3,10 @@ Provider implementation based on OpenStack Python clients for OpenStack
 compatible clouds.
 """
 
+import copy
+import logging
 import os
+import threading
 
 from cinderclient import client as cinder_client
 from keystoneclient import client as keystone_client
@@ -14,12 +17,24 @@ from novaclient import shell as nova_shell
 from swiftclient import client as swift_client
 
 from cloudbridge.cloud.base import BaseCloudProvider
+from cloudbridge.cloud.base.interceptors import request_operation
 
+from .catalog import ServiceCatalogIndex
+from .resources import OpenStackInstance
+from .resources import OpenStackSnapshot
+from .resources import OpenStackVolume
 from .services import OpenStackBlockStoreService
 from .services import OpenStackComputeService
 from .services import OpenStackNetworkService
 from .services import OpenStackObjectStoreService
 from .services import OpenStackSecurityService
+from .token_cache import TokenCache
+
+log = logging.getLogger(__name__)
+
+# The number of seconds before its expiry at which a Keystone token is
+# replaced, so that requests in flight are not rejected
+TOKEN_REFRESH_MARGIN = 300
 
 
 class OpenStackCloudProvider(BaseCloudProvider):
@@ -68,15 +83,34 @@ class OpenStackCloudProvider(BaseCloudProvider):
             'os_swift_region_name',
             os.environ.get('OS_SWIFT_REGION_NAME', self.region_name))
 
-        # Service connections, lazily initialized
-        self._nova = None
-        self._keystone = None
-        self._glance = None
-        self._cinder = None
-        self._swift = None
-        self._neutron = None
-
-        # Initialize provider services
+        # The Keystone version and session are shared by all connections, so
+        # that version discovery and authentication happen only once
+        self._keystone_lock = threading.RLock()
+        self._cached_keystone_version = None
+        self._cached_keystone_session = None
+        self._cached_catalog_index = None
+        # The storage URL and token of the first Swift connection, with
+        # which later connections are created so that they need not
+        # authenticate
+        self._swift_lock = threading.Lock()
+        self._swift_auth = None
+
+        # Service connections, lazily initialized per thread. The Keystone
+        # client is only used to authenticate and query the service
+        # catalog, so is shared.
+        self._nova_pool = self._connection_pool(self._connect_nova)
+        self._keystone_pool = self._connection_pool(self._connect_keystone,
+                                                    per_thread=False)
+        self._cinder_pool = self._connection_pool(self._connect_cinder)
+        self._swift_pool = self._connection_pool(self._connect_swift)
+        self._neutron_pool = self._connection_pool(self._connect_neutron)
+
+        self._init_services()
+
+    def _init_services(self):
+        """
+        Initialize provider services
+        """
         self._compute = OpenStackComputeService(self)
         self._network = OpenStackNetworkService(self)
         self._security = OpenStackSecurityService(self)
@@ -85,24 +119,52 @@ class OpenStackCloudProvider(BaseCloudProvider):
 
     @property
     def nova(self):
-        if not self._nova:
-            self._nova = self._connect_nova()
-        return self._nova
+        return self._nova_pool.get()
 
     @property
     def keystone(self):
-        if not self._keystone:
-            self._keystone = self._connect_keystone()
-        return self._keystone
+        return self._keystone_pool.get()
+
+    @property
+    def _catalog_index(self):
+        """
+        Return an index of the service catalog, which is parsed again only
+        when Keystone issues a new token and catalog.
+
+        :rtype: :class:`.ServiceCatalogIndex`
+        :return: The index, or ``None`` if there is no service catalog.
+        """
+        keystone = self.keystone
+        if not keystone.has_service_catalog():
+            return None
+        catalog = keystone.service_catalog
+        index = self._cached_catalog_index
+        if index is None or index.source is not catalog:
+            index = ServiceCatalogIndex(catalog)
+            self._cached_catalog_index = index
+        return index
 
     @property
     def _keystone_version(self):
         """
-        Return the numeric version of remote Keystone server.
+        Return the numeric version of remote Keystone server. The version is
+        taken from ``os_identity_api_version`` if given, or else discovered
+        once from the server.
 
         :rtype: ``int``
         :return: Keystone version as an int (currently, 2 or 3).
         """
+        if self._cached_keystone_version is None:
+            with self._keystone_lock:
+                if self._cached_keystone_version is None:
+                    self._cached_keystone_version = \
+                        self._discover_keystone_version()
+        return self._cached_keystone_version
+
+    def _discover_keystone_version(self):
+        if self.identity_api_version:
+            version = str(self.identity_api_version).lstrip('v')
+            return 3 if version.startswith('3') else 2
         ks_version = keystone_client.Client(auth_url=self.auth_url).version
         if ks_version == 'v3':
             return 3
@@ -111,29 +173,76 @@ class OpenStackCloudProvider(BaseCloudProvider):
     @property
     def _keystone_session(self):
         """
-        Connect to Keystone and return a session object.
+        Return the Keystone session shared by all of the provider's
+        connections. The session keeps its token until shortly before the
+        token expires, when it authenticates again.
 
         :rtype: :class:`keystoneclient.session.Session`
         :return: A Keystone session object.
         """
+        if self._cached_keystone_session is None:
+            with self._keystone_lock:
+                if self._cached_keystone_session is None:
+                    self._cached_keystone_session = \
+                        self._connect_keystone_session()
+        return self._cached_keystone_session
+
+    def _connect_keystone_session(self):
+        """
+        Connect to Keystone and return a new session object.
+        """
         def connect_v2():
             from keystoneclient.auth.identity import Password as password_v2
-            auth = password_v2(self.auth_url, username=self.username,
+            return password_v2(self.auth_url, username=self.username,
                                password=self.password,
                                tenant_name=self.tenant_name)
-            return session.Session(auth=auth)
 
         def connect_v3():
             from keystoneclient.auth.identity.v3 import Password as password_v3
-            auth = password_v3(auth_url=self.auth_url,
+            return password_v3(auth_url=self.auth_url,
                                username=self.username,
                                password=self.password,
                                user_domain_name=self.user_domain_name,
                                project_domain_name=self.project_domain_name,
                                project_name=self.project_name)
-            return session.Session(auth=auth)
 
-        return connect_v3() if self._keystone_version == 3 else connect_v2()
+        auth = connect_v3() if self._keystone_version == 3 else connect_v2()
+        auth.MIN_TOKEN_LIFE_SECONDS = TOKEN_REFRESH_MARGIN
+        sess = session.Session(auth=auth)
+        if self.config.get('os_token_cache', False) and self.config.cache_dir:
+            self._authenticate_from_cache(sess)
+        return sess
+
+    def _authenticate_from_cache(self, sess):
+        """
+        Gives a session the token saved by another process, if it is still
+        valid, or else authenticates and saves the new token for others.
+        """
+        auth = sess.auth
+        if not hasattr(auth, 'get_auth_state'):
+            log.warning("The installed keystoneclient cannot save tokens, so"
+                        " the Keystone token cache is not used")
+            return
+        cache = TokenCache(self.config.cache_dir)
+        key = cache.key(self.auth_url, self.username, self.tenant_name,
+                        self.project_name, self.user_domain_name,
+                        self.project_domain_name)
+        with cache.lock(key):
+            state = cache.load(key)
+            if state:
+                try:
+                    auth.set_auth_state(state)
+                except ValueError:
+                    log.debug("Ignoring an unreadable cached token")
+                if auth.auth_ref and not auth.auth_ref.will_expire_soon(
+                        TOKEN_REFRESH_MARGIN):
+                    return
+            auth.get_access(sess)
+            try:
+                cache.save(key, auth.get_auth_state())
+            except (IOError, OSError) as e:
+                log.warning("Could not save the Keystone token in %s: %s",
+                            self.config.cache_dir, e)
 
 #     @property
 #     def glance(self):
@@ -143,21 +252,15 @@ class OpenStackCloudProvider(BaseCloudProvider):
 
     @property
     def cinder(self):
-        if not self._cinder:
-            self._cinder = self._connect_cinder()
-        return self._cinder
+        return self._cinder_pool.get()
 
     @property
     def swift(self):
-        if not self._swift:
-            self._swift = self._connect_swift()
-        return self._swift
+        return self._swift_pool.get()
 
     @property
     def neutron(self):
-        if not self._neutron:
-            self._neutron = self._connect_neutron()
-        return self._neutron
+        return self._neutron_pool.get()
 
     @property
     def compute(self):
@@ -179,6 +282,41 @@ class OpenStackCloudProvider(BaseCloudProvider):
     def object_store(self):
         return self._object_store
 
+    def _tag(self, resource, tags):
+        """
+        Sets tags as the metadata of an instance, volume or snapshot.
+        """
+        if isinstance(resource, OpenStackInstance):
+            self.nova.servers.set_meta(resource.id, tags)
+        elif isinstance(resource, OpenStackVolume):
+            self.cinder.volumes.set_metadata(resource.id, tags)
+        elif isinstance(resource, OpenStackSnapshot):
+            self.cinder.volume_snapshots.set_metadata(resource.id, tags)
+        else:
+            super(OpenStackCloudProvider, self)._tag(resource, tags)
+
+    def _region_view(self, region_name):
+        """
+        Returns a copy of this provider for another region, with its own
+        Nova, Cinder and Neutron connections, and Swift connections unless
+        a separate Swift region is configured. The Keystone session and
+        client are shared.
+        """
+        # Created before copying, so that the view shares them
+        self._keystone_session  # pylint:disable=pointless-statement
+        view = copy.copy(self)
+        view.region_name = region_name
+        view._nova_pool = view._connection_pool(view._connect_nova)
+        view._cinder_pool = view._connection_pool(view._connect_cinder)
+        view._neutron_pool = view._connection_pool(view._connect_neutron)
+        if self.swift_region_name == self.region_name:
+            view.swift_region_name = region_name
+            view._swift_lock = threading.Lock()
+            view._swift_auth = None
+            view._swift_pool = view._connection_pool(view._connect_swift)
+        view._init_services()
+        return view
+
     def _connect_nova(self):
         return self._connect_nova_region(self.region_name)
 
@@ -186,27 +324,6 @@ class OpenStackCloudProvider(BaseCloudProvider):
         """
         Get an OpenStack Nova (compute) client object for the given cloud.
         """
-        def connect_pwd():
-            """
-            Connect using username and password parameters.
-            """
-            nova = nova_client.Client(
-                api_version, username=self.username, api_key=self.password,
-                project_id=self.tenant_name, auth_url=self.auth_url,
-                region_name=region_name, service_name=service_name,
-                http_log_debug=True if self.config.debug_mode else False)
-            nova.authenticate()
-            return nova
-
-        def connect_sess():
-            """
-            Connect using a Keystone session object.
-            """
-            return nova_client.Client(
-                api_version, session=self._keystone_session,
-                service_name=service_name,
-                http_log_debug=True if self.config.debug_mode else False)
-
         api_version = self._get_config_value(
             'os_compute_api_version',
             os.environ.get('OS_COMPUTE_API_VERSION', 2))
@@ -217,7 +334,14 @@ class OpenStackCloudProvider(BaseCloudProvider):
         if self.config.debug_mode:
             nova_shell.OpenStackComputeShell().setup_debugging(True)
 
-        return connect_sess() if self._keystone_version == 3 else connect_pwd()
+        # The shared session is used with either Keystone version, so that
+        # connections do not authenticate again
+        nova = nova_client.Client(
+            api_version, session=self._keystone_session,
+            region_name=region_name, service_name=service_name,
+            http_log_debug=True if self.config.debug_mode else False)
+        self._intercept('nova', nova.client, 'request', _client_operation)
+        return nova
 
     def _connect_keystone(self):
         """
@@ -250,26 +374,15 @@ class OpenStackCloudProvider(BaseCloudProvider):
         Get an OpenStack Cinder (block storage) client object for the given
         cloud.
         """
-        def connect_pwd():
-            """
-            Connect using username and password parameters.
-            """
-            return cinder_client.Client(
-                api_version, username=self.username, api_key=self.password,
-                project_id=self.tenant_name, auth_url=self.auth_url)
-
-        def connect_sess():
-            """
-            Connect using a Keystone session object.
-            """
-            return cinder_client.Client(
-                api_version, session=self._keystone_session)
-
         api_version = self._get_config_value(
             'os_volume_api_version',
             os.environ.get('OS_VOLUME_API_VERSION', 2))
 
-        return connect_sess() if self._keystone_version == 3 else connect_pwd()
+        cinder = cinder_client.Client(
+            api_version, session=self._keystone_session,
+            region_name=self.region_name)
+        self._intercept('cinder', cinder.client, 'request', _client_operation)
+        return cinder
 
 #     def _connect_glance(self):
 #         """
@@ -288,30 +401,57 @@ class OpenStackCloudProvider(BaseCloudProvider):
         Get an OpenStack Swift (object store) client object for the given
         cloud.
         """
-        os_options = {'region_name': self.swift_region_name}
-        return swift_client.Connection(
-            authurl=self.swift_auth_url, auth_version='2',
-            user=self.swift_username, key=self.swift_password,
-            tenant_name=self.swift_tenant_name,
-            os_options=os_options)
+        def connect(**kwargs):
+            return swift_client.Connection(
+                authurl=self.swift_auth_url, auth_version='2',
+                user=self.swift_username, key=self.swift_password,
+                tenant_name=self.swift_tenant_name,
+                os_options={'region_name': self.swift_region_name},
+                # Retries are left to the provider if it has a retry policy
+                retries=5 if self._sdk_retries else 0, **kwargs)
+
+        # Each thread has its own connection, so only the first one
+        # authenticates and the others reuse its storage URL and token.
+        # They authenticate again themselves when the token expires.
+        with self._swift_lock:
+            if self._swift_auth is None:
+                self._swift_auth = connect().get_auth()
+        url, token = self._swift_auth
+        swift = connect(preauthurl=url, preauthtoken=token)
+        # All Connection methods send their request through _retry
+        return self._intercept('swift', swift, '_retry', _swift_operation,
+                               self.swift_region_name)
 
     def _connect_neutron(self):
         """
         Get an OpenStack Neutron (networking) client object for the given
         cloud.
         """
-        def connect_pwd():
-            """
-            Connect using username and password parameters.
-            """
-            return neutron_client.Client(
-                username=self.username, password=self.password,
-                tenant_name=self.tenant_name, auth_url=self.auth_url)
-
-        def connect_sess():
-            """
-            Connect using a Keystone session object.
-            """
-            return neutron_client.Client(session=self._keystone_session)
-
-        return connect_sess() if self._keystone_version == 3 else connect_pwd()
+        neutron = neutron_client.Client(session=self._keystone_session,
+                                        region_name=self.region_name)
+        return self._intercept('neutron', neutron, 'do_request',
+                               _neutron_operation)
+
+
+def _client_operation(url, method, *args, **kwargs):
+    """
+    Returns a name for a request made through the request method of a
+    Nova or Cinder HTTP client, e.g. ``GET /servers/{id}``.
+    """
+    return request_operation(method, url)
+
+
+def _neutron_operation(method, action, *args, **kwargs):
+    """
+    Returns a name for a request made through a Neutron client's do_request
+    method, e.g. ``GET /networks/{id}``.
+    """
+    return request_operation(method, action)
+
+
+def _swift_operation(reset_func, func, *args, **kwargs):
+    """
+    Returns the name of the swiftclient function called through a
+    Connection's _retry method, e.g. ``get_container``.
+    """
+    return func.__name__
@@ -1,6 +1,7 @@
 """
 DataTypes used by this provider
 """
+from cloudbridge.cloud.base.cache import invalidates_cache
 from cloudbridge.cloud.base.resources import BaseAttachmentInfo
 from cloudbridge.cloud.base.resources import BaseBucket
 from cloudbridge.cloud.base.resources import BaseBucketObject
@@ -22,8 +23,6 @@ from cloudbridge.cloud.interfaces.resources import NetworkState
 from cloudbridge.cloud.interfaces.resources import SnapshotState
 from cloudbridge.cloud.interfaces.resources import VolumeState
 from cloudbridge.cloud.providers.openstack import helpers as oshelpers
-import inspect
-import json
 
 import ipaddress
 
@@ -34,6 +33,8 @@ import swiftclient.exceptions as swiftex
 
 class OpenStackMachineImage(BaseMachineImage):
 
+    __slots__ = ('_os_image',)
+
     # ref: http://docs.openstack.org/developer/glance/statuses.html
     IMAGE_STATE_MAP = {
         'QUEUED': MachineImageState.PENDING,
@@ -73,6 +74,7 @@ class OpenStackMachineImage(BaseMachineImage):
         """
         return None
 
+    @invalidates_cache('compute.images')
     def delete(self):
         """
         Delete this image
@@ -89,7 +91,8 @@ class OpenStackMachineImage(BaseMachineImage):
         Refreshes the state of this instance by re-querying the cloud provider
         for its latest state.
         """
-        image = self._provider.compute.images.get(self.id)
+        image = self._provider.compute.images.get(self.id,
+                                                  bypass_cache=True)
         if image:
             self._os_image = image._os_image  # pylint:disable=protected-access
         else:
@@ -100,6 +103,8 @@ class OpenStackMachineImage(BaseMachineImage):
 
 class OpenStackPlacementZone(BasePlacementZone):
 
+    __slots__ = ('_os_zone', '_os_region')
+
     def __init__(self, provider, zone, region):
         super(OpenStackPlacementZone, self).__init__(provider)
         if isinstance(zone, OpenStackPlacementZone):
@@ -143,6 +148,8 @@ class OpenStackPlacementZone(BasePlacementZone):
 
 class OpenStackInstanceType(BaseInstanceType):
 
+    __slots__ = ('_os_flavor',)
+
     def __init__(self, provider, os_flavor):
         super(OpenStackInstanceType, self).__init__(provider)
         self._os_flavor = os_flavor
@@ -194,6 +201,8 @@ class OpenStackInstanceType(BaseInstanceType):
 
 class OpenStackInstance(BaseInstance):
 
+    __slots__ = ('_os_instance',)
+
     # ref: http://docs.openstack.org/developer/nova/v2/2.0_server_concepts.html
     # and http://developer.openstack.org/api-ref-compute-v2.html
     INSTANCE_STATE_MAP = {
@@ -217,6 +226,11 @@ class OpenStackInstance(BaseInstance):
         'VERIFY_RESIZE': InstanceState.CONFIGURING
     }
 
+    # Nova only returns the names of an instance's security groups, so their
+    # ids cannot be serialized without additional requests
+    JSON_FIELDS = tuple(field for field in BaseInstance.JSON_FIELDS
+                        if field != 'security_group_ids')
+
     def __init__(self, provider, os_instance):
         super(OpenStackInstance, self).__init__(provider)
         self._os_instance = os_instance
@@ -319,8 +333,8 @@ class OpenStackInstance(BaseInstance):
         """
         Get the security groups associated with this instance.
         """
-        return [self._provider.security.security_groups.find(group['name'])[0]
-                for group in self._os_instance.security_groups]
+        return self._provider.security.security_groups.for_instances(
+            [self])[self.id]
 
     @property
     def security_group_ids(self):
@@ -336,13 +350,15 @@ class OpenStackInstance(BaseInstance):
         """
         return self._os_instance.key_name
 
+    @invalidates_cache('compute.images')
     def create_image(self, name):
         """
         Create a new image based on this instance.
         """
         image_id = self._os_instance.create_image(name)
         return OpenStackMachineImage(
-            self._provider, self._provider.compute.images.get(image_id))
+            self._provider,
+            self._provider.compute.images.get(image_id, bypass_cache=True))
 
     def add_floating_ip(self, ip_address):
         """
@@ -379,6 +395,8 @@ class OpenStackInstance(BaseInstance):
 
 class OpenStackRegion(BaseRegion):
 
+    __slots__ = ('_os_region',)
+
     def __init__(self, provider, os_region):
         super(OpenStackRegion, self).__init__(provider)
         self._os_region = os_region
@@ -399,9 +417,11 @@ class OpenStackRegion(BaseRegion):
         # value requires Admin privileges
         if self.name == self._provider.region_name:  # optimisation
             zones = self._provider.nova.availability_zones.list(detailed=False)
+        elif not self._has_compute_endpoint():
+            zones = []
         else:
             try:
-                region_nova = self._provider._connect_nova_region(self.name)
+                region_nova = self._provider.for_region(self.name).nova
                 zones = region_nova.availability_zones.list(detailed=False)
             except novaex.EndpointNotFound:
                 # This region may not have a compute endpoint. If so just
@@ -412,9 +432,20 @@ class OpenStackRegion(BaseRegion):
                                        self._os_region)
                 for z in zones]
 
+    def _has_compute_endpoint(self):
+        """
+        Checks the service catalog for a compute endpoint in this region,
+        without connecting to it.
+        """
+        # pylint:disable=protected-access
+        index = self._provider._catalog_index
+        return index is None or bool(index.endpoints(self.name, 'compute'))
+
 
 class OpenStackVolume(BaseVolume):
 
+    __slots__ = ('_volume',)
+
     # Ref: http://developer.openstack.org/api-ref-blockstorage-v2.html
     VOLUME_STATE_MAP = {
         'creating': VolumeState.CREATING,
@@ -541,6 +572,8 @@ class OpenStackVolume(BaseVolume):
 
 class OpenStackSnapshot(BaseSnapshot):
 
+    __slots__ = ('_snapshot',)
+
     # Ref: http://developer.openstack.org/api-ref-blockstorage-v2.html
     SNAPSHOT_STATE_MAP = {
         'creating': SnapshotState.PENDING,
@@ -635,6 +668,8 @@ class OpenStackSnapshot(BaseSnapshot):
 
 class OpenStackNetwork(BaseNetwork):
 
+    __slots__ = ('_network',)
+
     # Ref: https://github.com/openstack/neutron/blob/master/neutron/plugins/
     #      common/constants.py
     _NETWORK_STATE_MAP = {
@@ -671,6 +706,7 @@ class OpenStackNetwork(BaseNetwork):
         # OpenStack does not define a CIDR block for networks
         return ''
 
+    @invalidates_cache('network')
     def delete(self):
         if self.id in str(self._provider.neutron.list_networks()):
             self._provider.neutron.delete_network(self.id)
@@ -683,6 +719,7 @@ class OpenStackNetwork(BaseNetwork):
                    .get('subnets', []))
         return [OpenStackSubnet(self._provider, subnet) for subnet in subnets]
 
+    @invalidates_cache('network.subnets')
     def create_subnet(self, cidr_block, name=''):
         subnet_info = {'name': name, 'network_id': self.id,
                        'cidr': cidr_block, 'ip_version': 4}
@@ -695,11 +732,20 @@ class OpenStackNetwork(BaseNetwork):
         Refreshes the state of this network by re-querying the cloud provider
         for its latest state.
         """
-        return self.state
+        networks = self._provider.neutron.list_networks(
+            id=self.id).get('networks')
+        if networks:
+            self._network = networks[0]
+        else:
+            # The network no longer exists and cannot be refreshed.
+            # set the status to unknown
+            self._network['status'] = 'unknown'
 
 
 class OpenStackSubnet(BaseSubnet):
 
+    __slots__ = ('_subnet',)
+
     def __init__(self, provider, subnet):
         super(OpenStackSubnet, self).__init__(provider)
         self._subnet = subnet
@@ -720,6 +766,7 @@ class OpenStackSubnet(BaseSubnet):
     def network_id(self):
         return self._subnet.get('network_id', None)
 
+    @invalidates_cache('network.subnets')
     def delete(self):
         if self.id in str(self._provider.neutron.list_subnets()):
             self._provider.neutron.delete_subnet(self.id)
@@ -730,6 +777,8 @@ class OpenStackSubnet(BaseSubnet):
 
 class OpenStackKeyPair(BaseKeyPair):
 
+    __slots__ = ()
+
     def __init__(self, provider, key_pair):
         super(OpenStackKeyPair, self).__init__(provider, key_pair)
 
@@ -747,6 +796,8 @@ class OpenStackKeyPair(BaseKeyPair):
 
 class OpenStackSecurityGroup(BaseSecurityGroup):
 
+    __slots__ = ()
+
     def __init__(self, provider, security_group):
         super(OpenStackSecurityGroup, self).__init__(provider, security_group)
 
@@ -758,6 +809,7 @@ class OpenStackSecurityGroup(BaseSecurityGroup):
         return [OpenStackSecurityGroupRule(self._provider, r, self)
                 for r in self._security_group.rules]
 
+    @invalidates_cache('security.security_groups')
     def add_rule(self, ip_protocol=None, from_port=None, to_port=None,
                  cidr_ip=None, src_group=None):
         """
@@ -794,6 +846,8 @@ class OpenStackSecurityGroup(BaseSecurityGroup):
                     from_port=1,
                     to_port=65535,
                     group_id=src_group.id)
+                # Keep the local copy of the rules up to date
+                self._security_group.rules.append(rule.to_dict())
             if rule:
                 # We can only return one Rule so default to TCP (ie, last in
                 # the for loop above).
@@ -807,6 +861,7 @@ class OpenStackSecurityGroup(BaseSecurityGroup):
                 to_port=to_port,
                 cidr=cidr_ip)
             if rule:
+                self._security_group.rules.append(rule.to_dict())
                 return OpenStackSecurityGroupRule(self._provider,
                                                   rule.to_dict(), self)
         return None
@@ -826,16 +881,16 @@ class OpenStackSecurityGroup(BaseSecurityGroup):
                 return OpenStackSecurityGroupRule(self._provider, rule, self)
         return None
 
-    def to_json(self):
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        json_rules = [r.to_json() for r in self.rules]
-        js['rules'] = [json.loads(r) for r in json_rules]
-        return json.dumps(js, sort_keys=True)
+    @property
+    def _local_rules(self):
+        return [OpenStackSecurityGroupRule(self._provider, r, self)
+                for r in self._security_group.rules]
 
 
 class OpenStackSecurityGroupRule(BaseSecurityGroupRule):
 
+    __slots__ = ()
+
     def __init__(self, provider, rule, parent):
         super(OpenStackSecurityGroupRule, self).__init__(
             provider, rule, parent)
@@ -870,19 +925,29 @@ class OpenStackSecurityGroupRule(BaseSecurityGroupRule):
                     return OpenStackSecurityGroup(self._provider, sg)
         return None
 
-    def to_json(self):
-        attr = inspect.getmembers(self, lambda a: not(inspect.isroutine(a)))
-        js = {k: v for(k, v) in attr if not k.startswith('_')}
-        js['group'] = self.group.id if self.group else ''
-        js['parent'] = self.parent.id if self.parent else ''
-        return json.dumps(js, sort_keys=True)
+    @property
+    def _group_id(self):
+        # Nova only returns the name of a source group, so its id is only
+        # known locally when the rule refers to its own parent group. Names
+        # are not emitted in its place, since they are not ids.
+        name = self._rule.get('group', {}).get('name')
+        if not name:
+            return ''
+        return self.parent.id if self.parent.name == name else None
 
+    @invalidates_cache('security.security_groups')
     def delete(self):
-        return self._provider.nova.security_group_rules.delete(self.id)
+        self._provider.nova.security_group_rules.delete(self.id)
+        # pylint:disable=protected-access
+        self.parent._security_group.rules = [
+            r for r in self.parent._security_group.rules
+            if r.get('id') != self.id]
 
 
 class OpenStackBucketObject(BaseBucketObject):
 
+    __slots__ = ('cbcontainer', '_obj')
+
     def __init__(self, provider, cbcontainer, obj):
         super(OpenStackBucketObject, self).__init__(provider)
         self.cbcontainer = cbcontainer
@@ -942,6 +1007,8 @@ class OpenStackBucketObject(BaseBucketObject):
 
 class OpenStackBucket(BaseBucket):
 
+    __slots__ = ('_bucket',)
+
     def __init__(self, provider, bucket):
         super(OpenStackBucket, self).__init__(provider)
         self._bucket = bucket
@@ -7,6 +7,8 @@ import re
 from cinderclient.exceptions import NotFound as CinderNotFound
 from novaclient.exceptions import NotFound as NovaNotFound
 
+from cloudbridge.cloud.base.cache import cached
+from cloudbridge.cloud.base.cache import invalidates_cache
 from cloudbridge.cloud.base.resources import BaseLaunchConfig
 from cloudbridge.cloud.base.resources import ClientPagedResultList
 from cloudbridge.cloud.base.services import BaseBlockStoreService
@@ -80,6 +82,7 @@ class OpenStackKeyPairService(BaseKeyPairService):
     def __init__(self, provider):
         super(OpenStackKeyPairService, self).__init__(provider)
 
+    @cached
     def get(self, key_pair_id):
         """
         Returns a KeyPair given its id.
@@ -90,6 +93,7 @@ class OpenStackKeyPairService(BaseKeyPairService):
         except NovaNotFound:
             return None
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all key pairs associated with this account.
@@ -104,6 +108,7 @@ class OpenStackKeyPairService(BaseKeyPairService):
         return ClientPagedResultList(self.provider, results,
                                      limit=limit, marker=marker)
 
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Searches for a key pair by a given list of attributes.
@@ -114,6 +119,7 @@ class OpenStackKeyPairService(BaseKeyPairService):
         return ClientPagedResultList(self.provider, results,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name):
         """
         Create a new key pair or return an existing one by the same name.
@@ -136,6 +142,7 @@ class OpenStackSecurityGroupService(BaseSecurityGroupService):
     def __init__(self, provider):
         super(OpenStackSecurityGroupService, self).__init__(provider)
 
+    @cached
     def get(self, sg_id):
         """
         Returns a SecurityGroup given its id.
@@ -146,6 +153,7 @@ class OpenStackSecurityGroupService(BaseSecurityGroupService):
         except NovaNotFound:
             return None
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all security groups associated with this account.
@@ -160,6 +168,7 @@ class OpenStackSecurityGroupService(BaseSecurityGroupService):
         return ClientPagedResultList(self.provider, sgs,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name, description):
         """
         Create a new security group under the current account.
@@ -178,6 +187,7 @@ class OpenStackSecurityGroupService(BaseSecurityGroupService):
             return OpenStackSecurityGroup(self.provider, sg)
         return None
 
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Get all security groups associated with your account.
@@ -188,6 +198,25 @@ class OpenStackSecurityGroupService(BaseSecurityGroupService):
         return ClientPagedResultList(self.provider, results,
                                      limit=limit, marker=marker)
 
+    def for_instances(self, instances):
+        instances = list(instances)
+        # Servers only refer to their security groups by name
+        # pylint:disable=protected-access
+        names_of = {inst.id: [group['name'] for group in
+                              getattr(inst._os_instance, 'security_groups',
+                                      [])]
+                    for inst in instances}
+        if not any(names_of.values()):
+            return {inst_id: [] for inst_id in names_of}
+        by_name = {}
+        for sg in self.provider.nova.security_groups.list():
+            # Names need not be unique, so the first match is used
+            if sg.name not in by_name:
+                by_name[sg.name] = OpenStackSecurityGroup(self.provider, sg)
+        return {inst_id: [by_name[name] for name in names if name in by_name]
+                for inst_id, names in names_of.items()}
+
+    @invalidates_cache()
     def delete(self, group_id):
         """
         Delete an existing SecurityGroup.
@@ -212,6 +241,7 @@ class OpenStackImageService(BaseImageService):
     def __init__(self, provider):
         super(OpenStackImageService, self).__init__(provider)
 
+    @cached
     def get(self, image_id):
         """
         Returns an Image given its id
@@ -222,6 +252,24 @@ class OpenStackImageService(BaseImageService):
         except NovaNotFound:
             return None
 
+    def _refresh_many(self, images):
+        """
+        Refreshes the state of all the given images by listing them, a page
+        at a time.
+        """
+        if len(images) < 2:
+            return super(OpenStackImageService, self)._refresh_many(images)
+        latest = oshelpers.find_by_ids(
+            lambda marker: self.provider.nova.images.list(marker=marker),
+            [img.id for img in images])
+        for img in images:
+            # pylint:disable=protected-access
+            if img.id in latest:
+                img._os_image = latest[img.id]
+            else:
+                img._os_image.status = 'unknown'
+
+    @cached
     def find(self, name, limit=None, marker=None):
         """
         Searches for an image by a given list of attributes
@@ -234,6 +282,7 @@ class OpenStackImageService(BaseImageService):
 
         return oshelpers.to_server_paged_list(self.provider, cb_images, limit)
 
+    @cached
     def list(self, limit=None, marker=None):
         """
         List all images.
@@ -257,6 +306,7 @@ class OpenStackInstanceTypesService(BaseInstanceTypesService):
     def __init__(self, provider):
         super(OpenStackInstanceTypesService, self).__init__(provider)
 
+    @cached
     def list(self, limit=None, marker=None):
         cb_itypes = [
             OpenStackInstanceType(self.provider, obj)
@@ -300,6 +350,23 @@ class OpenStackVolumeService(BaseVolumeService):
         except CinderNotFound:
             return None
 
+    def _refresh_many(self, volumes):
+        """
+        Refreshes the state of all the given volumes by listing them, a page
+        at a time.
+        """
+        if len(volumes) < 2:
+            return super(OpenStackVolumeService, self)._refresh_many(volumes)
+        latest = oshelpers.find_by_ids(
+            lambda marker: self.provider.cinder.volumes.list(marker=marker),
+            [vol.id for vol in volumes])
+        for vol in volumes:
+            # pylint:disable=protected-access
+            if vol.id in latest:
+                vol._volume = latest[vol.id]
+            else:
+                vol._volume.status = 'unknown'
+
     def find(self, name, limit=None, marker=None):
         """
         Searches for a volume by a given list of attributes.
@@ -326,7 +393,8 @@ class OpenStackVolumeService(BaseVolumeService):
 
         return oshelpers.to_server_paged_list(self.provider, cb_vols, limit)
 
-    def create(self, name, size, zone, snapshot=None, description=None):
+    def create(self, name, size, zone, snapshot=None, description=None,
+               tags=None):
         """
         Creates a new volume.
         """
@@ -336,7 +404,8 @@ class OpenStackVolumeService(BaseVolumeService):
 
         os_vol = self.provider.cinder.volumes.create(
             size, name=name, description=description,
-            availability_zone=zone_id, snapshot_id=snapshot_id)
+            availability_zone=zone_id, snapshot_id=snapshot_id,
+            metadata=tags)
         return OpenStackVolume(self.provider, os_vol)
 
 
@@ -356,6 +425,25 @@ class OpenStackSnapshotService(BaseSnapshotService):
         except CinderNotFound:
             return None
 
+    def _refresh_many(self, snapshots):
+        """
+        Refreshes the state of all the given snapshots by listing them, a
+        page at a time.
+        """
+        if len(snapshots) < 2:
+            return super(OpenStackSnapshotService, self)._refresh_many(
+                snapshots)
+        latest = oshelpers.find_by_ids(
+            lambda marker: self.provider.cinder.volume_snapshots.list(
+                search_opts={'marker': marker}),
+            [snap.id for snap in snapshots])
+        for snap in snapshots:
+            # pylint:disable=protected-access
+            if snap.id in latest:
+                snap._snapshot = latest[snap.id]
+            else:
+                snap._snapshot.status = 'unknown'
+
     def find(self, name, limit=None, marker=None):
         """
         Searches for a volume by a given list of attributes.
@@ -383,7 +471,7 @@ class OpenStackSnapshotService(BaseSnapshotService):
                              'marker': marker})]
         return oshelpers.to_server_paged_list(self.provider, cb_snaps, limit)
 
-    def create(self, name, volume, description=None):
+    def create(self, name, volume, description=None, tags=None):
         """
         Creates a new snapshot of a given volume.
         """
@@ -392,7 +480,7 @@ class OpenStackSnapshotService(BaseSnapshotService):
 
         os_snap = self.provider.cinder.volume_snapshots.create(
             volume_id, name=name,
-            description=description)
+            description=description, metadata=tags)
         return OpenStackSnapshot(self.provider, os_snap)
 
 
@@ -449,22 +537,26 @@ class OpenStackRegionService(BaseRegionService):
     def __init__(self, provider):
         super(OpenStackRegionService, self).__init__(provider)
 
+    @cached
     def get(self, region_id):
-        region = (r for r in self.list() if r.id == region_id)
-        return next(region, None)
+        # pylint:disable=protected-access
+        index = self.provider._catalog_index
+        if index and index.has_region(region_id):
+            return OpenStackRegion(self.provider, region_id)
+        if self.provider._keystone_version == 3:
+            # Regions without any endpoints are only listed by Keystone v3
+            region = (r for r in self if r.id == region_id)
+            return next(region, None)
+        return None
 
+    @cached
     def list(self, limit=None, marker=None):
         def keystone_v2():
             # Keystone v3 onwards supports directly listing regions
             # but for v2, this convoluted method is necessary.
-            regions = (
-                endpoint.get('region') or endpoint.get('region_id')
-                for svc in self.provider.keystone.service_catalog.get_data()
-                for endpoint in svc.get('endpoints', [])
-            )
-            regions = set(region for region in regions if region)
+            # pylint:disable=protected-access
             os_regions = [OpenStackRegion(self.provider, region)
-                          for region in regions]
+                          for region in self.provider._catalog_index.regions]
 
             return ClientPagedResultList(self.provider, os_regions,
                                          limit=limit, marker=marker)
@@ -480,14 +572,11 @@ class OpenStackRegionService(BaseRegionService):
 
     @property
     def current(self):
-        if self.provider.keystone.has_service_catalog():
-            nova_region = [
-                endpoint.get('region') or endpoint.get('region_id')
-                for svc in self.provider.keystone.service_catalog.get_data()
-                for endpoint in svc.get('endpoints', [])
-                if endpoint.get('publicURL', None) ==
-                self.provider.nova.client.management_url]
-            return self.get(nova_region[0])
+        index = self.provider._catalog_index  # pylint:disable=protected-access
+        if index:
+            nova_region = index.region_of(
+                self.provider.nova.client.management_url)
+            return self.get(nova_region) if nova_region else None
         return None
 
 
@@ -524,11 +613,21 @@ class OpenStackInstanceService(BaseInstanceService):
 
     def create(self, name, image, instance_type, zone=None,
                key_pair=None, security_groups=None, user_data=None,
-               launch_config=None,
+               launch_config=None, tags=None,
                **kwargs):
         """
         Creates a new virtual machine instance.
         """
+        return self._create_many([name], image, instance_type, zone,
+                                 key_pair, security_groups, user_data,
+                                 launch_config, tags, **kwargs)[0]
+
+    def _create_many(self, names, image, instance_type, zone=None,
+                     key_pair=None, security_groups=None, user_data=None,
+                     launch_config=None, tags=None, **kwargs):
+        """
+        Launches all the instances with a single request.
+        """
         image_id = image.id if isinstance(image, MachineImage) else image
         instance_size = instance_type.id if \
             isinstance(instance_type, InstanceType) else \
@@ -551,19 +650,38 @@ class OpenStackInstanceService(BaseInstanceService):
         else:
             bdm = nics = None
 
-        os_instance = self.provider.nova.servers.create(
-            name,
+        result = self.provider.nova.servers.create(
+            names[0],
             None if self._has_root_device(launch_config) else image_id,
             instance_size,
-            min_count=1,
-            max_count=1,
+            min_count=len(names),
+            max_count=len(names),
             availability_zone=zone_id,
             key_name=key_pair_name,
             security_groups=security_groups_list,
             userdata=user_data,
             block_device_mapping_v2=bdm,
-            nics=nics)
-        return OpenStackInstance(self.provider, os_instance)
+            nics=nics,
+            meta=tags,
+            # Only the first server is returned when launching several, so
+            # they are looked up through their reservation instead
+            reservation_id=len(names) > 1)
+        if len(names) == 1:
+            return [OpenStackInstance(self.provider, result)]
+
+        reservation_id = getattr(result, 'reservation_id', result)
+        os_instances = sorted(
+            self.provider.nova.servers.list(
+                search_opts={'reservation_id': reservation_id}),
+            key=lambda server: getattr(
+                server, 'OS-EXT-SRV-ATTR:launch_index', 0))
+        for os_instance, name in zip(os_instances, names):
+            # Nova names the servers of a multiple launch after the first
+            if os_instance.name != name:
+                self.provider.nova.servers.update(os_instance, name=name)
+                os_instance.name = name
+        return [OpenStackInstance(self.provider, os_instance)
+                for os_instance in os_instances]
 
     def _to_block_device_mapping(self, launch_config):
         """
@@ -661,6 +779,24 @@ class OpenStackInstanceService(BaseInstanceService):
         except NovaNotFound:
             return None
 
+    def _refresh_many(self, instances):
+        """
+        Refreshes the state of all the given instances by listing them, a
+        page at a time.
+        """
+        if len(instances) < 2:
+            return super(OpenStackInstanceService, self)._refresh_many(
+                instances)
+        latest = oshelpers.find_by_ids(
+            lambda marker: self.provider.nova.servers.list(marker=marker),
+            [inst.id for inst in instances])
+        for inst in instances:
+            # pylint:disable=protected-access
+            if inst.id in latest:
+                inst._os_instance = latest[inst.id]
+            else:
+                inst._os_instance.status = 'unknown'
+
 
 class OpenStackNetworkService(BaseNetworkService):
 
@@ -668,10 +804,12 @@ class OpenStackNetworkService(BaseNetworkService):
         super(OpenStackNetworkService, self).__init__(provider)
         self._subnet_svc = OpenStackSubnetService(self.provider)
 
+    @cached
     def get(self, network_id):
         network = (n for n in self.list() if n.id == network_id)
         return next(network, None)
 
+    @cached
     def list(self, limit=None, marker=None):
         networks = [OpenStackNetwork(self.provider, network)
                     for network in self.provider.neutron.list_networks()
@@ -679,6 +817,7 @@ class OpenStackNetworkService(BaseNetworkService):
         return ClientPagedResultList(self.provider, networks,
                                      limit=limit, marker=marker)
 
+    @invalidates_cache()
     def create(self, name=''):
         net_info = {'name': name}
         network = self.provider.neutron.create_network({'network': net_info})
@@ -694,10 +833,12 @@ class OpenStackSubnetService(BaseSubnetService):
     def __init__(self, provider):
         super(OpenStackSubnetService, self).__init__(provider)
 
+    @cached
     def get(self, subnet_id):
         subnet = (s for s in self.list() if s.id == subnet_id)
         return next(subnet, None)
 
+    @cached
     def list(self, network=None):
         if network:
             network_id = (network.id if isinstance(network, OpenStackNetwork)
@@ -708,6 +849,7 @@ class OpenStackSubnetService(BaseSubnetService):
         subnets = self.provider.neutron.list_subnets().get('subnets', [])
         return [OpenStackSubnet(self.provider, subnet) for subnet in subnets]
 
+    @invalidates_cache()
     def create(self, network, cidr_block, name=''):
         network_id = (network.id if isinstance(network, OpenStackNetwork)
                       else network)
@@ -717,6 +859,7 @@ class OpenStackSubnetService(BaseSubnetService):
                   .get('subnet'))
         return OpenStackSubnet(self.provider, subnet)
 
+    @invalidates_cache()
     def delete(self, subnet):
         subnet_id = (subnet.id if isinstance(subnet, OpenStackSubnet)
                      else subnet)
@@ -0,0 +1,98 @@
+"""
+A cache of Keystone tokens shared by the processes of a user
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where concurrent processes may then each
+    # authenticate, but will not read a partially written token
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+
+class TokenCache(object):
+    """
+    Keystone auth states saved as files in ``cache_dir``, so that processes
+    which authenticate as the same user can reuse a token until it is about
+    to expire.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(*elements):
+        """
+        Returns the cache key for a set of auth parameters, such as the auth
+        URL, user, project and domains.
+        """
+        data = json.dumps(elements, sort_keys=True)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir,
+                            'keystone-token-{0}.json'.format(key))
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        """
+        Holds an exclusive lock on a cache entry, so that when many processes
+        start together, only one of them authenticates. If the entry cannot
+        be locked, the block runs without the lock.
+        """
+        lock_file = self._open_lock(key)
+        try:
+            yield
+        finally:
+            if lock_file:
+                # Closing the file releases the lock
+                lock_file.close()
+
+    def _open_lock(self, key):
+        lock_file = None
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o700)
+            lock_file = open(self._path(key) + '.lock', 'a')
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            return lock_file
+        except (IOError, OSError) as e:
+            log.warning("Could not lock the Keystone token cache in %s: %s",
+                        self.cache_dir, e)
+            if lock_file:
+                lock_file.close()
+            return None
+
+    def load(self, key):
+        """
+        :rtype: ``str``
+        :return: The saved auth state, or ``None`` if there is none.
+        """
+        try:
+            with open(self._path(key)) as f:
+                return f.read()
+        except (IOError, OSError):
+            return None
+
+    def save(self, key, state):
+        """
+        Saves an auth state, readable only by the current user.
+        """
+        path = self._path(key)
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(state)
+        getattr(os, 'replace', os.rename)(tmp_path, path)
+
+    def __repr__(self):
+        return "<CB-{0}: {1}>".format(self.__class__.__name__,
+                                      self.cache_dir)
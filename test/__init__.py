@@ -27,12 +27,14 @@ as a base class to each combination).
 """
 import cloudbridge
 from test.helpers import ProviderTestCaseGenerator
+from test.test_async_provider import CloudAsyncProviderTestCase
 from test.test_block_store_service import CloudBlockStoreServiceTestCase
 from test.test_cloud_helpers import CloudHelpersTestCase
 from test.test_compute_service import CloudComputeServiceTestCase
 from test.test_image_service import CloudImageServiceTestCase
 from test.test_instance_types_service import CloudInstanceTypesServiceTestCase
 from test.test_interface import CloudInterfaceTestCase
+from test.test_metrics import CloudMetricsTestCase
 from test.test_network_service import CloudNetworkServiceTestCase
 from test.test_object_life_cycle import CloudObjectLifeCycleTestCase
 from test.test_object_store_service import CloudObjectStoreServiceTestCase
@@ -51,7 +53,9 @@ PROVIDER_TESTS = [
     CloudObjectStoreServiceTestCase,
     CloudComputeServiceTestCase,
     CloudRegionServiceTestCase,
-    CloudImageServiceTestCase
+    CloudImageServiceTestCase,
+    CloudAsyncProviderTestCase,
+    CloudMetricsTestCase
 ]
 
 
@@ -0,0 +1,44 @@
+import unittest
+
+import six
+
+from test.helpers import ProviderTestBase
+
+
+@unittest.skipIf(six.PY2, "asyncio requires Python 3")
+class CloudAsyncProviderTestCase(ProviderTestBase):
+
+    def __init__(self, methodName, provider):
+        super(CloudAsyncProviderTestCase, self).__init__(
+            methodName=methodName, provider=provider)
+
+    def _iterate(self, loop, aiterable):
+        # Drive the asynchronous iterator manually, so that this module
+        # remains importable under Python 2
+        results = []
+        aiter = aiterable.__aiter__()
+        while True:
+            try:
+                results.append(loop.run_until_complete(aiter.__anext__()))
+            except StopAsyncIteration:  # noqa
+                return results
+
+    def test_async_service_calls(self):
+        import asyncio
+        from cloudbridge.cloud.base.async_provider import AsyncCloudProvider
+
+        loop = asyncio.new_event_loop()
+        with AsyncCloudProvider(self.provider, max_workers=4,
+                                loop=loop) as aprovider:
+            instance_types, regions = loop.run_until_complete(
+                asyncio.gather(aprovider.compute.instance_types.list(),
+                               aprovider.compute.regions.list()))
+            self.assertListEqual(
+                instance_types, self.provider.compute.instance_types.list())
+            self.assertListEqual(regions, self.provider.compute.regions.list())
+
+            # check asynchronous iteration
+            self.assertListEqual(
+                self._iterate(loop, aprovider.compute.instance_types),
+                list(self.provider.compute.instance_types))
+        loop.close()
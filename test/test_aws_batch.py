@@ -0,0 +1,197 @@
+import unittest
+
+from boto.ec2.group import Group
+from boto.ec2.instance import Instance
+from boto.ec2.securitygroup import SecurityGroup
+from boto.exception import EC2ResponseError
+
+from cloudbridge.cloud.providers.aws import AWSCloudProvider
+from cloudbridge.cloud.providers.aws.resources import AWSBucket
+from cloudbridge.cloud.providers.aws.resources import AWSInstance
+
+ERROR_BODY = ('<Response><Errors><Error><Code>{0}</Code><Message>{0}'
+              '</Message></Error></Errors><RequestID>1</RequestID></Response>')
+
+
+def ec2_error(code, status=400):
+    return EC2ResponseError(status, 'Bad Request', ERROR_BODY.format(code))
+
+
+class FakeEC2Connection(object):
+    """
+    Answers requests for the given instances and security groups, failing
+    the whole request if it names any other id, as EC2 does.
+    """
+
+    def __init__(self, instance_ids=(), group_ids=()):
+        self.instance_ids = set(instance_ids)
+        self.group_ids = set(group_ids)
+        self.requests = []
+        # Raised by every request, if set
+        self.error = None
+
+    def _request(self, action, ids, known, code):
+        self.requests.append((action, list(ids)))
+        if self.error:
+            raise self.error
+        if set(ids) - known:
+            raise ec2_error(code)
+
+    def terminate_instances(self, instance_ids, dry_run=False):
+        self._request('TerminateInstances', instance_ids, self.instance_ids,
+                      'InvalidInstanceID.NotFound')
+        terminated = []
+        for inst_id in instance_ids:
+            inst = Instance(self)
+            inst.id = inst_id
+            inst._state.name = 'shutting-down'
+            terminated.append(inst)
+        return terminated
+
+    def reboot_instances(self, instance_ids, dry_run=False):
+        self._request('RebootInstances', instance_ids, self.instance_ids,
+                      'InvalidInstanceID.NotFound')
+        return True
+
+    def create_tags(self, resource_ids, tags, dry_run=False):
+        self._request('CreateTags', resource_ids, self.instance_ids,
+                      'InvalidInstanceID.NotFound')
+        return True
+
+    def get_all_security_groups(self, groupnames=None, group_ids=None,
+                                filters=None, dry_run=False):
+        self._request('DescribeSecurityGroups', group_ids, self.group_ids,
+                      'InvalidGroup.NotFound')
+        return [SecurityGroup(self, id=group_id, name=group_id)
+                for group_id in group_ids]
+
+
+class FakeDeleteError(object):
+
+    def __init__(self, key, code, message):
+        self.key = key
+        self.code = code
+        self.message = message
+
+
+class FakeDeleteResult(object):
+
+    def __init__(self, errors):
+        self.errors = errors
+
+
+class FakeBucket(object):
+    """
+    Fails to delete the keys in ``errors``, which maps each key to an error
+    code and message.
+    """
+
+    def __init__(self, errors):
+        self.name = 'bucket'
+        self.errors = errors
+        self.requests = []
+
+    def delete_keys(self, keys):
+        self.requests.append(list(keys))
+        return FakeDeleteResult(
+            [FakeDeleteError(key, code, message)
+             for key, (code, message) in self.errors.items()])
+
+
+class FakeEC2Provider(AWSCloudProvider):
+
+    def __init__(self, ec2_conn):
+        self.fake_ec2_conn = ec2_conn
+        super(FakeEC2Provider, self).__init__({})
+
+    def _connect_ec2(self):
+        return self.fake_ec2_conn
+
+
+class AWSBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = FakeEC2Connection(instance_ids=['i-1', 'i-2'],
+                                      group_ids=['sg-1', 'sg-2'])
+        self.provider = FakeEC2Provider(self.conn)
+
+    def instance(self, inst_id, group_ids=()):
+        ec2_inst = Instance(self.conn)
+        ec2_inst.id = inst_id
+        for group_id in group_ids:
+            group = Group()
+            group.id = group_id
+            ec2_inst.groups.append(group)
+        return AWSInstance(self.provider, ec2_inst)
+
+    def test_terminate_many(self):
+        insts = [self.instance('i-1'), self.instance('i-2')]
+        result = self.provider.compute.instances.terminate_many(insts)
+        self.assertListEqual(sorted(result.succeeded), ['i-1', 'i-2'])
+        self.assertListEqual(
+            self.conn.requests, [('TerminateInstances', ['i-1', 'i-2'])],
+            "Instances should be terminated with a single request")
+        self.assertEqual(insts[0]._ec2_instance.state, 'shutting-down',
+                         "Terminated instances should be updated")
+
+    def test_terminate_many_missing(self):
+        insts = [self.instance('i-1'), self.instance('i-404')]
+        result = self.provider.compute.instances.terminate_many(insts)
+        self.assertListEqual(result.succeeded, ['i-1'],
+                             "The existing instance should be terminated")
+        self.assertListEqual(list(result.failed), ['i-404'])
+        self.assertEqual(result.failed['i-404'].error_code,
+                         'InvalidInstanceID.NotFound')
+
+    def test_terminate_many_error(self):
+        self.conn.error = ec2_error('UnauthorizedOperation', 403)
+        with self.assertRaises(EC2ResponseError):
+            self.provider.compute.instances.terminate_many(
+                [self.instance('i-1'), self.instance('i-2')])
+        self.assertEqual(len(self.conn.requests), 1,
+                         "Errors other than a missing instance should not"
+                         " fall back to individual requests")
+
+    def test_reboot_many(self):
+        result = self.provider.compute.instances.reboot_many(
+            [self.instance('i-1'), self.instance('i-404')])
+        self.assertListEqual(result.succeeded, ['i-1'])
+        self.assertListEqual(list(result.failed), ['i-404'])
+
+        self.conn.error = ec2_error('UnauthorizedOperation', 403)
+        with self.assertRaises(EC2ResponseError):
+            self.provider.compute.instances.reboot_many(
+                [self.instance('i-1')])
+
+    def test_tag_many(self):
+        insts = [self.instance('i-1'), self.instance('i-404')]
+        result = self.provider.tag_many(insts, {'env': 'test'})
+        self.assertListEqual(result.succeeded, ['i-1'])
+        self.assertListEqual(list(result.failed), ['i-404'])
+        self.assertEqual(insts[0]._ec2_instance.tags, {'env': 'test'})
+
+        self.conn.error = ec2_error('RequestLimitExceeded', 503)
+        with self.assertRaises(EC2ResponseError):
+            self.provider.tag_many(insts, {'env': 'test'})
+
+    def test_for_instances(self):
+        insts = [self.instance('i-1', ['sg-1']),
+                 self.instance('i-2', ['sg-2', 'sg-404'])]
+        groups = self.provider.security.security_groups.for_instances(insts)
+        self.assertListEqual([sg.id for sg in groups['i-1']], ['sg-1'])
+        self.assertListEqual(
+            [sg.id for sg in groups['i-2']], ['sg-2'],
+            "Groups which have been deleted should be left out")
+
+        self.conn.error = ec2_error('UnauthorizedOperation', 403)
+        with self.assertRaises(EC2ResponseError):
+            self.provider.security.security_groups.for_instances(insts)
+
+    def test_bucket_delete_many(self):
+        bucket = FakeBucket({'b': ('AccessDenied', 'Access Denied')})
+        result = AWSBucket(self.provider, bucket).delete_many(['a', 'b'])
+        self.assertListEqual(bucket.requests, [['a', 'b']],
+                             "Objects should be deleted with one request")
+        self.assertListEqual(result.succeeded, ['a'])
+        self.assertListEqual(list(result.failed), ['b'])
+        self.assertIn('AccessDenied', str(result.failed['b']))
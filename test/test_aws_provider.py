@@ -0,0 +1,50 @@
+import unittest
+
+from boto.connection import AWSAuthConnection
+
+from cloudbridge.cloud.providers.aws import AWSCloudProvider
+
+
+class FakeResponse(object):
+
+    def __init__(self, status):
+        self.status = status
+
+
+class AWSProviderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Records the number of retries allowed for each request, instead
+        # of sending it
+        self.retries = []
+
+        def mexe(conn, request, sender=None, override_num_retries=None,
+                 retry_handler=None):
+            self.retries.append(override_num_retries)
+            return FakeResponse(200)
+
+        # pylint:disable=protected-access
+        self._mexe = AWSAuthConnection._mexe
+        AWSAuthConnection._mexe = mexe
+
+    def tearDown(self):
+        AWSAuthConnection._mexe = self._mexe
+
+    def request_retries(self, config):
+        config.update({'aws_access_key': 'access', 'aws_secret_key': 'secret'})
+        provider = AWSCloudProvider(config)
+        # pylint:disable=protected-access
+        for pool in (provider._ec2_pool, provider._vpc_pool):
+            pool.get().make_request('DescribeInstances')
+        provider._s3_pool.get().make_request('GET')
+        return self.retries
+
+    def test_sdk_retries(self):
+        self.assertListEqual(
+            self.request_retries({}), [None] * 3,
+            "boto should retry requests if the provider does not")
+
+    def test_sdk_retries_disabled(self):
+        self.assertListEqual(
+            self.request_retries({'max_retries': 2}), [0] * 3,
+            "boto should not retry requests if the provider does")
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import benchmarks
+from benchmarks.cases import run_benchmarks
+from benchmarks.fixtures import openstack_fixture
+from benchmarks.harness import BenchmarkResult
+from benchmarks.harness import compare
+from benchmarks.harness import load_baseline
+from benchmarks.harness import measure
+from benchmarks.harness import save_baseline
+from benchmarks.harness import tracemalloc
+
+STORED_BASELINE = os.path.join(os.path.dirname(benchmarks.__file__),
+                               'baselines', 'openstack.json')
+
+
+class BenchmarkHarnessTestCase(unittest.TestCase):
+
+    def test_result(self):
+        result = BenchmarkResult('list', [0.3, 0.1, 0.5, 0.2, 0.4], 6, 1024)
+        self.assertEqual(result.median, 0.3)
+        self.assertEqual(result.p95, 0.5)
+        self.assertAlmostEqual(result.throughput, 20)
+        self.assertDictEqual(
+            result.to_dict(),
+            {'median': 0.3, 'p95': 0.5, 'throughput': result.throughput,
+             'items': 6, 'peak_memory': 1024})
+
+    def test_measure(self):
+        calls = []
+        result = measure('append', lambda: calls.append(1), repeat=3,
+                         items=2)
+        self.assertEqual(len(result.durations), 3)
+        self.assertEqual(result.items, 2)
+        # Once to warm up, then once per timed run, and once more to
+        # measure memory if possible
+        self.assertEqual(len(calls), 5 if tracemalloc else 4)
+
+    def test_compare(self):
+        baseline = {'list': {'median': 1.0, 'peak_memory': 1000},
+                    'get': {'median': 1.0, 'peak_memory': 1000}}
+        results = [BenchmarkResult('list', [1.1], 1, 1100),
+                   BenchmarkResult('get', [1.3], 1, 1300),
+                   BenchmarkResult('find', [9.0], 1, 9000)]
+        regressions = compare(results, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2,
+                         "Only growth beyond the tolerance should be"
+                         " reported, and new benchmarks ignored")
+        self.assertTrue(all(r.startswith('get: ') for r in regressions))
+        self.assertListEqual(compare(results, baseline, tolerance=0.5), [])
+
+    def test_baseline_round_trip(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, 'baseline.json')
+            results = [BenchmarkResult('list', [0.1, 0.2], 2, None)]
+            save_baseline(results, path)
+            self.assertDictEqual(load_baseline(path),
+                                 {'list': results[0].to_dict()})
+            self.assertListEqual(compare(results, load_baseline(path)), [])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class BenchmarkCasesTestCase(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        fixture = openstack_fixture(5)
+        try:
+            results = run_benchmarks(fixture, repeat=1, sample=3)
+        finally:
+            fixture.close()
+        names = set(result.name for result in results)
+        self.assertIn('instances.wait_for_many', names)
+        self.assertSetEqual(
+            names, set(load_baseline(STORED_BASELINE)),
+            "The stored baseline should cover every benchmark")
+
+        selected = run_benchmarks(openstack_fixture(5), repeat=1, sample=3,
+                                  selected=['volumes.'])
+        self.assertTrue(all(result.name.startswith('volumes.')
+                            for result in selected))
+
+    def test_make_pending(self):
+        fixture = openstack_fixture(3)
+        volumes = list(fixture.provider.block_store.volumes)
+        states = set(vol.state for vol in volumes)
+        fixture.make_pending(volumes)
+        self.assertTrue(all(vol.state not in states for vol in volumes),
+                        "Pending resources should not be in a ready state")
+        for vol in volumes:
+            vol.refresh()
+        self.assertSetEqual(
+            set(vol.state for vol in volumes), states,
+            "Refreshing should restore the state held by the mock cloud")
@@ -5,6 +5,7 @@ import six
 from cloudbridge.cloud.interfaces import SnapshotState
 from cloudbridge.cloud.interfaces import VolumeState
 from cloudbridge.cloud.interfaces.resources import AttachmentInfo
+from cloudbridge.cloud.interfaces.resources import WaitStateException
 from test.helpers import ProviderTestBase
 import test.helpers as helpers
 
@@ -91,6 +92,93 @@ class CloudBlockStoreServiceTestCase(ProviderTestBase):
             "Volume %s should have been deleted but still exists." %
             name)
 
+    def test_wait_for_many_volumes(self):
+        """
+        Create several volumes and wait for all of them to become available
+        through a single batched waiter
+        """
+        name = "CBUnitTestWaitManyVol-{0}".format(uuid.uuid4())
+        test_vols = [self.provider.block_store.volumes.create(
+            "{0}-{1}".format(name, i),
+            1,
+            helpers.get_provider_test_data(self.provider, "placement"))
+            for i in range(3)]
+
+        def cleanup_vols(vols):
+            for vol in vols:
+                vol.delete()
+
+        with helpers.cleanup_action(lambda: cleanup_vols(test_vols)):
+            ready_vols = list(self.provider.block_store.volumes.wait_for_many(
+                test_vols, [VolumeState.AVAILABLE],
+                terminal_states=[VolumeState.ERROR, VolumeState.DELETED]))
+            self.assertEqual(
+                sorted(vol.id for vol in ready_vols),
+                sorted(vol.id for vol in test_vols),
+                "wait_for_many should yield every volume exactly once")
+            self.assertTrue(
+                all(vol.state == VolumeState.AVAILABLE for vol in ready_vols),
+                "All volumes should be available but got states: {0}".format(
+                    [vol.state for vol in ready_vols]))
+
+            # Hitting the timeout should raise an exception
+            with self.assertRaises(WaitStateException):
+                list(self.provider.block_store.volumes.wait_for_many(
+                    test_vols, [VolumeState.ERROR], timeout=0, interval=0))
+
+    def test_delete_many_volumes(self):
+        """
+        Create several volumes and delete them with a single bulk call
+        """
+        name = "CBUnitTestDeleteManyVol-{0}".format(uuid.uuid4())
+        volumes = self.provider.block_store.volumes
+        test_vols = [volumes.create(
+            "{0}-{1}".format(name, i),
+            1,
+            helpers.get_provider_test_data(self.provider, "placement"))
+            for i in range(2)]
+        list(volumes.wait_for_many(test_vols, [VolumeState.AVAILABLE],
+                                   terminal_states=[VolumeState.ERROR]))
+
+        # Volumes can be given by id as well
+        result = volumes.delete_many([test_vols[0], test_vols[1].id])
+        self.assertEqual(
+            sorted(result.succeeded), sorted(vol.id for vol in test_vols),
+            "delete_many should report each volume as deleted, but failed"
+            " with: {0}".format(result.failed))
+        list(volumes.wait_for_many(
+            test_vols, [VolumeState.DELETED, VolumeState.UNKNOWN],
+            terminal_states=[VolumeState.ERROR]))
+        self.assertEqual(len(volumes.find(name="{0}-0".format(name))), 0,
+                         "Volumes should have been deleted but still exist")
+
+    def test_volume_tags(self):
+        """
+        Create a volume with tags and retag it in bulk
+        """
+        name = "CBUnitTestVolTags-{0}".format(uuid.uuid4())
+        test_vol = self.provider.block_store.volumes.create(
+            name,
+            1,
+            helpers.get_provider_test_data(self.provider, "placement"),
+            tags={'cb-test': 'created'})
+
+        def cleanup_vol(vol):
+            vol.delete()
+            vol.wait_for([VolumeState.DELETED, VolumeState.UNKNOWN],
+                         terminal_states=[VolumeState.ERROR])
+
+        with helpers.cleanup_action(lambda: cleanup_vol(test_vol)):
+            self.assertEqual(test_vol.name, name,
+                             "Tags given at creation should not replace the"
+                             " volume name")
+            result = self.provider.tag_many([test_vol],
+                                            {'cb-test': 'updated'})
+            self.assertListEqual(
+                result.succeeded, [test_vol.id],
+                "tag_many should tag the volume, but failed with: {0}".format(
+                    result.failed))
+
     def test_attach_detach_volume(self):
         """
         Create a new volume, and attempt to attach it to an instance
@@ -0,0 +1,57 @@
+import unittest
+
+from boto.ec2.keypair import KeyPair
+
+from cloudbridge.cloud.base.cache import cached
+from cloudbridge.cloud.base.resources import ClientPagedResultList
+from cloudbridge.cloud.base.services import BaseCloudService
+from cloudbridge.cloud.providers.aws import AWSCloudProvider
+from cloudbridge.cloud.providers.aws.resources import AWSKeyPair
+
+
+class DummyService(BaseCloudService):
+
+    _cache_name = 'dummy'
+
+    def __init__(self, provider):
+        super(DummyService, self).__init__(provider)
+        self.lookups = 0
+
+    @cached
+    def list(self, limit=None, marker=None):
+        self.lookups += 1
+        key_pairs = [AWSKeyPair(self.provider, KeyPair()) for _ in range(3)]
+        return ClientPagedResultList(self.provider, key_pairs, limit=limit,
+                                     marker=marker)
+
+
+class CachedResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = AWSCloudProvider({'aws_access_key': 'access',
+                                          'aws_secret_key': 'secret',
+                                          'cache_ttl': 300})
+        self.service = DummyService(self.provider)
+
+    def test_results_copied(self):
+        first = self.service.list(limit=2)
+        second = self.service.list(limit=2)
+        self.assertEqual(self.service.lookups, 1)
+        self.assertIsNot(first, second,
+                         "Each caller should get its own result list")
+        self.assertIsInstance(second, ClientPagedResultList)
+        self.assertEqual(second.marker, first.marker)
+        self.assertTrue(second.is_truncated)
+        # pylint:disable=protected-access
+        self.assertListEqual([kp._key_pair for kp in second],
+                             [kp._key_pair for kp in first])
+
+        first.reverse()
+        first.append(None)
+        first[1]._key_pair = None
+        third = self.service.list(limit=2)
+        self.assertEqual(len(third), 2)
+        self.assertListEqual(
+            [kp._key_pair for kp in third],
+            [kp._key_pair for kp in second],
+            "Changing a result should not change what later callers get")
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 
 from cloudbridge.cloud import factory
@@ -122,3 +124,19 @@ class CloudFactoryTestCase(unittest.TestCase):
         factory.register_provider_class(DummyClass)
         self.assertTrue(DummyClass not in
                         factory.get_all_provider_classes(get_mock=False))
+
+    def test_create_provider_imports_only_requested(self):
+        """
+        Creating a provider should not import the modules of any other
+        provider.
+        """
+        script = (
+            "import sys\n"
+            "from cloudbridge.cloud.factory import CloudProviderFactory\n"
+            "CloudProviderFactory().create_provider('aws', {})\n"
+            "sys.exit(int('cloudbridge.cloud.providers.openstack'"
+            " in sys.modules))\n")
+        self.assertEqual(
+            subprocess.call([sys.executable, '-c', script]), 0,
+            "Creating an AWS provider should not import the OpenStack"
+            " provider")
@@ -1,7 +1,16 @@
+import gc
 import itertools
+import threading
+import time
 
+from cloudbridge.cloud.base.interceptors import RemoteCall
+from cloudbridge.cloud.base.pool import ConnectionPool
 from cloudbridge.cloud.base.resources import ClientPagedResultList
 from cloudbridge.cloud.base.resources import ServerPagedResultList
+from cloudbridge.cloud.base.throttling import RateLimiter
+from cloudbridge.cloud.base.throttling import RetryBudget
+from cloudbridge.cloud.base.throttling import RetryPolicy
+from cloudbridge.cloud.base.throttling import ThrottlingInterceptor
 from test.helpers import ProviderTestBase
 
 
@@ -15,6 +24,14 @@ class DummyResult(object):
         return "%s (%s)" % (self.id, self.name)
 
 
+class DummyHTTPError(Exception):
+
+    def __init__(self, http_status, error_code=None):
+        super(DummyHTTPError, self).__init__(http_status)
+        self.http_status = http_status
+        self.error_code = error_code
+
+
 class CloudHelpersTestCase(ProviderTestBase):
 
     def __init__(self, methodName, provider):
@@ -76,3 +93,101 @@ class CloudHelpersTestCase(ProviderTestBase):
                         " lists should return True for server paging.")
         with self.assertRaises(NotImplementedError):
             _ = results.data
+
+    def test_connection_pool(self):
+        pool = ConnectionPool(object, max_idle=3)
+        connection = pool.get()
+        self.assertIs(pool.get(), connection,
+                      "A thread should keep using the same connection")
+
+        # Threads running at the same time must not share a connection
+        connections = []
+        release = threading.Event()
+
+        def use_connection():
+            connections.append(pool.get())
+            release.wait()
+
+        threads = [threading.Thread(target=use_connection)
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while len(connections) < len(threads):
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        gc.collect()
+        self.assertEqual(len(set(id(c) for c in connections + [connection])),
+                         5, "Concurrent threads should not share a"
+                         " connection")
+        self.assertEqual(pool.idle_count, 3,
+                         "Connections of exited threads should be pooled,"
+                         " up to max_idle")
+
+        with pool.checkout() as borrowed:
+            self.assertNotEqual(borrowed, connection)
+        pool.clear()
+        self.assertNotEqual(pool.get(), connection,
+                            "Clearing a pool should replace connections")
+
+    def test_rate_limiter(self):
+        waits = []
+        limiter = RateLimiter(2, rates={'s3': 0}, clock=lambda: 0,
+                              sleep=waits.append)
+        self.assertListEqual(
+            [limiter.acquire('ec2') for _ in range(4)], [0, 0, 0.5, 1.0],
+            "Calls beyond the burst should wait for the rate limit")
+        self.assertListEqual(waits, [0.5, 1.0])
+        self.assertEqual(limiter.acquire('s3'), 0,
+                         "A rate of 0 should not limit calls")
+        self.assertEqual(limiter.acquire('ec2', 'eu-west-1'), 0,
+                         "Each region should be limited separately")
+
+    def test_throttled_calls_retried(self):
+        waits = []
+        budget = RetryBudget(0, reserve=3)
+        interceptor = ThrottlingInterceptor(
+            policy=RetryPolicy(max_retries=2, budget=budget),
+            sleep=waits.append)
+
+        def failing(*errors):
+            errors = list(errors)
+
+            def request():
+                if errors:
+                    raise errors.pop(0)
+                return 'done'
+            return request
+
+        create = RemoteCall('ec2', 'RunInstances')
+        self.assertEqual(
+            interceptor(create, failing(
+                DummyHTTPError(429),
+                DummyHTTPError(503, 'RequestLimitExceeded'))), 'done',
+            "Rejected calls should be retried")
+        self.assertEqual(len(waits), 2)
+        self.assertTrue(all(0 <= wait <= 1 for wait in waits),
+                        "Retries should back off exponentially")
+        with self.assertRaises(DummyHTTPError):
+            interceptor(create, failing(*[DummyHTTPError(429)] * 3))
+        with self.assertRaises(DummyHTTPError):
+            interceptor(create, failing(DummyHTTPError(502)))
+        del waits[:]
+        with self.assertRaises(DummyHTTPError):
+            interceptor(RemoteCall('nova', 'GET /servers/detail'),
+                        failing(DummyHTTPError(502)))
+        self.assertEqual(len(waits), 0,
+                         "Retries should stop when the budget is spent")
+
+        interceptor = ThrottlingInterceptor(
+            policy=RetryPolicy(max_retries=1), sleep=waits.append)
+        with self.assertRaises(DummyHTTPError):
+            interceptor(create, failing(DummyHTTPError(503)))
+        self.assertEqual(len(waits), 0,
+                         "Calls which change state and may have been"
+                         " carried out should not be retried")
+        self.assertEqual(
+            interceptor(RemoteCall('ec2', 'DescribeInstances'),
+                        failing(DummyHTTPError(503))), 'done',
+            "Throttled calls which do not change state should be retried")
@@ -87,6 +87,38 @@ class CloudComputeServiceTestCase(ProviderTestBase):
             "Instance %s should have been deleted but still exists." %
             name)
 
+    def test_create_many_instances(self):
+        name = "CBInstMany-{0}-{1}".format(
+            self.provider.name,
+            uuid.uuid4())
+        instances = self.provider.compute.instances
+        insts = instances.create_many(
+            2, name + '-{0}',
+            helpers.get_provider_test_data(self.provider, 'image'),
+            helpers.get_provider_test_data(self.provider, 'instance_type'))
+
+        def cleanup_insts(insts):
+            for inst in insts:
+                inst.terminate()
+            list(instances.wait_for_many(
+                insts, [InstanceState.TERMINATED, InstanceState.UNKNOWN],
+                terminal_states=[InstanceState.ERROR]))
+
+        with helpers.cleanup_action(lambda: cleanup_insts(insts)):
+            self.assertListEqual(
+                [inst.name for inst in insts], [name + '-0', name + '-1'],
+                "create_many() should name instances by their index")
+            for inst in instances.wait_for_many(
+                    insts, [InstanceState.RUNNING],
+                    terminal_states=[InstanceState.ERROR]):
+                self.assertEqual(inst.state, InstanceState.RUNNING)
+            find_instances = instances.find(name=name + '-1')
+            self.assertTrue(
+                len(find_instances) == 1 and
+                find_instances[0].id == insts[1].id,
+                "Find instances does not return the expected instance %s" %
+                insts[1].id)
+
     def _is_valid_ip(self, address):
         try:
             ipaddress.ip_address(address)
@@ -151,6 +183,12 @@ class CloudComputeServiceTestCase(ProviderTestBase):
             self.assertEqual(
                 test_instance.security_group_ids[0],
                 sg.id)
+            self.assertEqual(
+                self.provider.security.security_groups.for_instances(
+                    [test_instance]),
+                {test_instance.id: test_instance.security_groups},
+                "for_instances must return the same security groups as"
+                " the instance")
             # Must have either a public or a private ip
             ip_private = test_instance.private_ips[0] \
                 if test_instance.private_ips else None
@@ -0,0 +1,149 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from cloudbridge.cloud.providers.aws import AWSCloudProvider
+from cloudbridge.cloud.providers.aws import catalog
+from cloudbridge.cloud.providers.aws.catalog import InstanceTypeCatalog
+
+CATALOG_URL = 'https://example.com/instances.json'
+ENTRIES = [{'instance_type': 't2.micro', 'vCPU': 1},
+           {'instance_type': 'm4.large', 'vCPU': 2}]
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code, entries=None, headers=None):
+        self.status_code = status_code
+        self.entries = entries
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(self.status_code)
+
+    def json(self):
+        return self.entries
+
+
+class InstanceTypeCatalogTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        # Each request pops the next response, or raises it if it is an
+        # exception
+        self.responses = []
+        self.requests = []
+
+        def get(url, headers=None):
+            self.requests.append((url, dict(headers or {})))
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self._get = catalog.requests.get
+        catalog.requests.get = get
+
+    def tearDown(self):
+        catalog.requests.get = self._get
+        shutil.rmtree(self.cache_dir)
+
+    def test_fetched_once_within_ttl(self):
+        self.responses.append(FakeResponse(200, ENTRIES))
+        types = InstanceTypeCatalog(CATALOG_URL, ttl=3600)
+        self.assertEqual(types.get('m4.large'), ENTRIES[1])
+        self.assertIsNone(types.get('x9.huge'))
+        self.assertEqual(types.entries, ENTRIES)
+        self.assertEqual(len(self.requests), 1,
+                         "The catalog should not be fetched again before its"
+                         " TTL expires")
+
+    def test_revalidated_after_ttl(self):
+        self.responses.append(FakeResponse(
+            200, ENTRIES, {'ETag': '"v1"',
+                           'Last-Modified': 'Mon, 01 Aug 2016 00:00:00 GMT'}))
+        self.responses.append(FakeResponse(304))
+        types = InstanceTypeCatalog(CATALOG_URL, ttl=0)
+        self.assertEqual(types.entries, ENTRIES)
+        self.assertEqual(types.entries, ENTRIES,
+                         "A 304 response should keep the cached catalog")
+        self.assertEqual(len(self.requests), 2,
+                         "An expired catalog should be revalidated")
+        self.assertDictEqual(
+            self.requests[1][1],
+            {'If-None-Match': '"v1"',
+             'If-Modified-Since': 'Mon, 01 Aug 2016 00:00:00 GMT'},
+            "Revalidation should be a conditional request")
+
+    def test_replaced_when_changed(self):
+        self.responses.append(FakeResponse(200, ENTRIES[:1]))
+        self.responses.append(FakeResponse(200, ENTRIES))
+        types = InstanceTypeCatalog(CATALOG_URL, ttl=0)
+        self.assertIsNone(types.get('m4.large'))
+        self.assertEqual(types.get('m4.large'), ENTRIES[1],
+                         "A changed catalog should replace the cached one")
+
+    def test_stale_when_unreachable(self):
+        self.responses.append(FakeResponse(200, ENTRIES))
+        self.responses.append(requests.ConnectionError("unreachable"))
+        types = InstanceTypeCatalog(CATALOG_URL, ttl=0)
+        self.assertEqual(types.entries, ENTRIES)
+        self.assertEqual(types.entries, ENTRIES,
+                         "The stale catalog should be used when the remote"
+                         " copy cannot be reached")
+
+    def test_unreachable_without_cache(self):
+        self.responses.append(requests.ConnectionError("unreachable"))
+        types = InstanceTypeCatalog(CATALOG_URL)
+        with self.assertRaises(requests.ConnectionError):
+            types.get('t2.micro')
+
+    def test_disk_round_trip(self):
+        self.responses.append(FakeResponse(200, ENTRIES, {'ETag': '"v1"'}))
+        writer = InstanceTypeCatalog(CATALOG_URL, cache_dir=self.cache_dir)
+        self.assertEqual(writer.entries, ENTRIES)
+
+        reader = InstanceTypeCatalog(CATALOG_URL, cache_dir=self.cache_dir)
+        self.assertEqual(reader.entries, ENTRIES)
+        self.assertEqual(len(self.requests), 1,
+                         "A catalog cached on disk should be shared by other"
+                         " instances within its TTL")
+
+        self.responses.append(FakeResponse(304))
+        expired = InstanceTypeCatalog(CATALOG_URL, ttl=0,
+                                      cache_dir=self.cache_dir)
+        self.assertEqual(expired.entries, ENTRIES)
+        self.assertEqual(self.requests[-1][1], {'If-None-Match': '"v1"'},
+                         "The ETag should be cached with the catalog")
+
+    def test_invalid_disk_cache_ignored(self):
+        self.responses.append(FakeResponse(200, ENTRIES))
+        InstanceTypeCatalog(CATALOG_URL, cache_dir=self.cache_dir).entries
+        path, = glob.glob(os.path.join(self.cache_dir, '*.json'))
+        for content in ('[]', '{"entries": {}}', '{"entries": [1]}', '{'):
+            with open(path, 'w') as f:
+                f.write(content)
+            self.responses.append(FakeResponse(200, ENTRIES))
+            types = InstanceTypeCatalog(CATALOG_URL, cache_dir=self.cache_dir)
+            self.assertEqual(types.entries, ENTRIES,
+                             "An invalid cache file should be ignored: {0}"
+                             .format(content))
+
+    def test_service_list_indexed(self):
+        self.responses.append(FakeResponse(
+            200, [{'instance_type': 't{0}.micro'.format(i)}
+                  for i in range(6)]))
+        provider = AWSCloudProvider({'aws_instance_info_url': CATALOG_URL})
+        inst_types = provider.compute.instance_types
+        first = inst_types.list(limit=2)
+        second = inst_types.list(limit=2, marker=first.marker)
+        self.assertEqual(len(second), 2)
+        self.assertIs(second.index, first.index,
+                      "Listing after a marker should reuse the index of the"
+                      " instance types")
+        self.assertEqual(second.index[first.marker], 1)
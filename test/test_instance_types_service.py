@@ -17,6 +17,28 @@ class CloudInstanceTypesServiceTestCase(ProviderTestBase):
         # check iteration
         iter_instance_types = list(self.provider.compute.instance_types)
         self.assertListEqual(iter_instance_types, instance_types)
+        # check paged iteration, with and without prefetching
+        for prefetch in [0, 2]:
+            self.assertListEqual(
+                list(self.provider.compute.instance_types.iterate(
+                    limit=5, prefetch=prefetch)),
+                iter_instance_types)
+        # check walking through client side pages without refetching
+        page = self.provider.compute.instance_types.list(limit=5)
+        if not page.supports_server_paging:
+            paged_instance_types = []
+            while page is not None:
+                paged_instance_types.extend(page)
+                next_page = page.next_page()
+                if next_page is not None:
+                    self.assertListEqual(
+                        self.provider.compute.instance_types.list(
+                            limit=5, marker=page.marker),
+                        next_page,
+                        "Listing after a marker should return the same page"
+                        " as next_page()")
+                page = next_page
+            self.assertListEqual(paged_instance_types, iter_instance_types)
 
         for inst_type in instance_types:
             self.assertTrue(
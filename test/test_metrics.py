@@ -0,0 +1,63 @@
+from cloudbridge.cloud.base.metrics import MetricsInterceptor
+from cloudbridge.cloud.base.metrics import PrometheusMetricsSink
+from cloudbridge.cloud.base.tracing import InMemorySpanExporter
+from cloudbridge.cloud.base.tracing import Tracer
+from test.helpers import ProviderTestBase
+
+
+class CloudMetricsTestCase(ProviderTestBase):
+
+    def __init__(self, methodName, provider):
+        super(CloudMetricsTestCase, self).__init__(
+            methodName=methodName, provider=provider)
+
+    def test_remote_calls_recorded(self):
+        """
+        Remote calls made by a service should be counted by the provider's
+        metrics sink.
+        """
+        sink = PrometheusMetricsSink()
+        interceptor = MetricsInterceptor(sink)
+        self.provider.add_interceptor(interceptor)
+        try:
+            self.provider.compute.regions.list()
+        finally:
+            self.provider.remove_interceptor(interceptor)
+
+        metrics = sink.metrics
+        self.assertTrue(
+            metrics, "Listing regions should record at least one remote call")
+        for (service, method), m in metrics.items():
+            self.assertEqual(
+                m.count, sum(m.bucket_counts),
+                "Each call to {0} {1} should be counted in one latency"
+                " bucket".format(service, method))
+        self.assertIn('cloudbridge_remote_calls_total{', sink.export())
+
+        # calls made after the interceptor is removed are not recorded
+        sink.reset()
+        self.provider.compute.regions.list()
+        self.assertFalse(sink.metrics)
+
+    def test_calls_traced(self):
+        """
+        Service method calls should be traced, with a child span for each
+        remote call they make.
+        """
+        exporter = InMemorySpanExporter()
+        provider = self.provider.__class__(
+            dict(self.provider.config, tracer=Tracer(exporter)))
+        provider.compute.regions.list()
+
+        roots = [span for span in exporter.spans if span.parent_id is None]
+        self.assertEqual(
+            len(roots), 1,
+            "Expected a single root span but found {0}".format(roots))
+        self.assertEqual(roots[0].kind, 'method')
+        self.assertTrue(roots[0].name.endswith('.list'))
+        remote = [span for span in exporter.spans if span.kind == 'remote']
+        self.assertTrue(
+            remote, "Listing regions should record a remote call span")
+        for span in exporter.spans:
+            self.assertEqual(span.trace_id, roots[0].trace_id)
+            self.assertTrue(span.end_time >= span.start_time)
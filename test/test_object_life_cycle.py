@@ -1,5 +1,8 @@
+import time
 import uuid
 
+from cloudbridge.cloud.base.polling import ExponentialBackoffPollStrategy
+from cloudbridge.cloud.base.polling import FixedIntervalPollStrategy
 from cloudbridge.cloud.interfaces import VolumeState
 from cloudbridge.cloud.interfaces.resources import WaitStateException
 from test.helpers import ProviderTestBase
@@ -42,3 +45,31 @@ class CloudObjectLifeCycleTestCase(ProviderTestBase):
             # Hitting the timeout should raise an exception
             with self.assertRaises(WaitStateException):
                 test_vol.wait_for([VolumeState.ERROR], timeout=0, interval=0)
+
+    def test_object_life_cycle_poll_strategy(self):
+        """
+        Test waiting on an object with a poll strategy instead of a fixed
+        interval.
+        """
+        name = "CBUnitTestLifeCyclePoll-{0}".format(uuid.uuid4())
+        test_vol = self.provider.block_store.volumes.create(
+            name,
+            1,
+            helpers.get_provider_test_data(self.provider, "placement"))
+
+        with helpers.cleanup_action(lambda: test_vol.delete()):
+            strategy = ExponentialBackoffPollStrategy(
+                initial=0, maximum=0, jitter=0)
+            test_vol.wait_for([VolumeState.AVAILABLE],
+                              terminal_states=[VolumeState.ERROR],
+                              poll_strategy=strategy)
+            self.assertEqual(test_vol.state, VolumeState.AVAILABLE)
+
+            # The sleep should be capped by the remaining timeout, so a
+            # strategy with a long interval should still time out promptly
+            start = time.time()
+            with self.assertRaises(WaitStateException):
+                test_vol.wait_for(
+                    [VolumeState.ERROR], timeout=1,
+                    poll_strategy=FixedIntervalPollStrategy(60))
+            self.assertLess(time.time() - start, 30)
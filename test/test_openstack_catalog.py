@@ -0,0 +1,135 @@
+import unittest
+
+from cloudbridge.cloud.providers.openstack import OpenStackCloudProvider
+from cloudbridge.cloud.providers.openstack.catalog import ServiceCatalogIndex
+
+# The same endpoints, as listed in Keystone v2 and v3 service catalogs
+V2_CATALOG = [
+    {'type': 'compute', 'name': 'nova', 'endpoints': [
+        {'region': 'RegionOne',
+         'publicURL': 'https://nova.one:8774/v2/tenant',
+         'internalURL': 'http://10.0.0.1:8774/v2/tenant',
+         'adminURL': 'http://10.0.0.1:8774/v2/tenant'},
+        {'region': 'RegionTwo',
+         'publicURL': 'https://nova.two:8774/v2/tenant/'}]},
+    {'type': 'volume', 'name': 'cinder', 'endpoints': [
+        {'region': 'RegionOne',
+         'publicURL': 'https://cinder.one:8776/v1/tenant'}]},
+    {'type': 'identity', 'name': 'keystone', 'endpoints': [
+        {'publicURL': 'https://keystone:5000/v2.0'}]}]
+V3_CATALOG = [
+    {'type': 'compute', 'name': 'nova', 'endpoints': [
+        {'region_id': 'RegionOne', 'interface': 'public',
+         'url': 'https://nova.one:8774/v2/tenant'},
+        {'region_id': 'RegionOne', 'interface': 'internal',
+         'url': 'http://10.0.0.1:8774/v2/tenant'},
+        {'region_id': 'RegionTwo', 'interface': 'public',
+         'url': 'https://nova.two:8774/v2/tenant/'}]},
+    {'type': 'volume', 'name': 'cinder', 'endpoints': [
+        {'region_id': 'RegionOne', 'interface': 'public',
+         'url': 'https://cinder.one:8776/v1/tenant'}]},
+    {'type': 'identity', 'name': 'keystone', 'endpoints': [
+        {'interface': 'public', 'url': 'https://keystone:5000/v3'}]}]
+
+
+class FakeServiceCatalog(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    def get_data(self):
+        return self.data
+
+
+class FakeKeystone(object):
+
+    def __init__(self, catalog):
+        self.service_catalog = FakeServiceCatalog(catalog)
+
+    def has_service_catalog(self):
+        return True
+
+
+class FakeNovaHTTPClient(object):
+
+    def __init__(self, management_url):
+        self.management_url = management_url
+
+
+class FakeNova(object):
+
+    def __init__(self, management_url):
+        self.client = FakeNovaHTTPClient(management_url)
+
+
+class FakeCatalogProvider(OpenStackCloudProvider):
+    """
+    Gets its service catalog and Nova endpoint from the given values,
+    instead of connecting.
+    """
+
+    def __init__(self, catalog, management_url):
+        self.fake_keystone = FakeKeystone(catalog)
+        self.fake_nova = FakeNova(management_url)
+        super(FakeCatalogProvider, self).__init__(
+            {'os_identity_api_version': '2.0'})
+
+    def _connect_keystone(self):
+        return self.fake_keystone
+
+    def _connect_nova(self):
+        return self.fake_nova
+
+
+class ServiceCatalogIndexTestCase(unittest.TestCase):
+
+    def test_regions(self):
+        for catalog in (V2_CATALOG, V3_CATALOG):
+            index = ServiceCatalogIndex(FakeServiceCatalog(catalog))
+            self.assertListEqual(
+                index.regions, ['RegionOne', 'RegionTwo'],
+                "Endpoints without a region should not be listed")
+            self.assertTrue(index.has_region('RegionTwo'))
+            self.assertFalse(index.has_region('RegionThree'))
+
+    def test_endpoints(self):
+        # A v2 endpoint holds all of its URLs, but v3 lists each separately
+        for catalog, count in ((V2_CATALOG, 1), (V3_CATALOG, 2)):
+            index = ServiceCatalogIndex(FakeServiceCatalog(catalog))
+            self.assertEqual(len(index.endpoints('RegionOne', 'compute')),
+                             count)
+            self.assertEqual(len(index.endpoints('RegionTwo', 'compute')), 1)
+            self.assertListEqual(index.endpoints('RegionTwo', 'volume'), [])
+            self.assertListEqual(index.endpoints('RegionThree', 'compute'),
+                                 [])
+
+    def test_region_of(self):
+        for catalog in (V2_CATALOG, V3_CATALOG):
+            index = ServiceCatalogIndex(FakeServiceCatalog(catalog))
+            self.assertEqual(
+                index.region_of('http://10.0.0.1:8774/v2/tenant'),
+                'RegionOne', "Internal endpoints should be indexed")
+            self.assertEqual(
+                index.region_of('https://nova.one:8774/v2/tenant/'),
+                'RegionOne', "A trailing slash should be ignored")
+            self.assertEqual(
+                index.region_of('https://nova.two:8774/v2/tenant'),
+                'RegionTwo', "A trailing slash should be ignored")
+            self.assertIsNone(index.region_of('https://keystone:5000/v3'))
+            self.assertIsNone(index.region_of(None))
+
+    def test_current_region(self):
+        provider = FakeCatalogProvider(V2_CATALOG,
+                                       'https://nova.two:8774/v2/tenant')
+        self.assertListEqual(
+            [region.name for region in provider.compute.regions.list()],
+            ['RegionOne', 'RegionTwo'])
+        self.assertEqual(provider.compute.regions.current.name, 'RegionTwo')
+
+    def test_current_region_unknown(self):
+        provider = FakeCatalogProvider(V2_CATALOG,
+                                       'https://nova.elsewhere/v2/tenant')
+        self.assertIsNone(
+            provider.compute.regions.current,
+            "The current region should be None if the Nova endpoint is not"
+            " in the service catalog")
@@ -0,0 +1,84 @@
+import unittest
+
+from benchmarks.fixtures import openstack_fixture
+from cloudbridge.cloud.providers.openstack import OpenStackCloudProvider
+from cloudbridge.cloud.providers.openstack.helpers import find_by_ids
+from cloudbridge.cloud.providers.openstack.helpers import os_result_limit
+from cloudbridge.cloud.providers.openstack.helpers import to_server_paged_list
+
+
+class DummyResult(object):
+
+    def __init__(self, objid):
+        self.id = objid
+
+
+class OpenStackHelpersTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.provider = OpenStackCloudProvider({'default_result_limit': 2})
+
+    def test_server_paged_list(self):
+        # The client is asked for one object more than the limit, to find
+        # out whether there is another page
+        limit = os_result_limit(self.provider, None)
+        self.assertEqual(limit, 3)
+        objects = [DummyResult(i) for i in range(limit)]
+
+        results = to_server_paged_list(self.provider, objects, None)
+        self.assertListEqual(results, objects[:2])
+        self.assertTrue(results.is_truncated)
+        self.assertEqual(
+            results.marker, objects[1].id,
+            "The marker should be the id of the last object of the page,"
+            " from which the next page starts")
+
+    def test_server_paged_list_last_page(self):
+        objects = [DummyResult(i) for i in range(2)]
+        results = to_server_paged_list(self.provider, objects, 2)
+        self.assertListEqual(results, objects)
+        self.assertFalse(results.is_truncated)
+        self.assertIsNone(results.marker)
+
+    def test_find_by_ids(self):
+        objects = [DummyResult(i) for i in range(7)]
+        markers = []
+
+        def list_page(marker):
+            markers.append(marker)
+            start = 0 if marker is None else marker + 1
+            return objects[start:start + 3]
+
+        found = find_by_ids(list_page, [1, 4])
+        self.assertDictEqual(found, {1: objects[1], 4: objects[4]})
+        self.assertListEqual(markers, [None, 2],
+                             "Pages should be listed until all the objects"
+                             " are found")
+        del markers[:]
+        self.assertDictEqual(find_by_ids(list_page, [4, 9]),
+                             {4: objects[4]})
+        self.assertListEqual(markers, [None, 2, 5, 6],
+                             "Pages should be listed to the end if an object"
+                             " is missing")
+
+
+class OpenStackRefreshTestCase(unittest.TestCase):
+
+    def test_refresh_beyond_first_page(self):
+        fixture = openstack_fixture(7)
+        provider = fixture.provider
+        for service, manager in (
+                (provider.compute.instances, provider.nova.servers),
+                (provider.block_store.volumes, provider.cinder.volumes),
+                (provider.block_store.snapshots,
+                 provider.cinder.volume_snapshots)):
+            objects = list(service)
+            states = [obj.state for obj in objects]
+            manager.max_limit = 3
+            fixture.make_pending(objects)
+            # pylint:disable=protected-access
+            service._refresh_many(objects)
+            self.assertListEqual(
+                [obj.state for obj in objects], states,
+                "Objects beyond the first page of a listing should be"
+                " refreshed")
@@ -0,0 +1,225 @@
+import threading
+import time
+import unittest
+
+from cloudbridge.cloud.base.throttling import RateLimiter
+from cloudbridge.cloud.base.throttling import ThrottlingInterceptor
+from cloudbridge.cloud.providers.openstack import OpenStackCloudProvider
+from cloudbridge.cloud.providers.openstack import provider as os_provider
+
+
+class FakeKeystoneClient(object):
+
+    def __init__(self, version):
+        self.version = version
+
+
+class FakeSwiftConnection(object):
+
+    # The number of times any connection authenticated
+    authentications = 0
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def get_auth(self):
+        FakeSwiftConnection.authentications += 1
+        # Gives other threads time to try connecting too
+        time.sleep(0.01)
+        return 'https://swift/v1/tenant', 'token'
+
+    def _retry(self, reset_func, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+class FakeServiceClient(object):
+    """
+    Stands in for the Nova, Cinder and Neutron clients, recording the
+    arguments it was created with.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.client = self
+
+    def request(self, url, method, *args, **kwargs):
+        pass
+
+    def do_request(self, method, action, *args, **kwargs):
+        pass
+
+
+class CountingProvider(OpenStackCloudProvider):
+    """
+    Counts the Keystone sessions created, instead of connecting.
+    """
+
+    def __init__(self, config):
+        super(CountingProvider, self).__init__(config)
+        self.sessions = []
+
+    def _connect_keystone_session(self):
+        # Gives other threads time to try connecting too
+        time.sleep(0.01)
+        sess = object()
+        self.sessions.append(sess)
+        return sess
+
+
+class OpenStackProviderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.discoveries = []
+
+        def discover(auth_url):
+            self.discoveries.append(auth_url)
+            return FakeKeystoneClient('v3')
+
+        self._client = os_provider.keystone_client.Client
+        os_provider.keystone_client.Client = discover
+
+        self._connection = os_provider.swift_client.Connection
+        os_provider.swift_client.Connection = FakeSwiftConnection
+        FakeSwiftConnection.authentications = 0
+
+        self._service_clients = (os_provider.nova_client.Client,
+                                 os_provider.cinder_client.Client,
+                                 os_provider.neutron_client.Client)
+        os_provider.nova_client.Client = FakeServiceClient
+        os_provider.cinder_client.Client = FakeServiceClient
+        os_provider.neutron_client.Client = FakeServiceClient
+
+    def tearDown(self):
+        os_provider.keystone_client.Client = self._client
+        os_provider.swift_client.Connection = self._connection
+        (os_provider.nova_client.Client, os_provider.cinder_client.Client,
+         os_provider.neutron_client.Client) = self._service_clients
+
+    def keystone_version(self, identity_api_version):
+        provider = OpenStackCloudProvider({
+            'os_auth_url': 'https://keystone',
+            'os_identity_api_version': identity_api_version})
+        # pylint:disable=protected-access
+        return provider._keystone_version
+
+    def test_configured_keystone_version(self):
+        for configured, expected in [('v3', 3), ('3', 3), (3, 3),
+                                     ('v2.0', 2), ('2.0', 2), (2, 2)]:
+            self.assertEqual(
+                self.keystone_version(configured), expected,
+                "Keystone version {0} should be {1}".format(configured,
+                                                            expected))
+        self.assertListEqual(
+            self.discoveries, [],
+            "A configured Keystone version should not be discovered")
+
+    def test_discovered_keystone_version(self):
+        provider = OpenStackCloudProvider({
+            'os_auth_url': 'https://keystone',
+            'os_identity_api_version': None})
+        # pylint:disable=protected-access
+        self.assertEqual(provider._keystone_version, 3)
+        self.assertEqual(provider._keystone_version, 3)
+        self.assertListEqual(self.discoveries, ['https://keystone'],
+                             "The Keystone version should be discovered once")
+
+    def test_session_created_once(self):
+        provider = CountingProvider({'os_auth_url': 'https://keystone'})
+        sessions = []
+        start = threading.Event()
+
+        def get_session():
+            start.wait()
+            # pylint:disable=protected-access
+            sessions.append(provider._keystone_session)
+
+        threads = [threading.Thread(target=get_session) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(provider.sessions), 1,
+                         "Concurrent threads should create a single session")
+        self.assertTrue(all(sess is provider.sessions[0]
+                            for sess in sessions))
+
+    def test_swift_retries(self):
+        for config, retries in [({}, 5), ({'max_retries': 2}, 0)]:
+            provider = OpenStackCloudProvider(config)
+            # pylint:disable=protected-access
+            swift = provider._connect_swift()
+            self.assertEqual(
+                swift.kwargs['retries'], retries,
+                "swiftclient should only retry requests if the provider"
+                " does not")
+
+    def test_v2_clients_share_session(self):
+        provider = CountingProvider({'os_auth_url': 'https://keystone',
+                                     'os_identity_api_version': '2.0'})
+        # pylint:disable=protected-access
+        view = provider._region_view('RegionTwo')
+        clients = []
+
+        def connect():
+            for prov in (provider, view):
+                clients.extend([prov.nova, prov.cinder, prov.neutron])
+
+        threads = [threading.Thread(target=connect) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(clients), 24)
+        self.assertEqual(len(provider.sessions), 1)
+        self.assertTrue(
+            all(client.kwargs.get('session') is provider.sessions[0]
+                for client in clients),
+            "The clients of every thread and region should use the shared"
+            " session with Keystone v2")
+
+    def test_swift_authenticated_once(self):
+        provider = OpenStackCloudProvider({'os_auth_url': 'https://keystone'})
+        connections = []
+        start = threading.Event()
+        release = threading.Event()
+
+        def connect():
+            start.wait()
+            connections.append(provider.swift)
+            # Keeps the connection in use, so that each thread gets its own
+            release.wait()
+
+        threads = [threading.Thread(target=connect) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        while len(connections) < len(threads):
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(id(conn) for conn in connections)), 8)
+        self.assertEqual(FakeSwiftConnection.authentications, 1,
+                         "Only the first Swift connection should"
+                         " authenticate")
+        self.assertTrue(all(conn.kwargs['preauthtoken'] == 'token'
+                            for conn in connections))
+
+    def test_regions_rate_limited_separately(self):
+        provider = CountingProvider({'os_auth_url': 'https://keystone',
+                                     'os_region_name': 'RegionOne',
+                                     'rate_limit': 1})
+        waits = []
+        # pylint:disable=protected-access
+        interceptor, = [i for i in provider._interceptors
+                        if isinstance(i, ThrottlingInterceptor)]
+        interceptor.limiter = RateLimiter(1, clock=lambda: 0,
+                                          sleep=waits.append)
+        view = provider._region_view('RegionTwo')
+        provider.nova.client.request('/servers', 'GET')
+        view.nova.client.request('/servers', 'GET')
+        self.assertListEqual(waits, [],
+                             "Regional views should not share a rate limit")
+        view.nova.client.request('/servers', 'GET')
+        self.assertListEqual(waits, [1.0])
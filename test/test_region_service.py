@@ -1,5 +1,9 @@
+import threading
+import time
+
 import six
 
+from cloudbridge.cloud.base import cache
 from cloudbridge.cloud.interfaces import Region
 from test.helpers import ProviderTestBase
 import test.helpers as helpers
@@ -63,6 +67,58 @@ class CloudRegionServiceTestCase(ProviderTestBase):
         self.assertIsInstance(current_region, Region)
         self.assertTrue(current_region in self.provider.compute.regions.list())
 
+    def test_concurrent_lookups_coalesced(self):
+        """
+        Concurrent identical lookups should share a single remote call
+        """
+        region_id = self.provider.compute.regions.list()[0].id
+        calls = []
+        followers = 4
+        waiting = [0]
+        hold = [False]
+        changed = threading.Condition()
+        original_wait = cache._Flight.wait
+
+        def counting_wait(flight):
+            with changed:
+                waiting[0] += 1
+                changed.notify_all()
+            return original_wait(flight)
+
+        def count_calls(call, proceed):
+            calls.append(call)
+            # Keep the call in progress until the other lookups are waiting
+            # for it, giving up after a while if they never join it
+            deadline = time.time() + 30
+            with changed:
+                while (hold[0] and waiting[0] < followers and
+                       time.time() < deadline):
+                    changed.wait(deadline - time.time())
+            return proceed()
+
+        self.provider.compute.regions.get(region_id)
+        self.provider.add_interceptor(count_calls)
+        cache._Flight.wait = counting_wait
+        try:
+            self.provider.compute.regions.get(region_id)
+            single_lookup_calls = len(calls)
+            del calls[:]
+            hold[0] = True
+            threads = [threading.Thread(
+                target=self.provider.compute.regions.get, args=(region_id,))
+                for _ in range(followers + 1)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            cache._Flight.wait = original_wait
+            self.provider.remove_interceptor(count_calls)
+        self.assertEqual(
+            len(calls), single_lookup_calls,
+            "Expected concurrent lookups to make {0} remote calls, but they"
+            " made {1}".format(single_lookup_calls, len(calls)))
+
     def test_zones(self):
         """
         Test whether regions return the correct zone information
@@ -86,3 +142,40 @@ class CloudRegionServiceTestCase(ProviderTestBase):
                         "The test zone: {0} should appear exactly"
                         " once in the list of regions, but was not found"
                         .format(test_zone, zone_find_count))
+
+    def test_for_region(self):
+        """
+        for_region should return a provider for the given region, which is
+        created once and reused
+        """
+        current = self.provider.compute.regions.current
+        self.assertIs(self.provider.for_region(current.name), self.provider)
+        other = next((region for region in self.provider.compute.regions
+                      if region.name != current.name), None)
+        if other is None:
+            self.skipTest("Provider has a single region")
+        regional = self.provider.for_region(other.name)
+        self.assertIs(regional, self.provider.for_region(other.name))
+        self.assertEqual(regional.compute.regions.current, other)
+        self.assertIs(regional.for_region(current.name), self.provider)
+
+    def test_across_regions(self):
+        """
+        across_regions should query each region with its own provider and
+        report the regions in which the query failed
+        """
+        current = self.provider.compute.regions.current
+
+        def current_region(regional):
+            region = regional.compute.regions.current
+            if region != current:
+                raise ValueError("Not the current region")
+            return [region.name]
+
+        regions = list(self.provider.compute.regions)
+        results = self.provider.across_regions(current_region, regions)
+        self.assertListEqual(list(results), [(current.name, current.name)])
+        self.assertListEqual(results.succeeded, [current.name])
+        self.assertSetEqual(
+            set(results.failed),
+            set(region.name for region in regions if region != current))
@@ -1,6 +1,7 @@
 import json
 import uuid
 
+from cloudbridge.cloud.base.resources import serialize_many
 from test.helpers import ProviderTestBase
 import test.helpers as helpers
 
@@ -64,6 +65,34 @@ class CloudSecurityServiceTestCase(ProviderTestBase):
             no_kp,
             "Found a key pair {0} that should not exist?".format(no_kp))
 
+    def test_key_pair_cache(self):
+        provider = self.provider.__class__(
+            dict(self.provider.config, cache_ttl=300))
+        name = 'cbtestkeypairC-{0}'.format(uuid.uuid4())
+        # Not found lookups should be cached too
+        self.assertIsNone(provider.security.key_pairs.get(name))
+        kp = provider.security.key_pairs.create(name=name)
+        with helpers.cleanup_action(
+            lambda: provider.security.key_pairs.delete(key_pair_id=kp.id)
+        ):
+            # Creating a key pair should invalidate the cached lookup
+            get_kp = provider.security.key_pairs.get(name)
+            self.assertEqual(get_kp, kp)
+            # Each lookup returns its own copy of a cached key pair, so the
+            # key pairs they wrap are compared
+            # pylint:disable=protected-access
+            self.assertIs(
+                provider.security.key_pairs.get(name)._key_pair,
+                get_kp._key_pair,
+                "Repeated lookups should be served from the cache")
+            self.assertIsNot(
+                provider.security.key_pairs.get(
+                    name, bypass_cache=True)._key_pair,
+                get_kp._key_pair,
+                "Passing bypass_cache should force a fresh lookup")
+        # Deleting a key pair should invalidate the cached lookup
+        self.assertIsNone(provider.security.key_pairs.get(name))
+
     def test_key_pair(self):
         name = 'cbtestkeypairB-{0}'.format(uuid.uuid4())
         kp = self.provider.security.key_pairs.create(name=name)
@@ -91,6 +120,19 @@ class CloudSecurityServiceTestCase(ProviderTestBase):
                 kp.to_json(), json_repr,
                 "JSON key pair representation {0} does not match expected {1}"
                 .format(kp.to_json(), json_repr))
+            self.assertEqual(
+                serialize_many([kp, kp]),
+                "[{0}, {0}]".format(json_repr),
+                "serialize_many should produce a JSON array of all objects")
+            record = kp.to_record()
+            self.assertFalse(
+                hasattr(kp, '__dict__'),
+                "Resource wrappers should not have a per-instance __dict__")
+            self.assertEqual(
+                record.to_dict(), kp.to_dict(),
+                "Record {0} should hold the same fields as {1}".format(
+                    record, kp))
+            self.assertEqual(record.to_json(), json_repr)
         kpl = self.provider.security.key_pairs.list()
         found_kp = [k for k in kpl if k.name == name]
         self.assertTrue(
@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import shutil
+import stat
+import tempfile
+import unittest
+
+from cloudbridge.cloud.providers.openstack import OpenStackCloudProvider
+from cloudbridge.cloud.providers.openstack.token_cache import TokenCache
+
+
+class FakeAccessInfo(object):
+
+    def __init__(self, token, expiring):
+        self.token = token
+        self.expiring = expiring
+
+    def will_expire_soon(self, stale_duration=None):
+        return self.expiring
+
+
+class FakeAuth(object):
+    """
+    A Keystone auth plugin which gets ``token`` when it authenticates, and
+    which saves its state as JSON.
+    """
+
+    def __init__(self, token, expiring=False):
+        self.token = token
+        self.expiring = expiring
+        self.auth_ref = None
+        self.authentications = 0
+
+    def get_access(self, session):
+        self.authentications += 1
+        self.auth_ref = FakeAccessInfo(self.token, self.expiring)
+        return self.auth_ref
+
+    def get_auth_state(self):
+        return json.dumps({'token': self.auth_ref.token,
+                           'expiring': self.auth_ref.expiring})
+
+    def set_auth_state(self, state):
+        state = json.loads(state)
+        self.auth_ref = FakeAccessInfo(state['token'], state['expiring'])
+
+
+class FakeSession(object):
+
+    def __init__(self, auth):
+        self.auth = auth
+
+
+class TokenCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_key(self):
+        key = TokenCache.key('https://keystone/v3', 'user', None, 'project')
+        self.assertEqual(
+            key, TokenCache.key('https://keystone/v3', 'user', None,
+                                'project'),
+            "The same auth parameters should always give the same key")
+        self.assertNotEqual(
+            key, TokenCache.key('https://keystone/v3', 'user', 'project',
+                                None),
+            "Different auth parameters should give different keys")
+        self.assertTrue(re.match('^[0-9a-f]{32}$', key))
+
+    def test_save_and_load(self):
+        cache = TokenCache(os.path.join(self.cache_dir, 'tokens'))
+        key = cache.key('user')
+        self.assertIsNone(cache.load(key),
+                          "A missing entry should load as None")
+        with cache.lock(key):
+            cache.save(key, 'first')
+            cache.save(key, 'second')
+        self.assertEqual(cache.load(key), 'second')
+
+        token_files = [name for name in os.listdir(cache.cache_dir)
+                       if not name.endswith('.lock')]
+        self.assertEqual(len(token_files), 1,
+                         "Temporary files should be renamed into place")
+        mode = os.stat(os.path.join(cache.cache_dir, token_files[0])).st_mode
+        self.assertEqual(stat.S_IMODE(mode), 0o600,
+                         "Saved tokens should be readable only by their"
+                         " owner")
+
+    def test_lock_failure(self):
+        unwritable = os.path.join(self.cache_dir, 'file')
+        open(unwritable, 'w').close()
+        # The cache directory cannot be created under a file
+        cache = TokenCache(os.path.join(unwritable, 'tokens'))
+        with cache.lock(cache.key('user')):
+            self.assertIsNone(cache.load(cache.key('user')))
+
+    def test_expiring_token_replaced(self):
+        provider = OpenStackCloudProvider({
+            'os_auth_url': 'https://keystone/v3', 'os_username': 'user',
+            'os_password': 'password', 'os_project_name': 'project',
+            'os_token_cache': True, 'cache_dir': self.cache_dir})
+
+        def authenticate(auth):
+            # pylint:disable=protected-access
+            provider._authenticate_from_cache(FakeSession(auth))
+            return auth
+
+        auth = authenticate(FakeAuth('old', expiring=True))
+        self.assertEqual(auth.authentications, 1)
+
+        auth = authenticate(FakeAuth('new'))
+        self.assertEqual(auth.authentications, 1,
+                         "A token about to expire should be replaced")
+        self.assertEqual(auth.auth_ref.token, 'new')
+
+        auth = authenticate(FakeAuth('unused'))
+        self.assertEqual(auth.authentications, 0,
+                         "A valid cached token should be reused")
+        self.assertEqual(auth.auth_ref.token, 'new')
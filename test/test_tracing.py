@@ -0,0 +1,107 @@
+import copy
+import unittest
+
+from boto.ec2.volume import Volume
+
+from cloudbridge.cloud.base.services import BaseCloudService
+from cloudbridge.cloud.base.tracing import InMemorySpanExporter
+from cloudbridge.cloud.base.tracing import Tracer
+from cloudbridge.cloud.providers.aws import AWSCloudProvider
+from cloudbridge.cloud.providers.aws.resources import AWSVolume
+from cloudbridge.cloud.providers.aws.services import AWSInstanceService
+
+
+class DummyService(BaseCloudService):
+
+    def _current_span(self):
+        tracer = self.provider.config.tracer
+        return tracer.current_span if tracer else None
+
+    def current(self):
+        return self._current_span()
+
+    def numbers(self, count):
+        def generate():
+            for i in range(count):
+                # Stands in for a remote call made while iterating
+                yield i, self._current_span()
+        return generate()
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.tracer = Tracer(self.exporter)
+        credentials = {'aws_access_key': 'access', 'aws_secret_key': 'secret'}
+        self.provider = AWSCloudProvider(dict(credentials,
+                                              tracer=self.tracer))
+        self.untraced = AWSCloudProvider(credentials)
+
+    def test_only_traced_providers(self):
+        untraced = DummyService(self.untraced)
+        self.assertIs(type(untraced), DummyService,
+                      "The objects of providers without a tracer should not"
+                      " be traced")
+        self.assertIs(type(self.untraced.compute.instances),
+                      AWSInstanceService)
+        self.assertIsNot(type(self.provider.compute.instances),
+                         AWSInstanceService)
+        untraced.current()
+        self.assertListEqual(self.exporter.spans, [])
+
+        service = DummyService(self.provider)
+        self.assertIsInstance(service, DummyService)
+        self.assertIsNot(type(service), DummyService)
+        self.assertEqual(type(service).__name__, 'DummyService')
+        span = service.current()
+        self.assertEqual(span.name, 'DummyService.current')
+        self.assertListEqual(self.exporter.spans, [span])
+        self.assertIs(type(DummyService(self.provider)), type(service),
+                      "Traced classes should be created once")
+
+    def test_later_classes_traced(self):
+        class LaterService(DummyService):
+
+            def later(self):
+                return self._current_span()
+
+        span = LaterService(self.provider).later()
+        self.assertEqual(span.name, 'LaterService.later',
+                         "Classes defined after a provider is created should"
+                         " be traced")
+
+    def test_generator_traced(self):
+        service = DummyService(self.provider)
+        numbers = service.numbers(3)
+        self.assertIsNone(self.tracer.current_span)
+        first, span = next(numbers)
+        self.assertEqual(span.name, 'DummyService.numbers',
+                         "The span should be current while the generator"
+                         " runs")
+        self.assertIsNone(self.tracer.current_span,
+                          "The span should not be current between items")
+        self.assertListEqual(self.exporter.spans, [],
+                             "The span should stay open while iterating")
+        self.assertListEqual([item for item, _ in numbers], [1, 2])
+        self.assertListEqual(self.exporter.spans, [span])
+        self.assertIsNone(span.error)
+
+        numbers = service.numbers(3)
+        next(numbers)
+        numbers.close()
+        self.assertEqual(len(self.exporter.spans), 2,
+                         "The span should end if iteration stops early")
+
+    def test_resources_traced(self):
+        vol = AWSVolume(self.provider, Volume())
+        self.assertIsInstance(vol, AWSVolume)
+        self.assertIsNot(type(vol), AWSVolume)
+        self.assertFalse(hasattr(vol, '__dict__'),
+                         "Traced resources should keep their slots")
+        self.assertIn('refresh', vars(type(vol)))
+        self.assertNotIn('to_dict', vars(type(vol)),
+                         "Methods which only read local data should not be"
+                         " traced")
+        self.assertIs(type(copy.copy(vol)), type(vol))
+        self.assertIs(type(AWSVolume(self.untraced, Volume())), AWSVolume)